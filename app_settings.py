@@ -71,6 +71,18 @@ def system_memory_mb():
             return int(status.ullTotalPhys / 1024 / 1024), int(status.ullAvailPhys / 1024 / 1024)
         except Exception:
             logger.debug("Failed to query Windows memory", exc_info=True)
+    elif os.path.exists("/proc/meminfo"):
+        try:
+            values = {}
+            with open("/proc/meminfo", "r", encoding="ascii", errors="replace") as file_handle:
+                for line in file_handle:
+                    key, _, value = line.partition(":")
+                    if key in {"MemTotal", "MemAvailable", "MemFree"}:
+                        values[key] = int(value.split()[0])
+            available_kb = values.get("MemAvailable", values.get("MemFree", 0))
+            return int(values.get("MemTotal", 0) / 1024), int(available_kb / 1024)
+        except (OSError, ValueError, IndexError):
+            logger.debug("Failed to read /proc/meminfo", exc_info=True)
     return 0, 0
 
 
@@ -94,8 +106,17 @@ def load_config():
             "mirror_source": "official",
             "max_core_threads": "12",
             "max_asset_threads": "24",
+            "auto_concurrency": "True",
+            "min_core_threads": "2",
+            "min_asset_threads": "4",
             "speed_limit_kbps": "0",
+            "background_speed_limit_kbps": "0",
             "cache_strategy": "reuse",
+            "object_store_dir": "",
+            "deep_verify": "False",
+            "hash_threads": "0",
+            "extra_mirrors": "",
+            "fast_first_launch": "False",
         },
         "AUTH": {
             "use_microsoft_login": "False",
@@ -198,7 +219,8 @@ DOWNLOAD_PRESETS = {
     "激进": {"core": 20, "asset": 40, "speed_kbps": 0, "cache": "reuse"},
 }
 
-GC_STRATEGIES = ["G1GC", "ZGC", "Shenandoah", "默认"]
+AUTO_GC_STRATEGY = "自动"
+GC_STRATEGIES = [AUTO_GC_STRATEGY, "G1GC", "ZGC", "Shenandoah", "默认"]
 
 
 @dataclass
@@ -206,17 +228,35 @@ class DownloadTask:
     task_type: str
     title: str
     start_callback: Callable[[], None]
+    # Queued tasks with the same non-empty batch_key are started together as one batch of batch_item.
+    batch_key: tuple = ()
+    batch_item: str = ""
 
     def start(self):
         self.start_callback()
 
 
 def read_download_options():
+    max_core = max(1, config.getint("DOWNLOAD", "max_core_threads", fallback=12))
+    max_asset = max(1, config.getint("DOWNLOAD", "max_asset_threads", fallback=24))
     return {
-        "max_core_concurrency": max(1, config.getint("DOWNLOAD", "max_core_threads", fallback=12)),
-        "max_asset_concurrency": max(1, config.getint("DOWNLOAD", "max_asset_threads", fallback=24)),
+        "max_core_concurrency": max_core,
+        "max_asset_concurrency": max_asset,
+        "min_core_concurrency": max(1, min(max_core, config.getint("DOWNLOAD", "min_core_threads", fallback=2))),
+        "min_asset_concurrency": max(1, min(max_asset, config.getint("DOWNLOAD", "min_asset_threads", fallback=4))),
+        "auto_concurrency": config.getboolean("DOWNLOAD", "auto_concurrency", fallback=True),
         "speed_limit_kbps": max(0, config.getint("DOWNLOAD", "speed_limit_kbps", fallback=0)),
+        "background_speed_limit_kbps": max(0, config.getint("DOWNLOAD", "background_speed_limit_kbps", fallback=0)),
         "cache_strategy": config.get("DOWNLOAD", "cache_strategy", fallback="reuse"),
+        "object_store_dir": config.get("DOWNLOAD", "object_store_dir", fallback="").strip(),
+        "deep_verify": config.getboolean("DOWNLOAD", "deep_verify", fallback=False),
+        "hash_workers": max(0, config.getint("DOWNLOAD", "hash_threads", fallback=0)),
+        "fast_first_launch": config.getboolean("DOWNLOAD", "fast_first_launch", fallback=False),
+        "extra_mirrors": [
+            root.strip().rstrip("/")
+            for root in config.get("DOWNLOAD", "extra_mirrors", fallback="").split(",")
+            if root.strip()
+        ],
     }
 
 
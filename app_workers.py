@@ -8,9 +8,9 @@ from PyQt6.QtCore import QThread, QObject, pyqtSignal as Signal
 from external_auth import authenticate_external_account, probe_external_auth_server, refresh_external_account
 from install_services import get_remote_versions
 from java_utils import find_java_paths, get_java_major_version
-from launcher import get_local_versions
 from log_utils import get_logger
 from nat_utils import detect_nat_type
+from version_inventory import scan_version_inventory
 
 
 logger = get_logger(__name__)
@@ -53,7 +53,8 @@ class AuthWorker(QObject):
                 "display_name": username,
                 "username": username,
                 "uuid": uuid,
-                "access_token": "",
+                "access_token": self.authenticator.minecraft_access_token,
+                "access_token_expires_at": self.authenticator.minecraft_token_expires_at,
                 "refresh_token": self.authenticator.refresh_token,
             })
         except Exception as exc:
@@ -155,9 +156,11 @@ class ScanWorker(QObject):
                 }
             elif self.task_type == "local_versions":
                 self.status.emit("正在扫描本地版本...")
+                inventory = scan_version_inventory(self.game_dir)
                 payload = {
                     "task": "local_versions",
-                    "versions": get_local_versions(self.game_dir),
+                    "versions": list(inventory),
+                    "inventory": inventory,
                 }
             elif self.task_type == "remote_versions":
                 self.status.emit("正在刷新远程版本列表...")
@@ -1,14 +1,31 @@
 import asyncio
+import time
 
 import http_client
 from log_utils import get_logger
 
+MINECRAFT_TOKEN_LIFETIME_SECONDS = 24 * 3600
+MINECRAFT_TOKEN_MARGIN_SECONDS = 10 * 60
 logger = get_logger(__name__)
 
 
+def cached_minecraft_token(account, now=None, margin=MINECRAFT_TOKEN_MARGIN_SECONDS):
+    """Return the Minecraft access token stored on a Microsoft account if it is still valid for margin seconds."""
+    token = account.get("access_token") or ""
+    try:
+        expires_at = float(account.get("access_token_expires_at") or 0)
+    except (TypeError, ValueError):
+        expires_at = 0
+    now = time.time() if now is None else now
+    if not token or not account.get("username") or not account.get("uuid") or expires_at - margin <= now:
+        return ""
+    return token
+
+
 class MicrosoftAuthenticator:
     def __init__(self, client_id, redirect_uri):
         self.minecraft_access_token = None
+        self.minecraft_token_expires_at = 0
         self.client_id = client_id
         self.redirect_uri = redirect_uri
         self.authorization_code = None
@@ -64,7 +81,9 @@ class MicrosoftAuthenticator:
         data = {"identityToken": f"XBL3.0 x={self.user_hash};{self.xsts_token}"}
         response = http_client.post(url, json=data, headers=headers)
         http_client.raise_for_status(response, "Minecraft 令牌交换")
-        self.minecraft_access_token = response.json()["access_token"]
+        payload = response.json()
+        self.minecraft_access_token = payload["access_token"]
+        self.minecraft_token_expires_at = time.time() + int(payload.get("expires_in") or MINECRAFT_TOKEN_LIFETIME_SECONDS)
         logger.info("Minecraft access token exchange succeeded")
 
     async def authenticate(self):
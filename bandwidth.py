@@ -0,0 +1,92 @@
+import asyncio
+import threading
+import time
+
+
+BURST_SECONDS = 1.0
+MIN_BURST_BYTES = 128 * 1024
+FOREGROUND_IDLE_SECONDS = 2.0
+
+
+class TokenBucket:
+    """Thread-safe token bucket; rate is bytes per second and 0 means unlimited.
+
+    reserve() always takes the tokens and returns how long the caller must wait, so
+    concurrent transfers queue behind each other instead of racing for the refill.
+    """
+
+    def __init__(self, rate=0, clock=time.monotonic):
+        self.clock = clock
+        self.rate = 0
+        self.capacity = 0.0
+        self._tokens = 0.0
+        self._updated = clock()
+        self._lock = threading.Lock()
+        self.configure(rate)
+
+    def configure(self, rate):
+        with self._lock:
+            self._refill()
+            self.rate = max(0, int(rate or 0))
+            self.capacity = max(self.rate * BURST_SECONDS, MIN_BURST_BYTES) if self.rate else 0.0
+            self._tokens = min(self._tokens, self.capacity) if self.rate else 0.0
+
+    def _refill(self):
+        now = self.clock()
+        if self.rate:
+            self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def reserve(self, amount):
+        with self._lock:
+            if not self.rate:
+                return 0.0
+            self._refill()
+            self._tokens -= max(0, amount)
+            return 0.0 if self._tokens >= 0 else -self._tokens / self.rate
+
+
+class BandwidthLimiter:
+    """Process-wide foreground and background download budgets.
+
+    Every transfer draws from the foreground bucket, which caps the launcher's total rate.
+    Background transfers additionally draw from their own bucket while foreground traffic
+    is active; once no foreground bytes have moved for FOREGROUND_IDLE_SECONDS they may use
+    the whole foreground budget, so an idle link is not left unused.
+    """
+
+    def __init__(self, clock=time.monotonic):
+        self.clock = clock
+        self.foreground = TokenBucket(clock=clock)
+        self.background = TokenBucket(clock=clock)
+        self._last_foreground = float("-inf")
+
+    def configure(self, foreground_bps=None, background_bps=None):
+        if foreground_bps is not None:
+            self.foreground.configure(foreground_bps)
+        if background_bps is not None:
+            self.background.configure(background_bps)
+
+    def reserve(self, amount, background=False):
+        now = self.clock()
+        if not background:
+            self._last_foreground = now
+            return self.foreground.reserve(amount)
+        delay = self.foreground.reserve(amount)
+        if now - self._last_foreground < FOREGROUND_IDLE_SECONDS:
+            delay = max(delay, self.background.reserve(amount))
+        return delay
+
+    def consume(self, amount, background=False):
+        """Blocking variant for requests-based transfers running in worker threads."""
+        delay = self.reserve(amount, background)
+        if delay > 0:
+            time.sleep(delay)
+
+    async def throttle(self, amount, background=False):
+        delay = self.reserve(amount, background)
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+
+BANDWIDTH_LIMITER = BandwidthLimiter()
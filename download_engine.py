@@ -0,0 +1,93 @@
+import asyncio
+import atexit
+import threading
+
+import aiohttp
+
+from download_telemetry import telemetry_trace_config
+from log_utils import get_logger
+
+
+REQUEST_TIMEOUT = aiohttp.ClientTimeout(total=None, sock_connect=20, sock_read=60)
+MAX_CONNECTIONS = 96
+KEEPALIVE_TIMEOUT = 60
+DNS_CACHE_TTL = 300
+logger = get_logger(__name__)
+
+
+class DownloadEngine:
+    """Process-wide event loop thread owning one pooled aiohttp session.
+
+    Download coroutines submitted through run() share the connector, so keep-alive
+    connections, TLS sessions and cached DNS answers survive between phases and between
+    tasks such as "vanilla, then Fabric, then Fabric API".
+    """
+
+    def __init__(self, max_connections=MAX_CONNECTIONS):
+        self.max_connections = max_connections
+        self._loop = None
+        self._thread = None
+        self._session = None
+        self._lock = threading.Lock()
+
+    def _ensure_loop(self):
+        with self._lock:
+            if self._loop is None:
+                loop = asyncio.new_event_loop()
+                thread = threading.Thread(target=loop.run_forever, name="mcgo-download-engine", daemon=True)
+                thread.start()
+                self._loop, self._thread = loop, thread
+                logger.info("Download engine started: max_connections=%d", self.max_connections)
+            return self._loop
+
+    def owns_running_loop(self):
+        try:
+            return self._loop is not None and asyncio.get_running_loop() is self._loop
+        except RuntimeError:
+            return False
+
+    def run(self, coroutine):
+        """Run coroutine on the engine loop and block the calling thread until it finishes."""
+        future = asyncio.run_coroutine_threadsafe(coroutine, self._ensure_loop())
+        try:
+            return future.result()
+        except BaseException:
+            future.cancel()
+            raise
+
+    def session(self):
+        """Return the shared ClientSession; only valid on the engine loop."""
+        if not self.owns_running_loop():
+            raise RuntimeError("DownloadEngine.session() must be called from the engine loop")
+        if self._session is None or self._session.closed:
+            self._session = aiohttp.ClientSession(
+                timeout=REQUEST_TIMEOUT,
+                connector=aiohttp.TCPConnector(
+                    limit=self.max_connections,
+                    ttl_dns_cache=DNS_CACHE_TTL,
+                    keepalive_timeout=KEEPALIVE_TIMEOUT,
+                ),
+                trace_configs=[telemetry_trace_config()],
+            )
+        return self._session
+
+    def close(self):
+        with self._lock:
+            loop, thread = self._loop, self._thread
+            self._loop = self._thread = None
+        if loop is None:
+            return
+        session, self._session = self._session, None
+        if session is not None and not session.closed:
+            try:
+                asyncio.run_coroutine_threadsafe(session.close(), loop).result(timeout=5)
+            except Exception as exc:
+                logger.debug("Failed to close download session cleanly: %s", exc)
+        loop.call_soon_threadsafe(loop.stop)
+        thread.join(timeout=5)
+        if not thread.is_alive():
+            loop.close()
+
+
+DOWNLOAD_ENGINE = DownloadEngine()
+atexit.register(DOWNLOAD_ENGINE.close)
@@ -0,0 +1,323 @@
+import asyncio
+import itertools
+import threading
+import time
+from collections import deque
+
+from log_utils import get_logger
+
+
+LANE_CORE = 0
+LANE_ASSETS = 1
+STREAM_CHUNK_JOBS = 512
+TUNING_WINDOW_SECONDS = 1.0
+TUNING_GAIN = 0.05
+TUNING_LATENCY_RISE = 2.0
+TUNING_LATENCY_SLACK = 0.05
+TUNING_BEST_DECAY = 0.9
+logger = get_logger(__name__)
+
+
+class DownloadCancelled(RuntimeError):
+    pass
+
+
+class CancelToken:
+    """Thread-safe cancellation flag that wakes waiting schedulers instead of being polled.
+
+    The token is callable so it can be passed anywhere a cancel_callback is accepted. A legacy
+    callback may be wrapped; it is still consulted on every check but cannot wake a scheduler.
+    """
+
+    def __init__(self, callback=None):
+        self._callback = callback
+        self._event = threading.Event()
+        self._listeners = []
+        self._lock = threading.Lock()
+
+    def __call__(self):
+        return self.cancelled
+
+    @property
+    def cancelled(self):
+        if self._event.is_set():
+            return True
+        if self._callback and self._callback():
+            self.cancel()
+            return True
+        return False
+
+    def cancel(self):
+        with self._lock:
+            if self._event.is_set():
+                return
+            self._event.set()
+            listeners = list(self._listeners)
+            self._listeners.clear()
+        for listener in listeners:
+            listener()
+
+    def add_listener(self, listener):
+        """Call listener once on cancellation, from the cancelling thread; returns a remover."""
+        with self._lock:
+            if not self._event.is_set():
+                self._listeners.append(listener)
+                return lambda: self._remove_listener(listener)
+        listener()
+        return lambda: None
+
+    def _remove_listener(self, listener):
+        with self._lock:
+            if listener in self._listeners:
+                self._listeners.remove(listener)
+
+    def raise_if_cancelled(self):
+        if self.cancelled:
+            raise DownloadCancelled("下载任务已取消")
+
+
+def as_cancel_token(cancel=None):
+    if isinstance(cancel, CancelToken):
+        return cancel
+    return CancelToken(cancel)
+
+
+class ConcurrencyController:
+    """AIMD concurrency limit for one lane, adjusted once per measurement window.
+
+    Starts at a few connections and doubles while aggregate throughput keeps improving, then
+    probes one connection at a time. 429 responses halve the limit; other errors and a
+    time-to-first-byte well above the best seen so far cut it by a quarter. The remembered
+    best throughput decays on plateaus so the controller re-probes when conditions change.
+    """
+
+    def __init__(self, minimum, maximum, initial=None, window=TUNING_WINDOW_SECONDS, clock=time.monotonic, name=""):
+        self.maximum = max(1, int(maximum))
+        self.minimum = max(1, min(int(minimum), self.maximum))
+        start = initial if initial is not None else max(self.minimum, 4)
+        self.limit = max(self.minimum, min(int(start), self.maximum))
+        self.window = window
+        self.clock = clock
+        self.name = name
+        self.on_change = None
+        self._slow_start = True
+        self._best_throughput = 0.0
+        self._base_latency = None
+        self._reset_window(clock())
+
+    def _reset_window(self, now):
+        self._window_started = now
+        self._bytes = 0
+        self._latencies = []
+        self._errors = 0
+        self._throttled = False
+
+    def record(self, byte_count=0, latency=None, error=False, throttled=False):
+        """Feed one finished transfer (or failed attempt) into the current window."""
+        self._bytes += max(0, byte_count)
+        if latency is not None:
+            self._latencies.append(latency)
+        self._errors += bool(error or throttled)
+        self._throttled = self._throttled or throttled
+        now = self.clock()
+        if now - self._window_started >= self.window:
+            self._evaluate(now)
+
+    def _evaluate(self, now):
+        throughput = self._bytes / max(now - self._window_started, 1e-6)
+        latency = sorted(self._latencies)[len(self._latencies) // 2] if self._latencies else None
+        if latency is not None and (self._base_latency is None or latency < self._base_latency):
+            self._base_latency = latency
+        if self._throttled:
+            self._set_limit(self.limit // 2, "throttled", throughput)
+        elif self._errors:
+            self._set_limit(self.limit * 3 // 4, "errors", throughput)
+        elif latency is not None and latency > self._base_latency * TUNING_LATENCY_RISE + TUNING_LATENCY_SLACK:
+            self._set_limit(self.limit * 3 // 4, "latency", throughput)
+        elif throughput > self._best_throughput * (1 + TUNING_GAIN):
+            self._best_throughput = throughput
+            self._set_limit(self.limit * 2 if self._slow_start else self.limit + 1, "throughput", throughput)
+        else:
+            self._slow_start = False
+            self._best_throughput *= TUNING_BEST_DECAY
+        self._reset_window(now)
+
+    def _set_limit(self, limit, reason, throughput):
+        limit = max(self.minimum, min(int(limit), self.maximum))
+        if limit < self.limit:
+            self._slow_start = False
+            self._best_throughput = throughput
+        if limit == self.limit:
+            return
+        logger.debug(
+            "Concurrency adjusted: lane=%s limit=%d->%d reason=%s throughput=%.0f",
+            self.name,
+            self.limit,
+            limit,
+            reason,
+            throughput,
+        )
+        self.limit = limit
+        if self.on_change:
+            self.on_change()
+
+
+class _Lane:
+    __slots__ = ("priority", "fixed_limit", "controller", "jobs", "sources", "active", "big_active", "on_drained")
+
+    def __init__(self, priority, limit, on_drained=None, controller=None):
+        self.priority = priority
+        self.fixed_limit = max(1, int(limit))
+        self.controller = controller
+        self.jobs = deque()
+        self.sources = deque()
+        self.active = 0
+        self.big_active = 0
+        self.on_drained = on_drained
+
+    @property
+    def limit(self):
+        return self.controller.limit if self.controller else self.fixed_limit
+
+    @property
+    def max_limit(self):
+        return self.controller.maximum if self.controller else self.fixed_limit
+
+    @property
+    def big_limit(self):
+        return max(1, self.limit // 4)
+
+
+class JobScheduler:
+    """Run jobs from priority lanes on a shared set of workers until every lane is drained.
+
+    A free worker takes from the highest priority lane that is below its concurrency limit, so
+    lower lanes fill the remaining worker slots instead of waiting for higher lanes to finish.
+    Within a lane a quarter of the slots start the largest pending files and the rest take the
+    smallest, which keeps long transfers running while small files fill the gaps. Jobs can be
+    submitted while the scheduler runs, or streamed from an iterator with submit_stream so only
+    a bounded window of them is materialized; call close() once no more jobs will arrive. The handler
+    is called as handler(job, queue_wait) with the seconds the job spent queued. A lane opened
+    with a ConcurrencyController follows its limit instead of a fixed concurrency.
+    """
+
+    def __init__(self, handler, cancel_token=None, size_key=lambda job: job.size):
+        self.handler = handler
+        self.cancel_token = cancel_token or CancelToken()
+        self.size_key = size_key
+        self._lanes = {}
+        self._closed = False
+        self._wakeup = None
+
+    def open_lane(self, priority, concurrency, on_drained=None, controller=None):
+        if controller:
+            controller.on_change = self._notify
+        self._lanes[priority] = _Lane(priority, concurrency, on_drained, controller)
+
+    def submit(self, priority, jobs):
+        self._enqueue(self._lanes[priority], jobs)
+        self._notify()
+
+    def submit_stream(self, priority, jobs, chunk_size=STREAM_CHUNK_JOBS):
+        """Queue an iterable lazily: chunk_size more jobs are pulled whenever the lane runs low."""
+        lane = self._lanes[priority]
+        lane.sources.append((iter(jobs), max(1, int(chunk_size))))
+        self._refill(lane)
+        self._notify()
+
+    def _enqueue(self, lane, jobs):
+        submitted_at = time.monotonic()
+        queued = [*lane.jobs, *((job, submitted_at) for job in jobs)]
+        lane.jobs = deque(sorted(queued, key=lambda item: self.size_key(item[0])))
+
+    def _refill(self, lane):
+        while lane.sources and len(lane.jobs) < lane.sources[0][1]:
+            source, chunk_size = lane.sources[0]
+            chunk = list(itertools.islice(source, chunk_size))
+            if len(chunk) < chunk_size:
+                lane.sources.popleft()
+            if chunk:
+                self._enqueue(lane, chunk)
+
+    def close(self):
+        self._closed = True
+        self._notify()
+
+    @property
+    def worker_count(self):
+        return max((lane.max_limit for lane in self._lanes.values()), default=1)
+
+    def _notify(self):
+        if self._wakeup is not None:
+            self._wakeup.set()
+
+    def _next(self):
+        for priority in sorted(self._lanes):
+            lane = self._lanes[priority]
+            if lane.active >= lane.limit:
+                continue
+            self._refill(lane)
+            if not lane.jobs:
+                continue
+            big = lane.big_active < lane.big_limit
+            job, submitted_at = lane.jobs.pop() if big else lane.jobs.popleft()
+            lane.active += 1
+            lane.big_active += big
+            return lane, job, big, time.monotonic() - submitted_at
+        return None
+
+    def _finished(self):
+        return self._closed and all(not lane.jobs and not lane.sources and not lane.active for lane in self._lanes.values())
+
+    async def _worker(self):
+        while True:
+            picked = self._next()
+            if picked is None:
+                if self._finished():
+                    return
+                self._wakeup.clear()
+                await self._wakeup.wait()
+                continue
+            lane, job, big, queue_wait = picked
+            try:
+                await self.handler(job, queue_wait)
+            finally:
+                lane.active -= 1
+                lane.big_active -= big
+                drained = not lane.jobs and not lane.sources and not lane.active
+                on_drained = lane.on_drained if drained else None
+                if on_drained:
+                    lane.on_drained = None
+                self._notify()
+            if on_drained:
+                on_drained()
+
+    async def run(self):
+        loop = asyncio.get_running_loop()
+        self._wakeup = asyncio.Event()
+        cancelled = loop.create_future()
+
+        def on_cancel():
+            try:
+                loop.call_soon_threadsafe(lambda: cancelled.done() or cancelled.set_result(True))
+            except RuntimeError:
+                pass
+
+        remove_listener = self.cancel_token.add_listener(on_cancel)
+        workers = [asyncio.create_task(self._worker()) for _ in range(self.worker_count)]
+        try:
+            pending = {*workers, cancelled}
+            while any(not task.done() for task in workers):
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                if cancelled in done:
+                    raise DownloadCancelled("下载任务已取消")
+                for task in done:
+                    if task.exception():
+                        raise task.exception()
+            self.cancel_token.raise_if_cancelled()
+        finally:
+            remove_listener()
+            cancelled.cancel()
+            for task in workers:
+                task.cancel()
+            await asyncio.gather(*workers, return_exceptions=True)
@@ -0,0 +1,176 @@
+import threading
+import time
+
+import aiohttp
+
+from log_utils import get_logger
+from mirror_scoreboard import url_host
+from storage_utils import save_json_atomic
+
+
+REPORT_VERSION = 1
+logger = get_logger(__name__)
+
+
+class JobMetrics:
+    __slots__ = (
+        "label",
+        "phase",
+        "size",
+        "outcome",
+        "queue_wait",
+        "connect_time",
+        "ttfb",
+        "transfer_seconds",
+        "bytes_fetched",
+        "bytes_reused",
+        "retries",
+        "mirror",
+    )
+
+    def __init__(self, label="", phase="", size=0, queue_wait=0.0):
+        self.label = label
+        self.phase = phase
+        self.size = size
+        self.outcome = ""
+        self.queue_wait = queue_wait
+        self.connect_time = 0.0
+        self.ttfb = None
+        self.transfer_seconds = 0.0
+        self.bytes_fetched = 0
+        self.bytes_reused = 0
+        self.retries = 0
+        self.mirror = ""
+
+    def record_transfer(self, url, ttfb, byte_count, transfer_seconds):
+        self.mirror = url_host(url)
+        self.ttfb = ttfb
+        self.bytes_fetched += byte_count
+        self.transfer_seconds += transfer_seconds
+
+
+def _percentile(values, fraction):
+    if not values:
+        return None
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+def _round(value, digits=4):
+    return None if value is None else round(value, digits)
+
+
+def _summarize(jobs):
+    outcomes = {}
+    for job in jobs:
+        outcomes[job.outcome] = outcomes.get(job.outcome, 0) + 1
+    fetched = [job for job in jobs if job.bytes_fetched]
+    ttfb = [job.ttfb for job in fetched if job.ttfb is not None]
+    connect = [job.connect_time for job in fetched if job.connect_time]
+    waits = [job.queue_wait for job in jobs]
+    transfer_seconds = sum(job.transfer_seconds for job in fetched)
+    bytes_fetched = sum(job.bytes_fetched for job in jobs)
+    return {
+        "jobs": len(jobs),
+        "outcomes": outcomes,
+        "bytes_fetched": bytes_fetched,
+        "bytes_reused": sum(job.bytes_reused for job in jobs),
+        "retries": sum(job.retries for job in jobs),
+        "new_connections": len(connect),
+        "connect_time_p50": _round(_percentile(connect, 0.5)),
+        "ttfb_p50": _round(_percentile(ttfb, 0.5)),
+        "ttfb_p95": _round(_percentile(ttfb, 0.95)),
+        "queue_wait_p50": _round(_percentile(waits, 0.5)),
+        "queue_wait_max": _round(max(waits, default=None)),
+        "per_job_bytes_per_second": _round(bytes_fetched / transfer_seconds, 1) if transfer_seconds else None,
+    }
+
+
+class DownloadTelemetry:
+    """Per-job download metrics aggregated per phase and per mirror for a JSON report."""
+
+    def __init__(self, kind="download", version_id=""):
+        self.kind = kind
+        self.version_id = version_id
+        self.started_at = time.time()
+        self._started = time.monotonic()
+        self._phase_spans = {}
+        self._jobs = []
+        self._lock = threading.Lock()
+
+    def start_job(self, job, phase, queue_wait=0.0):
+        return JobMetrics(job.label, phase, job.size, queue_wait)
+
+    def finish_job(self, metrics, outcome):
+        metrics.outcome = outcome
+        now = time.monotonic() - self._started
+        with self._lock:
+            self._jobs.append(metrics)
+            span = self._phase_spans.setdefault(metrics.phase, [now, now])
+            span[0] = min(span[0], now - metrics.transfer_seconds - (metrics.ttfb or 0.0))
+            span[1] = max(span[1], now)
+
+    def report(self, status="completed"):
+        elapsed = time.monotonic() - self._started
+        with self._lock:
+            jobs = list(self._jobs)
+            spans = {phase: list(span) for phase, span in self._phase_spans.items()}
+        phases = {}
+        for phase in sorted({job.phase for job in jobs}):
+            phase_jobs = [job for job in jobs if job.phase == phase]
+            summary = _summarize(phase_jobs)
+            start, end = spans.get(phase, (0.0, 0.0))
+            summary["wall_seconds"] = _round(max(0.0, end - start), 3)
+            summary["bytes_per_second"] = _round(summary["bytes_fetched"] / (end - start), 1) if end > start else None
+            phases[phase] = summary
+        mirrors = {}
+        for host in sorted({job.mirror for job in jobs if job.mirror}):
+            mirrors[host] = _summarize([job for job in jobs if job.mirror == host])
+        total = _summarize(jobs)
+        total["wall_seconds"] = _round(elapsed, 3)
+        total["bytes_per_second"] = _round(total["bytes_fetched"] / elapsed, 1) if elapsed else None
+        return {
+            "version": REPORT_VERSION,
+            "kind": self.kind,
+            "version_id": self.version_id,
+            "status": status,
+            "started_at": time.strftime("%Y-%m-%dT%H:%M:%S", time.localtime(self.started_at)),
+            "total": total,
+            "phases": phases,
+            "mirrors": mirrors,
+        }
+
+    def save(self, path, status="completed"):
+        report = self.report(status)
+        try:
+            save_json_atomic(path, report, indent=2)
+        except OSError as exc:
+            logger.warning("Failed to save download report: path=%s error=%s", path, exc)
+            return report
+        logger.info(
+            "Download report saved: kind=%s version=%s status=%s jobs=%d path=%s",
+            self.kind,
+            self.version_id,
+            status,
+            report["total"]["jobs"],
+            path,
+        )
+        return report
+
+
+def telemetry_trace_config():
+    """aiohttp trace hooks charging new-connection setup time to the JobMetrics in trace_request_ctx."""
+
+    async def on_connection_create_start(session, context, params):
+        context.connect_started = time.monotonic()
+
+    async def on_connection_create_end(session, context, params):
+        metrics = context.trace_request_ctx
+        started = getattr(context, "connect_started", None)
+        if isinstance(metrics, JobMetrics) and started is not None:
+            metrics.connect_time += time.monotonic() - started
+
+    trace_config = aiohttp.TraceConfig()
+    trace_config.on_connection_create_start.append(on_connection_create_start)
+    trace_config.on_connection_create_end.append(on_connection_create_end)
+    return trace_config
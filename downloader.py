@@ -5,27 +5,47 @@ import json
 import os
 import platform
 import shutil
+import threading
 import time
-import zipfile
-from dataclasses import dataclass
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, field
+from stat import S_ISREG
 
 import aiohttp
 
+from bandwidth import BANDWIDTH_LIMITER, BandwidthLimiter
+from download_engine import DOWNLOAD_ENGINE, REQUEST_TIMEOUT
+from download_scheduler import LANE_ASSETS, LANE_CORE, CancelToken, ConcurrencyController, DownloadCancelled, JobScheduler, as_cancel_token
+from download_telemetry import DownloadTelemetry, telemetry_trace_config
+from install_journal import InstallTransaction, recover_transactions
 from log_utils import get_logger
-from storage_utils import save_json_atomic
+from mirror_scoreboard import MIRROR_SCOREBOARD, MirrorScoreboard
+from natives_cache import NATIVES_CACHE_DIR, NativesCache, sync_natives_directory
+from object_store import ObjectStore
+from storage_utils import load_json_file, save_json_atomic
+from verify_index import VerifyIndex
 
 CHUNK_SIZE = 128 * 1024
 MAX_CORE_CONCURRENCY = 12
 MAX_ASSET_CONCURRENCY = 24
-REQUEST_TIMEOUT = aiohttp.ClientTimeout(total=None, sock_connect=20, sock_read=60)
+MIN_CORE_CONCURRENCY = 2
+MIN_ASSET_CONCURRENCY = 4
+DEFAULT_HASH_WORKERS = max(2, min(8, os.cpu_count() or 2))
+RACE_MIN_BYTES = 8 * 1024 * 1024
+BMCLAPI_ROOT = "https://bmclapi2.bangbang93.com"
+ASSET_BASE_URL = "https://resources.download.minecraft.net"
+DEFERRED_ASSETS_FILE = os.path.join(".mcgo", "deferred-assets.json")
+DEFERRABLE_ASSET_PREFIXES = ("minecraft/sounds/", "minecraft/lang/")
+CRITICAL_LANGUAGES = {"en_us", "zh_cn"}
+_REUSE_LABELS = {"existing": "已存在", "store": "共享存储", "cache": "本地复用"}
+_hash_pools = {}
+_hash_pool_lock = threading.Lock()
+_deferred_lock = threading.Lock()
 logger = get_logger(__name__)
 
 
-class DownloadCancelled(RuntimeError):
-    pass
-
-
-@dataclass
+@dataclass(slots=True)
 class DownloadJob:
     url: str
     file_path: str
@@ -35,6 +55,59 @@ class DownloadJob:
     label: str = ""
 
 
+class AssetJob:
+    """Compact job for one asset object; url and paths are derived from the hash on access.
+
+    Modern indexes hold thousands of objects, so only the hash and size are stored per job
+    while the game directory and mirror strings are shared by every job of a run.
+    """
+
+    __slots__ = ("game_directory", "mirror_source", "sha1", "size")
+
+    def __init__(self, game_directory, mirror_source, sha1, size=0):
+        self.game_directory = game_directory
+        self.mirror_source = mirror_source
+        self.sha1 = sha1
+        self.size = size
+
+    @property
+    def relative_path(self):
+        return os.path.join("assets", "objects", self.sha1[:2], self.sha1)
+
+    @property
+    def file_path(self):
+        return os.path.join(self.game_directory, "assets", "objects", self.sha1[:2], self.sha1)
+
+    @property
+    def url(self):
+        return _rewrite_url(f"{ASSET_BASE_URL}/{self.sha1[:2]}/{self.sha1}", self.mirror_source)
+
+    @property
+    def label(self):
+        return self.sha1
+
+
+@dataclass
+class DownloadContext:
+    """State shared by every job of one download run."""
+
+    session: object
+    progress: "DownloadProgress"
+    target_game_dir: str
+    mirror_source: str = ""
+    cache_dirs: list = field(default_factory=list)
+    background: bool = False
+    limiter: BandwidthLimiter = BANDWIDTH_LIMITER
+    cache_strategy: str = "reuse"
+    cancel_token: CancelToken = field(default_factory=CancelToken)
+    object_store: ObjectStore = None
+    verify_index: VerifyIndex = None
+    hash_executor: ThreadPoolExecutor = None
+    scoreboard: MirrorScoreboard = None
+    telemetry: DownloadTelemetry = None
+    controllers: dict = field(default_factory=dict)
+
+
 class DownloadProgress:
     def __init__(self, callback=None, emit_interval=0.2):
         self.callback = callback
@@ -50,9 +123,11 @@ class DownloadProgress:
         self._last_speed_calc = self._last_emit
         self._network_window_bytes = 0
         self._speed_bytes = 0.0
+        self._transfer_bytes = {}
 
     def add_totals(self, total_bytes, total_files):
-        self.total_bytes += max(0, int(total_bytes or 0))
+        # total_bytes may be negative to correct an earlier estimate.
+        self.total_bytes = max(0, self.total_bytes + int(total_bytes or 0))
         self.total_files += max(0, int(total_files or 0))
         self.emit(force=True)
 
@@ -66,12 +141,24 @@ class DownloadProgress:
         self.current_file = current_file
         self.emit()
 
-    def advance_network(self, byte_count):
+    def advance_network(self, byte_count, key=None):
         byte_count = max(0, int(byte_count or 0))
         self.ready_bytes += byte_count
         self._network_window_bytes += byte_count
+        if key is not None:
+            self._transfer_bytes[key] = self._transfer_bytes.get(key, 0) + byte_count
         self.emit()
 
+    def sync_transfer(self, key, byte_count):
+        """Make the bytes counted for one transfer match what is on disk (resumed, restarted or discarded parts)."""
+        byte_count = max(0, int(byte_count or 0))
+        self.ready_bytes = max(0, self.ready_bytes + byte_count - self._transfer_bytes.get(key, 0))
+        self._transfer_bytes[key] = byte_count
+        self.emit()
+
+    def end_transfer(self, key):
+        self._transfer_bytes.pop(key, None)
+
     def advance_reused(self, byte_count):
         self.ready_bytes += max(0, int(byte_count or 0))
         self.reused_files += 1
@@ -138,18 +225,39 @@ def _sha1_file(path):
     return sha1.hexdigest()
 
 
-def _matches_file(path, expected_size=0, expected_sha1=""):
-    if not os.path.exists(path):
+def _hash_executor(workers=0):
+    """Return the shared verification pool for the requested parallelism (0 means DEFAULT_HASH_WORKERS)."""
+    workers = max(1, int(workers or DEFAULT_HASH_WORKERS))
+    with _hash_pool_lock:
+        executor = _hash_pools.get(workers)
+        if executor is None:
+            executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="mcgo-verify")
+            _hash_pools[workers] = executor
+        return executor
+
+
+def _matches_file(path, expected_size=0, expected_sha1="", verify_index=None):
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return False
+    if not S_ISREG(stat.st_mode):
         return False
-    if expected_size and _file_size(path) != expected_size:
+    if expected_size and stat.st_size != expected_size:
         return False
     if expected_sha1:
+        if verify_index and verify_index.is_verified(path, stat, expected_sha1):
+            return True
         try:
             if _sha1_file(path).lower() != expected_sha1.lower():
+                if verify_index:
+                    verify_index.discard(path)
                 return False
         except OSError:
             return False
-    return os.path.isfile(path)
+        if verify_index:
+            verify_index.record(path, expected_sha1, stat)
+    return True
 
 
 def _candidate_cache_dirs(game_directory):
@@ -172,7 +280,7 @@ def _candidate_cache_dirs(game_directory):
     return candidates
 
 
-def _try_copy_from_cache(job, cache_dirs, target_game_dir):
+def _try_copy_from_cache(job, cache_dirs, target_game_dir, verify_index=None):
     target_root = os.path.abspath(target_game_dir)
     for cache_dir in cache_dirs:
         cache_root = os.path.abspath(cache_dir)
@@ -183,17 +291,23 @@ def _try_copy_from_cache(job, cache_dirs, target_game_dir):
         if not _matches_file(source_path, job.size, job.sha1):
             continue
 
+        # Other game directories belong to the user and may be edited in place, so they are
+        # copied; hardlinks are reserved for the content-addressed ObjectStore.
         _ensure_parent(job.file_path)
         shutil.copy2(source_path, job.file_path)
+        if verify_index:
+            verify_index.record(job.file_path, job.sha1)
         logger.debug("Reused cached file: %s <- %s", job.relative_path, source_path)
         return True
 
     return False
 
 
-def _rewrite_url(url, mirror_source):
-    bmclapi = "https://bmclapi2.bangbang93.com"
-    if mirror_source == bmclapi:
+def _rewrite_url(url, mirror_source, mirror_roots=()):
+    """Rewrite url for mirror_source; mirror_roots lists extra BMCLAPI-compatible mirror roots."""
+    bmclapi_layout = [BMCLAPI_ROOT, *mirror_roots]
+    if mirror_source in bmclapi_layout:
+        url = _rewrite_url(url, "", mirror_roots)
         replacements = {
             "https://piston-data.mojang.com": mirror_source,
             "https://launcher.mojang.com": mirror_source,
@@ -204,11 +318,11 @@ def _rewrite_url(url, mirror_source):
             "https://resources.download.minecraft.net": f"{mirror_source}/assets",
         }
     else:
-        replacements = {
-            f"{bmclapi}/maven": "https://libraries.minecraft.net",
-            f"{bmclapi}/assets": "https://resources.download.minecraft.net",
-            bmclapi: "https://piston-data.mojang.com",
-        }
+        replacements = {}
+        for root in bmclapi_layout:
+            replacements[f"{root}/maven"] = "https://libraries.minecraft.net"
+            replacements[f"{root}/assets"] = "https://resources.download.minecraft.net"
+            replacements[root] = "https://piston-data.mojang.com"
     for source, target in replacements.items():
         if url.startswith(source):
             return url.replace(source, target, 1)
@@ -217,22 +331,25 @@ def _rewrite_url(url, mirror_source):
 
 def _alternate_mirror(mirror_source):
     if mirror_source == "https://launchermeta.mojang.com":
-        return "https://bmclapi2.bangbang93.com"
-    if mirror_source == "https://bmclapi2.bangbang93.com":
+        return BMCLAPI_ROOT
+    if mirror_source == BMCLAPI_ROOT:
         return "https://launchermeta.mojang.com"
     return ""
 
 
-def _candidate_urls(url, mirror_source):
+def _candidate_urls(url, mirror_source, scoreboard=None, size=0):
+    extra_mirrors = scoreboard.extra_mirrors if scoreboard else []
     urls = []
-    for source in (mirror_source, _alternate_mirror(mirror_source)):
+    for source in (mirror_source, _alternate_mirror(mirror_source), *extra_mirrors):
         if not source:
             continue
-        candidate = _rewrite_url(url, source)
+        candidate = _rewrite_url(url, source, extra_mirrors)
         if candidate not in urls:
             urls.append(candidate)
     if url not in urls:
         urls.append(url)
+    if scoreboard:
+        urls = scoreboard.rank(urls, size)
     return urls
 
 
@@ -314,29 +431,13 @@ def _check_cancel(cancel_callback=None):
         raise DownloadCancelled("下载任务已取消")
 
 
-async def _throttle_download(progress, speed_limit_bps, started_at):
-    if not speed_limit_bps:
-        return
-    expected_elapsed = progress.ready_bytes / max(speed_limit_bps, 1)
-    actual_elapsed = time.monotonic() - started_at
-    delay = expected_elapsed - actual_elapsed
-    if delay > 0:
-        await asyncio.sleep(min(delay, 1.0))
-
-
-async def _download_with_retries(session, job, progress, semaphore, retries=5, mirror_source="", speed_limit_bps=0, cancel_callback=None):
+async def _download_with_retries(context, job, progress, retries=5, metrics=None):
     for attempt in range(retries):
+        if metrics:
+            metrics.retries = attempt
         try:
-            _check_cancel(cancel_callback)
-            async with semaphore:
-                await _download_single(
-                    session,
-                    job,
-                    progress,
-                    mirror_source=mirror_source,
-                    speed_limit_bps=speed_limit_bps,
-                    cancel_callback=cancel_callback,
-                )
+            _check_cancel(context.cancel_token)
+            await _download_single(context, job, progress, metrics)
             return
         except DownloadCancelled:
             raise
@@ -361,116 +462,401 @@ async def _download_with_retries(session, job, progress, semaphore, retries=5, m
             await asyncio.sleep(min(2 ** attempt, 5))
 
 
-async def _download_single(session, job, progress, mirror_source="", speed_limit_bps=0, cancel_callback=None):
-    _check_cancel(cancel_callback)
+def _part_path(path):
+    return f"{path}.part"
+
+
+def _remove_file(path):
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
+    except OSError:
+        logger.debug("Failed to remove file: %s", path)
+
+
+def _resume_offset(job, part_path):
+    """Bytes of part_path that can be resumed; only jobs with a SHA1 are resumed since the result is verified."""
+    offset = _file_size(part_path)
+    if offset and (not job.sha1 or (job.size and offset > job.size)):
+        _remove_file(part_path)
+        return 0
+    return offset
+
+
+def _finalize_part(job, part_path):
+    """Check a completed part file and atomically move it into place."""
+    size = _file_size(part_path)
+    if job.size and size != job.size:
+        raise RuntimeError(f"文件大小不匹配：期望 {job.size}，实际 {size}")
+    if job.sha1 and _sha1_file(part_path).lower() != job.sha1.lower():
+        raise RuntimeError("SHA1 校验失败")
+    os.replace(part_path, job.file_path)
+
+
+async def _open_transfer(session, url, offset, metrics=None):
+    """Send the request and read the first chunk so callers can compare time-to-first-byte."""
+    started_at = time.monotonic()
+    headers = {"Range": f"bytes={offset}-"} if offset else None
+    response = await session.get(url, headers=headers, trace_request_ctx=metrics)
+    try:
+        response.raise_for_status()
+        first_chunk = await response.content.read(CHUNK_SIZE)
+    except BaseException:
+        response.release()
+        raise
+    return url, response, first_chunk, time.monotonic() - started_at
+
+
+def _record_mirror_failure(scoreboard, url, exc):
+    status = getattr(exc, "status", 0)
+    if scoreboard and status != 404:
+        scoreboard.record_failure(url, status)
+
+
+async def _race_transfers(session, urls, offset, scoreboard=None, metrics=None):
+    """Open the same file on several mirrors and keep whichever delivers its first bytes first."""
+    tasks = {asyncio.create_task(_open_transfer(session, url, offset, metrics)): url for url in urls}
+    winner = None
+    errors = []
+    try:
+        for future in asyncio.as_completed(list(tasks)):
+            try:
+                winner = await future
+                break
+            except Exception as exc:
+                errors.append(exc)
+    finally:
+        for task, url in tasks.items():
+            if not task.done():
+                task.cancel()
+        for task, url in tasks.items():
+            try:
+                result = await task
+            except BaseException as exc:
+                if not isinstance(exc, asyncio.CancelledError):
+                    _record_mirror_failure(scoreboard, url, exc)
+                continue
+            if winner is None or result[1] is not winner[1]:
+                result[1].release()
+    if winner is None:
+        raise errors[-1] if errors else RuntimeError("所有镜像均无响应")
+    logger.debug("Mirror race won: url=%s ttfb=%.3f candidates=%d", winner[0], winner[3], len(urls))
+    return winner
+
+
+async def _download_single(context, job, progress, metrics=None):
+    session = context.session
+    scoreboard = context.scoreboard
+    controller = context.controllers.get(_job_phase(job))
+    _check_cancel(context.cancel_token)
     _ensure_parent(job.file_path)
     progress.set_current_file(job.label)
     logger.debug("Downloading file: label=%s size=%s url=%s target=%s", job.label, job.size, job.url, job.file_path)
 
+    loop = asyncio.get_running_loop()
+    part_path = _part_path(job.file_path)
     errors = []
-    started_at = time.monotonic()
-    for candidate_url in _candidate_urls(job.url, mirror_source):
+    candidates = _candidate_urls(job.url, context.mirror_source, scoreboard, job.size)
+    while candidates:
+        offset = _resume_offset(job, part_path)
+        progress.sync_transfer(part_path, offset)
+        if scoreboard and job.size - offset >= RACE_MIN_BYTES:
+            racing = [url for url in candidates if scoreboard.is_healthy(url)][:2] or candidates[:1]
+        else:
+            racing = candidates[:1]
+        candidates = [url for url in candidates if url not in racing]
+        active_url = racing[0] if len(racing) == 1 else ""
         try:
-            _check_cancel(cancel_callback)
-            async with session.get(candidate_url) as response:
-                response.raise_for_status()
-                with open(job.file_path, "wb") as file_handle:
-                    async for chunk in response.content.iter_chunked(CHUNK_SIZE):
-                        _check_cancel(cancel_callback)
-                        if not chunk:
-                            continue
-                        file_handle.write(chunk)
-                        progress.advance_network(len(chunk))
-                        await _throttle_download(progress, speed_limit_bps, started_at)
+            _check_cancel(context.cancel_token)
+            if not (job.size and offset == job.size):
+                if len(racing) > 1:
+                    candidate_url, response, first_chunk, ttfb = await _race_transfers(session, racing, offset, scoreboard, metrics)
+                else:
+                    candidate_url, response, first_chunk, ttfb = await _open_transfer(session, racing[0], offset, metrics)
+                active_url = candidate_url
+                transfer_started = time.monotonic()
+                written = 0
+                try:
+                    resumed = bool(offset) and response.status == 206
+                    if resumed:
+                        logger.debug("Resuming download: label=%s offset=%d url=%s", job.label, offset, candidate_url)
+                    else:
+                        progress.sync_transfer(part_path, 0)
+                    with open(part_path, "ab" if resumed else "wb") as file_handle:
+                        chunk = first_chunk
+                        while chunk:
+                            _check_cancel(context.cancel_token)
+                            file_handle.write(chunk)
+                            written += len(chunk)
+                            progress.advance_network(len(chunk), key=part_path)
+                            await context.limiter.throttle(len(chunk), context.background)
+                            chunk = await response.content.read(CHUNK_SIZE)
+                finally:
+                    response.release()
+                    if metrics:
+                        metrics.record_transfer(candidate_url, ttfb, written, time.monotonic() - transfer_started)
+                if scoreboard:
+                    scoreboard.record_success(candidate_url, ttfb, written, time.monotonic() - transfer_started)
+                if controller:
+                    controller.record(written, ttfb)
+            try:
+                await loop.run_in_executor(None, _finalize_part, job, part_path)
+            except RuntimeError:
+                _remove_file(part_path)
+                raise
+            progress.end_transfer(part_path)
             logger.debug("Downloaded file: label=%s bytes=%s target=%s", job.label, _file_size(job.file_path), job.file_path)
             return
+        except DownloadCancelled:
+            raise
         except Exception as exc:
-            errors.append(f"{candidate_url}: {exc}")
-            logger.warning("Download source failed: label=%s url=%s error=%s", job.label, candidate_url, exc)
-            try:
-                if os.path.exists(job.file_path):
-                    os.remove(job.file_path)
-            except OSError:
-                logger.debug("Failed to remove partial file: %s", job.file_path)
+            if offset and getattr(exc, "status", 0) == 416:
+                _remove_file(part_path)
+            if active_url:
+                _record_mirror_failure(scoreboard, active_url, exc)
+            if controller and getattr(exc, "status", 0) != 404:
+                controller.record(error=True, throttled=getattr(exc, "status", 0) == 429)
+            errors.append(f"{' | '.join(racing)}: {exc}")
+            logger.warning("Download source failed: label=%s url=%s error=%s", job.label, racing, exc)
     raise RuntimeError("；".join(errors))
 
 
-async def _process_job(session, job, progress, semaphore, cache_dirs, target_game_dir, mirror_source="", speed_limit_bps=0, cache_strategy="reuse", cancel_callback=None):
-    _check_cancel(cancel_callback)
-    if _matches_file(job.file_path, job.size, job.sha1):
-        progress.set_current_file(f"{job.label}（已存在）")
-        progress.advance_reused(job.size or _file_size(job.file_path))
-        progress.finish_file()
+def _open_object_store(object_store_dir="", cache_strategy="reuse"):
+    if cache_strategy != "reuse":
+        return None
+    return ObjectStore(object_store_dir)
+
+
+def _reuse_local_file(job, cache_dirs, target_game_dir, cache_strategy="reuse", object_store=None, verify_index=None):
+    """Blocking half of _process_job: return how the job was satisfied locally, or "" if it needs a download."""
+    if _matches_file(job.file_path, job.size, job.sha1, verify_index):
         logger.debug("File already valid: %s", job.relative_path)
-        return "reused"
+        if object_store:
+            object_store.ingest(job.file_path, job.sha1, job.size)
+        return "existing"
+
+    if object_store and object_store.verify(job.sha1, job.size):
+        try:
+            object_store.materialize(job.sha1, job.file_path)
+        except OSError as exc:
+            logger.warning("Failed to materialize stored object: label=%s sha1=%s error=%s", job.label, job.sha1, exc)
+        else:
+            if verify_index:
+                verify_index.record(job.file_path, job.sha1)
+            return "store"
+
+    if cache_strategy == "reuse" and _try_copy_from_cache(job, cache_dirs, target_game_dir, verify_index):
+        if object_store:
+            object_store.ingest(job.file_path, job.sha1, job.size)
+        return "cache"
+    return ""
 
-    if cache_strategy == "reuse" and _try_copy_from_cache(job, cache_dirs, target_game_dir):
-        progress.set_current_file(f"{job.label}（本地复用）")
-        progress.advance_reused(job.size or _file_size(job.file_path))
-        progress.finish_file()
-        return "reused"
 
-    await _download_with_retries(
-        session,
+def _record_downloaded_file(job, object_store=None, verify_index=None):
+    # _finalize_part already checked the SHA1, so the file can be recorded without re-hashing.
+    if verify_index:
+        verify_index.record(job.file_path, job.sha1)
+    if object_store:
+        object_store.ingest(job.file_path, job.sha1, job.size)
+
+
+async def _process_job(context, job, progress=None, metrics=None):
+    progress = progress or context.progress
+    _check_cancel(context.cancel_token)
+    loop = asyncio.get_running_loop()
+    reused = await loop.run_in_executor(
+        context.hash_executor,
+        _reuse_local_file,
         job,
-        progress,
-        semaphore,
-        mirror_source=mirror_source,
-        speed_limit_bps=speed_limit_bps,
-        cancel_callback=cancel_callback,
+        context.cache_dirs,
+        context.target_game_dir,
+        context.cache_strategy,
+        context.object_store,
+        context.verify_index,
     )
+    if reused:
+        reused_bytes = job.size or _file_size(job.file_path)
+        progress.set_current_file(f"{job.label}（{_REUSE_LABELS[reused]}）")
+        progress.advance_reused(reused_bytes)
+        progress.finish_file()
+        if metrics:
+            metrics.bytes_reused = reused_bytes
+        return "reused"
+
+    await _download_with_retries(context, job, progress, metrics=metrics)
+    if job.sha1 and (context.object_store or context.verify_index):
+        await loop.run_in_executor(
+            context.hash_executor,
+            _record_downloaded_file,
+            job,
+            context.object_store,
+            context.verify_index,
+        )
     progress.finish_file()
     return "downloaded"
 
 
-async def _run_jobs(session, jobs, progress, concurrency, cache_dirs, target_game_dir, mirror_source="", speed_limit_bps=0, cache_strategy="reuse", cancel_callback=None):
-    if not jobs:
+async def _run_job(context, job, queue_wait=0.0, phase=""):
+    """Scheduler handler body: process job and record its metrics when the run collects telemetry."""
+    if context.telemetry is None:
+        return await _process_job(context, job)
+    metrics = context.telemetry.start_job(job, phase or _job_phase(job), queue_wait)
+    outcome = "failed"
+    try:
+        outcome = await _process_job(context, job, metrics=metrics)
+        return outcome
+    except DownloadCancelled:
+        outcome = "cancelled"
+        raise
+    finally:
+        context.telemetry.finish_job(metrics, outcome)
+
+
+def _job_phase(job):
+    return "assets" if isinstance(job, AssetJob) else "core"
+
+
+def _stage_version_jobs(transactions, jobs, verify_index=None):
+    """Stage the jobs under versions/<id>/ whose final file is not valid yet; returns (job, final path)."""
+    pending = [job for job in jobs if not _matches_file(job.file_path, job.size, job.sha1, verify_index)]
+    return [item for transaction in transactions for item in transaction.stage_jobs(pending)]
+
+
+def _commit_version_jobs(transactions, staged, verify_index=None):
+    for transaction in transactions:
+        transaction.commit()
+    for job, final_path in staged:
+        job.file_path = final_path
+        if verify_index and job.sha1 and os.path.isfile(final_path):
+            # os.replace keeps the inode and mtime, so the staged verification still holds.
+            verify_index.record(final_path, job.sha1)
+
+
+def download_report_path(game_directory, version_id, kind="download"):
+    return os.path.join(game_directory, "versions", version_id, f"{kind}-report.json")
+
+
+@asynccontextmanager
+async def _client_session(max_connections):
+    """Yield the engine's pooled session, or a private one when running outside the engine loop."""
+    if DOWNLOAD_ENGINE.owns_running_loop():
+        yield DOWNLOAD_ENGINE.session()
         return
-    semaphore = asyncio.Semaphore(concurrency)
-    queue = asyncio.Queue()
-    for job in jobs:
-        queue.put_nowait(job)
+    async with aiohttp.ClientSession(
+        timeout=REQUEST_TIMEOUT,
+        connector=aiohttp.TCPConnector(limit=max_connections * 2, ttl_dns_cache=300),
+        trace_configs=[telemetry_trace_config()],
+    ) as session:
+        yield session
 
-    async def worker():
-        while True:
-            _check_cancel(cancel_callback)
-            try:
-                job = queue.get_nowait()
-            except asyncio.QueueEmpty:
-                return
-            try:
-                await _process_job(
-                    session,
-                    job,
-                    progress,
-                    semaphore,
-                    cache_dirs,
-                    target_game_dir,
-                    mirror_source=mirror_source,
-                    speed_limit_bps=speed_limit_bps,
-                    cache_strategy=cache_strategy,
-                    cancel_callback=cancel_callback,
-                )
-            finally:
-                queue.task_done()
 
-    workers = [asyncio.create_task(worker()) for _ in range(min(max(1, concurrency), len(jobs)))]
-    try:
-        while True:
-            _check_cancel(cancel_callback)
-            done = [task for task in workers if task.done()]
-            for task in done:
-                exc = task.exception()
-                if exc:
-                    raise exc
-            if queue.empty() and all(task.done() for task in workers):
-                break
-            await asyncio.sleep(0.05)
-        _check_cancel(cancel_callback)
-    finally:
-        for task in workers:
-            task.cancel()
-        await asyncio.gather(*workers, return_exceptions=True)
+def _open_context(session, progress, game_directory, mirror_source, verify_index, speed_limit_kbps=0, background_speed_limit_kbps=0, background=False, cache_strategy="reuse", cancel_token=None, cancel_callback=None, object_store_dir="", hash_workers=0, extra_mirrors=(), telemetry=None, controllers=None):
+    MIRROR_SCOREBOARD.configure(extra_mirrors)
+    BANDWIDTH_LIMITER.configure(int(speed_limit_kbps or 0) * 1024, int(background_speed_limit_kbps or 0) * 1024)
+    return DownloadContext(
+        session=session,
+        progress=progress,
+        target_game_dir=game_directory,
+        mirror_source=mirror_source,
+        cache_dirs=_candidate_cache_dirs(game_directory),
+        background=background,
+        cache_strategy=cache_strategy,
+        cancel_token=cancel_token or as_cancel_token(cancel_callback),
+        object_store=_open_object_store(object_store_dir, cache_strategy),
+        verify_index=verify_index,
+        hash_executor=_hash_executor(hash_workers),
+        scoreboard=MIRROR_SCOREBOARD,
+        telemetry=telemetry,
+        controllers=controllers or {},
+    )
+
+
+def _concurrency_controllers(auto_concurrency, max_core_concurrency=MAX_CORE_CONCURRENCY, max_asset_concurrency=MAX_ASSET_CONCURRENCY, min_core_concurrency=MIN_CORE_CONCURRENCY, min_asset_concurrency=MIN_ASSET_CONCURRENCY):
+    """Per-phase AIMD controllers bounded by the configured thread counts; empty when tuning is off."""
+    if not auto_concurrency:
+        return {}
+    return {
+        "core": ConcurrencyController(min_core_concurrency, max_core_concurrency, name="core"),
+        "assets": ConcurrencyController(min_asset_concurrency, max_asset_concurrency, name="assets"),
+    }
+
+
+def _load_asset_index(asset_index_path):
+    with open(asset_index_path, "r", encoding="utf-8") as file_handle:
+        return json.load(file_handle)
+
+
+def _read_asset_jobs(asset_index_path, game_directory, mirror_source):
+    return _build_asset_jobs(_load_asset_index(asset_index_path), game_directory, mirror_source)
+
+
+def _stream_asset_jobs(asset_index_path, game_directory, mirror_source, fast_first_launch=False):
+    """Return (lazy asset job iterator, object count, bytes, deferred object count).
+
+    The index is still parsed as a whole, but the jobs are only created as the scheduler
+    pulls them, so at most a window of AssetJob objects exists at a time.
+    """
+    asset_index_json = _load_asset_index(asset_index_path)
+    deferred_count = 0
+    if fast_first_launch:
+        objects, deferred = split_deferred_assets(asset_index_json)
+        asset_index_json = {"objects": objects}
+        deferred_count = len(deferred)
+    sizes = {}
+    for info in asset_index_json.get("objects", {}).values():
+        sizes.setdefault(info["hash"], info.get("size", 0))
+    jobs = _iter_asset_jobs(asset_index_json, game_directory, mirror_source)
+    return jobs, len(sizes), sum(sizes.values()), deferred_count
+
+
+def _schedule_game_files(context, version_json, core_jobs, asset_index_job, max_core_concurrency, max_asset_concurrency, asset_phase, fast_first_launch=False):
+    """Build a scheduler running core files in the priority lane and assets behind them.
+
+    The asset index is fetched alongside the core files; once it is on disk its objects are
+    queued in the asset lane, whose workers fill whatever slots the core lane leaves free.
+    Asset bytes are reserved up front from assetIndex.totalSize so the progress bar does not
+    jump back when the asset jobs arrive. With fast_first_launch only critical assets are
+    queued and the rest are recorded for download_assets to fetch after launch.
+    """
+    progress = context.progress
+    reserved_bytes = 0
+    if asset_index_job and not fast_first_launch:
+        reserved_bytes = int(version_json.get("assetIndex", {}).get("totalSize") or 0)
+
+    async def handle(job, queue_wait):
+        await _run_job(context, job, queue_wait)
+        if job is asset_index_job:
+            # Parsing a large index off the loop keeps the core transfers streaming meanwhile.
+            asset_jobs, asset_count, asset_bytes, deferred_count = await asyncio.get_running_loop().run_in_executor(
+                None,
+                _stream_asset_jobs,
+                asset_index_job.file_path,
+                context.target_game_dir,
+                context.mirror_source,
+                fast_first_launch,
+            )
+            if fast_first_launch:
+                await asyncio.get_running_loop().run_in_executor(
+                    None, _set_deferred_assets, context.target_game_dir, version_json["assetIndex"]["id"], deferred_count
+                )
+            logger.info("Asset jobs prepared: asset_jobs=%d bytes=%d fast_first_launch=%s", asset_count, asset_bytes, fast_first_launch)
+            progress.add_totals(asset_bytes - reserved_bytes, asset_count)
+            scheduler.submit_stream(LANE_ASSETS, asset_jobs)
+
+    core_lane = [job for job in [*core_jobs, asset_index_job] if job]
+    scheduler = JobScheduler(handle, context.cancel_token)
+    scheduler.open_lane(
+        LANE_CORE,
+        max_core_concurrency,
+        on_drained=lambda: progress.set_phase(asset_phase),
+        controller=context.controllers.get("core"),
+    )
+    scheduler.open_lane(LANE_ASSETS, max_asset_concurrency, controller=context.controllers.get("assets"))
+    progress.add_totals(sum(job.size for job in core_lane) + reserved_bytes, len(core_lane))
+    scheduler.submit(LANE_CORE, core_lane)
+    scheduler.close()
+    return scheduler
 
 
 def _build_core_jobs(version_json, game_directory, version_id, mirror_source):
@@ -541,32 +927,81 @@ def _build_asset_index_job(version_json, game_directory, mirror_source):
     )
 
 
+def _iter_asset_jobs(asset_index_json, game_directory, mirror_source):
+    """Yield one AssetJob per distinct object hash; indexes list some objects under several names."""
+    seen = set()
+    for info in asset_index_json.get("objects", {}).values():
+        object_hash = info["hash"]
+        if object_hash in seen:
+            continue
+        seen.add(object_hash)
+        yield AssetJob(game_directory, mirror_source, object_hash, info.get("size", 0))
+
+
 def _build_asset_jobs(asset_index_json, game_directory, mirror_source):
-    jobs = []
-    for object_hash, object_info in (
-        (info["hash"], info) for info in asset_index_json.get("objects", {}).values()
-    ):
-        prefix = object_hash[:2]
-        relative_path = os.path.join("assets", "objects", prefix, object_hash)
-        jobs.append(DownloadJob(
-            url=_rewrite_url(f"https://resources.download.minecraft.net/{prefix}/{object_hash}", mirror_source),
-            file_path=os.path.join(game_directory, relative_path),
-            relative_path=relative_path,
-            size=object_info.get("size", 0),
-            sha1=object_hash,
-            label=object_hash,
-        ))
-    return jobs
+    return list(_iter_asset_jobs(asset_index_json, game_directory, mirror_source))
+
 
+def _is_deferrable_asset(name):
+    name = str(name or "").lower()
+    if not name.startswith(DEFERRABLE_ASSET_PREFIXES):
+        return False
+    if name.startswith("minecraft/lang/"):
+        return os.path.splitext(os.path.basename(name))[0] not in CRITICAL_LANGUAGES
+    return True
+
+
+def split_deferred_assets(asset_index_json):
+    """Split asset objects into those needed to reach the title screen and those the game loads lazily.
+
+    Sounds and languages other than CRITICAL_LANGUAGES can arrive after launch. Virtual and
+    map_to_resources indexes are copied into place at startup, so nothing is deferred for them.
+    """
+    objects = asset_index_json.get("objects", {})
+    if asset_index_json.get("virtual") or asset_index_json.get("map_to_resources"):
+        return dict(objects), {}
+    critical = {}
+    deferred = {}
+    for name, info in objects.items():
+        (deferred if _is_deferrable_asset(name) else critical)[name] = info
+    return critical, deferred
+
+
+def pending_deferred_assets(game_directory):
+    """Return {asset index id: deferred object count} for indexes still waiting on background assets."""
+    data = load_json_file(os.path.join(game_directory, DEFERRED_ASSETS_FILE), {})
+    return {str(key): int(value) for key, value in data.items() if value} if isinstance(data, dict) else {}
+
+
+def _set_deferred_assets(game_directory, asset_index_id, count):
+    path = os.path.join(game_directory, DEFERRED_ASSETS_FILE)
+    with _deferred_lock:
+        pending = pending_deferred_assets(game_directory)
+        if count:
+            pending[asset_index_id] = count
+        elif asset_index_id not in pending:
+            return
+        else:
+            pending.pop(asset_index_id)
+        save_json_atomic(path, pending, indent=None)
+    logger.info("Deferred assets updated: asset_index=%s deferred=%d", asset_index_id, count)
 
-def collect_missing_game_files(version_json, game_directory, version_id, include_assets=True):
-    """Return files that are missing or fail size/SHA1 validation."""
+
+def collect_missing_game_files(version_json, game_directory, version_id, include_assets=True, deep_verify=False, hash_workers=0, skip_deferred=False):
+    """Return files that are missing or fail size/SHA1 validation.
+
+    Files recorded in the verify index with an unchanged stat signature are trusted
+    without re-hashing unless deep_verify is set; the rest are hashed on the shared
+    verification pool. skip_deferred ignores assets still queued for background download.
+    """
     logger.info(
-        "Collecting missing files: version=%s game_directory=%s include_assets=%s",
+        "Collecting missing files: version=%s game_directory=%s include_assets=%s deep_verify=%s",
         version_id,
         os.path.abspath(game_directory),
         include_assets,
+        deep_verify,
     )
+    verify_index = VerifyIndex(game_directory, deep=deep_verify)
     missing = []
     asset_index_job = _build_asset_index_job(version_json, game_directory, "")
     core_jobs = _build_core_jobs(version_json, game_directory, version_id, "")
@@ -577,8 +1012,9 @@ def collect_missing_game_files(version_json, game_directory, version_id, include
 
     if include_assets and asset_index_job and os.path.isfile(asset_index_job.file_path):
         try:
-            with open(asset_index_job.file_path, "r", encoding="utf-8") as file_handle:
-                asset_index_json = json.load(file_handle)
+            asset_index_json = _load_asset_index(asset_index_job.file_path)
+            if skip_deferred and version_json["assetIndex"]["id"] in pending_deferred_assets(game_directory):
+                asset_index_json = {"objects": split_deferred_assets(asset_index_json)[0]}
             jobs.extend(_build_asset_jobs(asset_index_json, game_directory, ""))
         except Exception as exc:
             missing.append({
@@ -589,8 +1025,12 @@ def collect_missing_game_files(version_json, game_directory, version_id, include
                 "sha1": asset_index_job.sha1,
             })
 
-    for job in jobs:
-        if _matches_file(job.file_path, job.size, job.sha1):
+    results = _hash_executor(hash_workers).map(
+        lambda job: _matches_file(job.file_path, job.size, job.sha1, verify_index),
+        jobs,
+    )
+    for job, matches in zip(jobs, results):
+        if matches:
             continue
         reason = "缺失"
         if os.path.exists(job.file_path):
@@ -603,6 +1043,7 @@ def collect_missing_game_files(version_json, game_directory, version_id, include
             "sha1": job.sha1,
             "url": job.url,
         })
+    verify_index.save()
     logger.info("Missing file scan finished: version=%s missing=%d", version_id, len(missing))
     return missing
 
@@ -614,9 +1055,18 @@ async def download_assets(
     mirror_source,
     progress_callback=None,
     max_asset_concurrency=MAX_ASSET_CONCURRENCY,
+    min_asset_concurrency=MIN_ASSET_CONCURRENCY,
+    auto_concurrency=True,
     speed_limit_kbps=0,
+    background_speed_limit_kbps=0,
+    background=False,
     cache_strategy="reuse",
     cancel_callback=None,
+    object_store_dir="",
+    deep_verify=False,
+    hash_workers=0,
+    extra_mirrors=(),
+    cancel_token=None,
 ):
     logger.info(
         "Starting asset download: version=%s game_directory=%s mirror=%s",
@@ -624,46 +1074,64 @@ async def download_assets(
         os.path.abspath(game_directory),
         mirror_source,
     )
+    loop = asyncio.get_running_loop()
     progress = DownloadProgress(progress_callback)
-    cache_dirs = _candidate_cache_dirs(game_directory)
+    verify_index = VerifyIndex(game_directory, deep=deep_verify)
     asset_index_path = os.path.join(
         game_directory, "assets", "indexes", f"{version_json['assetIndex']['id']}.json"
     )
 
-    async with aiohttp.ClientSession(
-        timeout=REQUEST_TIMEOUT,
-        connector=aiohttp.TCPConnector(limit=max_asset_concurrency * 2, ttl_dns_cache=300),
-    ) as session:
-        with open(asset_index_path, "r", encoding="utf-8") as file_handle:
-            asset_index_json = json.load(file_handle)
-        jobs = _build_asset_jobs(asset_index_json, game_directory, mirror_source)
-        logger.info("Asset jobs prepared: version=%s jobs=%d bytes=%d", version_id, len(jobs), sum(job.size for job in jobs))
-        progress.set_phase("下载资源文件")
-        progress.add_totals(sum(job.size for job in jobs), len(jobs))
-        await _run_jobs(
-            session,
-            jobs,
-            progress,
-            max_asset_concurrency,
-            cache_dirs,
-            game_directory,
-            mirror_source=mirror_source,
-            speed_limit_bps=int(speed_limit_kbps or 0) * 1024,
-            cache_strategy=cache_strategy,
-            cancel_callback=cancel_callback,
-        )
-        progress.set_phase("资源文件下载完成")
-        progress.emit(force=True)
+    try:
+        async with _client_session(max_asset_concurrency) as session:
+            context = _open_context(
+                session,
+                progress,
+                game_directory,
+                mirror_source,
+                verify_index,
+                speed_limit_kbps=speed_limit_kbps,
+                background_speed_limit_kbps=background_speed_limit_kbps,
+                background=background,
+                cache_strategy=cache_strategy,
+                cancel_token=cancel_token,
+                cancel_callback=cancel_callback,
+                object_store_dir=object_store_dir,
+                hash_workers=hash_workers,
+                extra_mirrors=extra_mirrors,
+                controllers=_concurrency_controllers(
+                    auto_concurrency,
+                    max_asset_concurrency=max_asset_concurrency,
+                    min_asset_concurrency=min_asset_concurrency,
+                ),
+            )
+            jobs, job_count, job_bytes, _deferred = await loop.run_in_executor(
+                None, _stream_asset_jobs, asset_index_path, game_directory, mirror_source
+            )
+            logger.info("Asset jobs prepared: version=%s jobs=%d bytes=%d", version_id, job_count, job_bytes)
+            progress.set_phase("下载资源文件")
+            progress.add_totals(job_bytes, job_count)
+            scheduler = JobScheduler(lambda job, queue_wait: _run_job(context, job, queue_wait), context.cancel_token)
+            scheduler.open_lane(LANE_ASSETS, max_asset_concurrency, controller=context.controllers.get("assets"))
+            scheduler.submit_stream(LANE_ASSETS, jobs)
+            scheduler.close()
+            await scheduler.run()
+            await loop.run_in_executor(None, _set_deferred_assets, game_directory, version_json["assetIndex"]["id"], 0)
+            progress.set_phase("资源文件下载完成")
+            progress.emit(force=True)
+    finally:
+        await loop.run_in_executor(None, verify_index.save)
     logger.info("Asset download finished: version=%s", version_id)
 
 
-def extract_natives(version_json, game_directory, version_id):
+def extract_natives(version_json, game_directory, version_id, cache_dir=NATIVES_CACHE_DIR):
+    """Populate versions/<id>/<id>-natives from the shared natives cache, skipping unchanged jars."""
     natives_directory = os.path.join(
         game_directory, "versions", version_id, f"{version_id}-natives"
     )
-    os.makedirs(natives_directory, exist_ok=True)
     logger.info("Extracting natives: version=%s target=%s", version_id, natives_directory)
 
+    jars = []
+    verify_index = VerifyIndex(game_directory)
     for library in version_json.get("libraries", []):
         classifiers = library.get("downloads", {}).get("classifiers", {})
         native_key = _native_classifier_key(library)
@@ -672,27 +1140,34 @@ def extract_natives(version_json, game_directory, version_id):
             continue
 
         library_path = os.path.join(game_directory, "libraries", natives_info["path"])
-        try:
-            with zipfile.ZipFile(library_path, "r") as zip_ref:
-                for file_info in zip_ref.infolist():
-                    if file_info.filename.startswith("META-INF") or file_info.filename.endswith("/"):
-                        continue
-
-                    extract_path = os.path.normpath(os.path.join(natives_directory, file_info.filename))
-                    if not extract_path.startswith(os.path.normpath(natives_directory)):
-                        logger.warning("Skipping suspicious native path: archive=%s entry=%s", library_path, file_info.filename)
-                        continue
-
-                    zip_ref.extract(file_info, natives_directory)
-        except FileNotFoundError:
+        if not os.path.isfile(library_path):
             logger.warning("Native library file does not exist: %s", library_path)
-        except Exception as exc:
-            logger.exception("Failed to extract natives from %s: %s", library_path, exc)
+            continue
+        sha1 = str(natives_info.get("sha1") or "").lower()
+        if not sha1 or not _matches_file(library_path, natives_info.get("size", 0), sha1, verify_index):
+            # The shared cache is keyed by content, so a jar that differs from the version JSON
+            # must not reuse (or seed) the directory of the declared SHA1.
+            actual_sha1 = _sha1_file(library_path).lower()
+            if sha1:
+                logger.warning(
+                    "Native library does not match its declared SHA1: path=%s expected=%s actual=%s",
+                    library_path,
+                    sha1,
+                    actual_sha1,
+                )
+            sha1 = actual_sha1
+        jars.append((sha1, library_path))
+    verify_index.save()
 
-    file_count = 0
-    for _, _, files in os.walk(natives_directory):
-        file_count += len(files)
-    logger.info("Extracted natives: version=%s files=%d target=%s", version_id, file_count, natives_directory)
+    file_count, extracted = sync_natives_directory(natives_directory, jars, NativesCache(cache_dir))
+    logger.info(
+        "Extracted natives: version=%s files=%d jars=%d changed=%d target=%s",
+        version_id,
+        file_count,
+        len(jars),
+        extracted,
+        natives_directory,
+    )
 
 
 async def download_game_files(
@@ -703,9 +1178,20 @@ async def download_game_files(
     progress_callback=None,
     max_core_concurrency=MAX_CORE_CONCURRENCY,
     max_asset_concurrency=MAX_ASSET_CONCURRENCY,
+    min_core_concurrency=MIN_CORE_CONCURRENCY,
+    min_asset_concurrency=MIN_ASSET_CONCURRENCY,
+    auto_concurrency=True,
     speed_limit_kbps=0,
+    background_speed_limit_kbps=0,
+    background=False,
     cache_strategy="reuse",
     cancel_callback=None,
+    object_store_dir="",
+    deep_verify=False,
+    hash_workers=0,
+    extra_mirrors=(),
+    cancel_token=None,
+    fast_first_launch=False,
 ):
     os.makedirs(game_directory, exist_ok=True)
 
@@ -717,91 +1203,91 @@ async def download_game_files(
         os.path.abspath(game_directory),
         mirror_source,
     )
-    version_json_relative = os.path.join("versions", version_id, f"{version_id}.json")
-    version_json_path = os.path.join(game_directory, version_json_relative)
-    _ensure_parent(version_json_path)
-    save_json_atomic(version_json_path, version_json, indent=4)
+    loop = asyncio.get_running_loop()
+    await loop.run_in_executor(None, recover_transactions, game_directory)
+    transaction = InstallTransaction(game_directory, version_id).begin()
+    version_json_path = os.path.join(game_directory, "versions", version_id, f"{version_id}.json")
+    await loop.run_in_executor(None, lambda: save_json_atomic(transaction.staged_path(version_json_path), version_json, indent=4))
 
     progress = DownloadProgress(progress_callback)
-    cache_dirs = _candidate_cache_dirs(game_directory)
+    verify_index = VerifyIndex(game_directory, deep=deep_verify)
     asset_index_job = _build_asset_index_job(version_json, game_directory, mirror_source)
     core_jobs = _build_core_jobs(version_json, game_directory, version_id, mirror_source)
+    staged = await loop.run_in_executor(None, _stage_version_jobs, [transaction], core_jobs, verify_index)
     logger.info(
-        "Core jobs prepared: version=%s core_jobs=%d has_asset_index=%s",
+        "Core jobs prepared: version=%s core_jobs=%d staged=%d has_asset_index=%s",
         version_id,
         len(core_jobs),
+        len(staged),
         bool(asset_index_job),
     )
 
-    async with aiohttp.ClientSession(
-        timeout=REQUEST_TIMEOUT,
-        connector=aiohttp.TCPConnector(limit=max_asset_concurrency * 2, ttl_dns_cache=300),
-    ) as session:
-        asset_index_result = ""
-        asset_jobs = []
-        if asset_index_job:
-            asset_index_result = await _process_job(
+    telemetry = DownloadTelemetry("download", version_id)
+    status = "failed"
+    try:
+        async with _client_session(max(max_core_concurrency, max_asset_concurrency)) as session:
+            context = _open_context(
                 session,
-                asset_index_job,
-                DownloadProgress(),
-                asyncio.Semaphore(1),
-                cache_dirs,
+                progress,
                 game_directory,
-                mirror_source=mirror_source,
-                speed_limit_bps=int(speed_limit_kbps or 0) * 1024,
+                mirror_source,
+                verify_index,
+                speed_limit_kbps=speed_limit_kbps,
+                background_speed_limit_kbps=background_speed_limit_kbps,
+                background=background,
                 cache_strategy=cache_strategy,
+                cancel_token=cancel_token,
                 cancel_callback=cancel_callback,
+                object_store_dir=object_store_dir,
+                hash_workers=hash_workers,
+                extra_mirrors=extra_mirrors,
+                telemetry=telemetry,
+                controllers=_concurrency_controllers(
+                    auto_concurrency,
+                    max_core_concurrency,
+                    max_asset_concurrency,
+                    min_core_concurrency,
+                    min_asset_concurrency,
+                ),
             )
-
-            with open(asset_index_job.file_path, "r", encoding="utf-8") as file_handle:
-                asset_index_json = json.load(file_handle)
-            asset_jobs = _build_asset_jobs(asset_index_json, game_directory, mirror_source)
-            logger.info("Asset jobs prepared: version=%s asset_jobs=%d", version_id, len(asset_jobs))
-
-        all_jobs = [job for job in [asset_index_job, *core_jobs, *asset_jobs] if job]
-        logger.info("Download totals: version=%s jobs=%d bytes=%d", version_id, len(all_jobs), sum(job.size for job in all_jobs))
-        progress.add_totals(sum(job.size for job in all_jobs), len(all_jobs))
-
-        progress.set_phase("准备下载")
-        if asset_index_job:
-            progress.set_current_file(asset_index_job.label)
-            if asset_index_result == "reused":
-                progress.advance_reused(asset_index_job.size or _file_size(asset_index_job.file_path))
-            else:
-                progress.ready_bytes += asset_index_job.size or _file_size(asset_index_job.file_path)
-                progress.emit(force=True)
-            progress.finish_file()
-
-        progress.set_phase("下载核心文件")
-        await _run_jobs(
-            session,
-            core_jobs,
-            progress,
-            max_core_concurrency,
-            cache_dirs,
-            game_directory,
-            mirror_source=mirror_source,
-            speed_limit_bps=int(speed_limit_kbps or 0) * 1024,
-            cache_strategy=cache_strategy,
-            cancel_callback=cancel_callback,
-        )
-        progress.set_phase("下载资源文件")
-        await _run_jobs(
-            session,
-            asset_jobs,
-            progress,
-            max_asset_concurrency,
-            cache_dirs,
-            game_directory,
-            mirror_source=mirror_source,
-            speed_limit_bps=int(speed_limit_kbps or 0) * 1024,
-            cache_strategy=cache_strategy,
-            cancel_callback=cancel_callback,
-        )
+            progress.set_phase("下载核心文件")
+            scheduler = _schedule_game_files(
+                context,
+                version_json,
+                core_jobs,
+                asset_index_job,
+                max_core_concurrency,
+                max_asset_concurrency,
+                "下载资源文件",
+                fast_first_launch=fast_first_launch,
+            )
+            await scheduler.run()
+            if asset_index_job and not fast_first_launch:
+                await loop.run_in_executor(None, _set_deferred_assets, game_directory, version_json["assetIndex"]["id"], 0)
+        await loop.run_in_executor(None, _commit_version_jobs, [transaction], staged, verify_index)
+        status = "completed"
+    except DownloadCancelled:
+        status = "cancelled"
+        raise
+    finally:
+        await loop.run_in_executor(None, verify_index.save)
+        report_path = download_report_path(game_directory, version_id)
+        if status != "completed":
+            # Keep versions/<id>/ absent until the transaction commits; a later commit moves it along.
+            report_path = transaction.staged_path(report_path)
+        report = await loop.run_in_executor(None, telemetry.save, report_path, status)
 
     progress.set_phase("下载完成")
     progress.emit(force=True)
     logger.info("Game file download finished: version=%s", version_id)
+    return report
+
+
+def repair_options(download_options):
+    """repair_game_files keyword arguments from read_download_options(); callers scan deeply beforehand."""
+    options = {key: value for key, value in (download_options or {}).items() if key != "fast_first_launch"}
+    options["deep_verify"] = False
+    return options
 
 
 async def repair_game_files(
@@ -812,9 +1298,19 @@ async def repair_game_files(
     progress_callback=None,
     max_core_concurrency=MAX_CORE_CONCURRENCY,
     max_asset_concurrency=MAX_ASSET_CONCURRENCY,
+    min_core_concurrency=MIN_CORE_CONCURRENCY,
+    min_asset_concurrency=MIN_ASSET_CONCURRENCY,
+    auto_concurrency=True,
     speed_limit_kbps=0,
+    background_speed_limit_kbps=0,
+    background=False,
     cache_strategy="reuse",
     cancel_callback=None,
+    object_store_dir="",
+    deep_verify=False,
+    hash_workers=0,
+    extra_mirrors=(),
+    cancel_token=None,
 ):
     """校验并补齐当前版本的核心文件、资源索引、资源文件和 natives。"""
     os.makedirs(game_directory, exist_ok=True)
@@ -827,68 +1323,362 @@ async def repair_game_files(
         mirror_source,
     )
 
+    loop = asyncio.get_running_loop()
     progress = DownloadProgress(progress_callback)
-    cache_dirs = _candidate_cache_dirs(game_directory)
+    verify_index = VerifyIndex(game_directory, deep=deep_verify)
     asset_index_job = _build_asset_index_job(version_json, game_directory, mirror_source)
     core_jobs = _build_core_jobs(version_json, game_directory, version_id, mirror_source)
     logger.info("Repair jobs prepared: version=%s core_jobs=%d has_asset_index=%s", version_id, len(core_jobs), bool(asset_index_job))
 
-    async with aiohttp.ClientSession(
-        timeout=REQUEST_TIMEOUT,
-        connector=aiohttp.TCPConnector(limit=max_asset_concurrency * 2, ttl_dns_cache=300),
-    ) as session:
-        asset_jobs = []
-        if asset_index_job:
-            progress.set_phase("校验资源索引", asset_index_job.label)
-            progress.add_totals(asset_index_job.size, 1)
-            await _process_job(
+    telemetry = DownloadTelemetry("repair", version_id)
+    status = "failed"
+    try:
+        async with _client_session(max(max_core_concurrency, max_asset_concurrency)) as session:
+            context = _open_context(
                 session,
-                asset_index_job,
                 progress,
-                asyncio.Semaphore(1),
-                cache_dirs,
                 game_directory,
-                mirror_source=mirror_source,
-                speed_limit_bps=int(speed_limit_kbps or 0) * 1024,
+                mirror_source,
+                verify_index,
+                speed_limit_kbps=speed_limit_kbps,
+                background_speed_limit_kbps=background_speed_limit_kbps,
+                background=background,
                 cache_strategy=cache_strategy,
+                cancel_token=cancel_token,
                 cancel_callback=cancel_callback,
+                object_store_dir=object_store_dir,
+                hash_workers=hash_workers,
+                extra_mirrors=extra_mirrors,
+                telemetry=telemetry,
+                controllers=_concurrency_controllers(
+                    auto_concurrency,
+                    max_core_concurrency,
+                    max_asset_concurrency,
+                    min_core_concurrency,
+                    min_asset_concurrency,
+                ),
+            )
+            progress.set_phase("校验核心文件")
+            scheduler = _schedule_game_files(
+                context,
+                version_json,
+                core_jobs,
+                asset_index_job,
+                max_core_concurrency,
+                max_asset_concurrency,
+                "校验资源文件",
             )
+            await scheduler.run()
+            if asset_index_job:
+                await loop.run_in_executor(None, _set_deferred_assets, game_directory, version_json["assetIndex"]["id"], 0)
+        status = "completed"
+    except DownloadCancelled:
+        status = "cancelled"
+        raise
+    finally:
+        await loop.run_in_executor(None, verify_index.save)
+        report = await loop.run_in_executor(
+            None, telemetry.save, download_report_path(game_directory, version_id, "repair"), status
+        )
+
+    progress.set_phase("补全完成")
+    progress.emit(force=True)
+    # Zip extraction and linking would stall every transfer sharing the engine loop.
+    await loop.run_in_executor(None, extract_natives, version_json, game_directory, version_id)
+    logger.info("Game file repair finished: version=%s", version_id)
+    return report
+
+
+@dataclass
+class DownloadPlan:
+    """Union of the jobs of several versions, deduplicated by target path and asset hash.
+
+    core_jobs and asset_jobs only hold jobs that still need work; files already valid on disk
+    are counted in existing_* and dropped. store_* counts files the shared object store can
+    link in, fetch_* the exact bytes left for the network.
+    """
+
+    game_directory: str
+    mirror_source: str
+    version_jsons: list
+    verify_index: VerifyIndex
+    core_jobs: list = field(default_factory=list)
+    asset_jobs: list = field(default_factory=list)
+    requested_files: int = 0
+    requested_bytes: int = 0
+    existing_files: int = 0
+    existing_bytes: int = 0
+    store_files: int = 0
+    store_bytes: int = 0
+    fetch_files: int = 0
+    fetch_bytes: int = 0
+
+    @property
+    def version_ids(self):
+        return [version_json["id"] for version_json in self.version_jsons]
+
+    def summary(self):
+        return {
+            "versions": self.version_ids,
+            "requested_files": self.requested_files,
+            "requested_bytes": self.requested_bytes,
+            "unique_files": self.existing_files + self.store_files + self.fetch_files,
+            "existing_files": self.existing_files,
+            "existing_bytes": self.existing_bytes,
+            "store_files": self.store_files,
+            "store_bytes": self.store_bytes,
+            "fetch_files": self.fetch_files,
+            "fetch_bytes": self.fetch_bytes,
+        }
+
+
+def _dedup_jobs(jobs, key):
+    unique = {}
+    for job in jobs:
+        job_key = key(job)
+        kept = unique.setdefault(job_key, job)
+        if kept is not job and job.sha1 and kept.sha1 and job.sha1.lower() != kept.sha1.lower():
+            logger.warning("Conflicting SHA1 for one target, keeping the first: path=%s kept=%s dropped=%s", job_key, kept.sha1, job.sha1)
+    return list(unique.values())
+
+
+def _plan_job_status(job, object_store=None, verify_index=None):
+    if _matches_file(job.file_path, job.size, job.sha1, verify_index):
+        return "existing"
+    if object_store and object_store.verify(job.sha1, job.size):
+        return "store"
+    return "fetch"
+
+
+async def _classify_plan(context, plan, core_jobs, asset_jobs):
+    loop = asyncio.get_running_loop()
+    for lane_jobs, pending in ((core_jobs, plan.core_jobs), (asset_jobs, plan.asset_jobs)):
+        statuses = await asyncio.gather(*(
+            loop.run_in_executor(context.hash_executor, _plan_job_status, job, context.object_store, context.verify_index)
+            for job in lane_jobs
+        ))
+        for job, status in zip(lane_jobs, statuses):
+            size = job.size or (_file_size(job.file_path) if status == "existing" else 0)
+            setattr(plan, f"{status}_files", getattr(plan, f"{status}_files") + 1)
+            setattr(plan, f"{status}_bytes", getattr(plan, f"{status}_bytes") + size)
+            if status != "existing":
+                pending.append(job)
+
 
-            with open(asset_index_job.file_path, "r", encoding="utf-8") as file_handle:
-                asset_index_json = json.load(file_handle)
-            asset_jobs = _build_asset_jobs(asset_index_json, game_directory, mirror_source)
-            logger.info("Repair asset jobs prepared: version=%s asset_jobs=%d", version_id, len(asset_jobs))
+# Options of download_versions that only one of its two steps accepts.
+_PLAN_ONLY_OPTIONS = ("deep_verify",)
+_EXECUTE_ONLY_OPTIONS = ("auto_concurrency", "min_core_concurrency", "min_asset_concurrency")
 
-        progress.add_totals(sum(job.size for job in core_jobs) + sum(job.size for job in asset_jobs), len(core_jobs) + len(asset_jobs))
 
-        progress.set_phase("校验核心文件")
-        await _run_jobs(
+def _version_ids(version_jsons):
+    return "+".join(version_json["id"] for version_json in version_jsons)
+
+
+async def plan_game_files(
+    version_jsons,
+    game_directory,
+    mirror_source,
+    progress_callback=None,
+    max_core_concurrency=MAX_CORE_CONCURRENCY,
+    max_asset_concurrency=MAX_ASSET_CONCURRENCY,
+    speed_limit_kbps=0,
+    background_speed_limit_kbps=0,
+    background=False,
+    cache_strategy="reuse",
+    cancel_callback=None,
+    object_store_dir="",
+    deep_verify=False,
+    hash_workers=0,
+    extra_mirrors=(),
+    cancel_token=None,
+):
+    """Pre-flight for several versions: fetch their asset indexes and return one DownloadPlan.
+
+    Libraries shared between versions and asset objects shared between indexes appear once,
+    and every unique file is checked against the disk and the object store exactly once, so
+    the plan reports the bytes that will actually cross the network.
+    """
+    os.makedirs(game_directory, exist_ok=True)
+    version_jsons = list({version_json["id"]: version_json for version_json in version_jsons}.values())
+    logger.info("Planning batch download: versions=%s game_directory=%s", _version_ids(version_jsons), os.path.abspath(game_directory))
+    progress = DownloadProgress(progress_callback)
+    plan = DownloadPlan(game_directory, mirror_source, version_jsons, VerifyIndex(game_directory, deep=deep_verify))
+    index_jobs = _dedup_jobs(
+        filter(None, (_build_asset_index_job(version_json, game_directory, mirror_source) for version_json in version_jsons)),
+        key=lambda job: os.path.normcase(job.file_path),
+    )
+    async with _client_session(max(max_core_concurrency, max_asset_concurrency)) as session:
+        context = _open_context(
             session,
-            core_jobs,
             progress,
-            max_core_concurrency,
-            cache_dirs,
             game_directory,
-            mirror_source=mirror_source,
-            speed_limit_bps=int(speed_limit_kbps or 0) * 1024,
+            mirror_source,
+            plan.verify_index,
+            speed_limit_kbps=speed_limit_kbps,
+            background_speed_limit_kbps=background_speed_limit_kbps,
+            background=background,
             cache_strategy=cache_strategy,
+            cancel_token=cancel_token,
             cancel_callback=cancel_callback,
+            object_store_dir=object_store_dir,
+            hash_workers=hash_workers,
+            extra_mirrors=extra_mirrors,
         )
-        progress.set_phase("校验资源文件")
-        await _run_jobs(
-            session,
-            asset_jobs,
-            progress,
-            max_asset_concurrency,
-            cache_dirs,
-            game_directory,
-            mirror_source=mirror_source,
-            speed_limit_bps=int(speed_limit_kbps or 0) * 1024,
-            cache_strategy=cache_strategy,
-            cancel_callback=cancel_callback,
+        progress.set_phase("下载资源索引")
+        progress.add_totals(sum(job.size for job in index_jobs), len(index_jobs))
+        scheduler = JobScheduler(lambda job, queue_wait: _run_job(context, job, queue_wait), context.cancel_token)
+        scheduler.open_lane(LANE_CORE, max_core_concurrency)
+        scheduler.submit(LANE_CORE, index_jobs)
+        scheduler.close()
+        await scheduler.run()
+
+        progress.set_phase("生成下载计划")
+        requested_core = [
+            job
+            for version_json in version_jsons
+            for job in _build_core_jobs(version_json, game_directory, version_json["id"], mirror_source)
+        ]
+        loop = asyncio.get_running_loop()
+        requested_assets = []
+        for index_job in index_jobs:
+            requested_assets.extend(await loop.run_in_executor(
+                None, _read_asset_jobs, index_job.file_path, game_directory, mirror_source
+            ))
+        requested = [*requested_core, *requested_assets]
+        plan.requested_files = len(requested)
+        plan.requested_bytes = sum(job.size for job in requested)
+        await _classify_plan(
+            context,
+            plan,
+            _dedup_jobs(requested_core, key=lambda job: os.path.normcase(job.file_path)),
+            _dedup_jobs(requested_assets, key=lambda job: job.sha1),
         )
+    await asyncio.get_running_loop().run_in_executor(None, plan.verify_index.save)
+    logger.info("Batch download planned: %s", plan.summary())
+    return plan
 
-    progress.set_phase("补全完成")
+
+async def execute_download_plan(
+    plan,
+    progress_callback=None,
+    max_core_concurrency=MAX_CORE_CONCURRENCY,
+    max_asset_concurrency=MAX_ASSET_CONCURRENCY,
+    min_core_concurrency=MIN_CORE_CONCURRENCY,
+    min_asset_concurrency=MIN_ASSET_CONCURRENCY,
+    auto_concurrency=True,
+    speed_limit_kbps=0,
+    background_speed_limit_kbps=0,
+    background=False,
+    cache_strategy="reuse",
+    cancel_callback=None,
+    object_store_dir="",
+    hash_workers=0,
+    extra_mirrors=(),
+    cancel_token=None,
+):
+    """Run the merged job graph of a DownloadPlan on one scheduler and return its report."""
+    game_directory = plan.game_directory
+    loop = asyncio.get_running_loop()
+    await loop.run_in_executor(None, recover_transactions, game_directory)
+    transactions = []
+    for version_json in plan.version_jsons:
+        transaction = InstallTransaction(game_directory, version_json["id"]).begin()
+        version_json_path = os.path.join(game_directory, "versions", version_json["id"], f"{version_json['id']}.json")
+        await loop.run_in_executor(None, lambda: save_json_atomic(transaction.staged_path(version_json_path), version_json, indent=4))
+        transactions.append(transaction)
+    # Plan jobs only contain files that are not valid yet, so all of them under versions/ are staged.
+    staged = [item for transaction in transactions for item in transaction.stage_jobs(plan.core_jobs)]
+
+    progress = DownloadProgress(progress_callback)
+    telemetry = DownloadTelemetry("batch", _version_ids(plan.version_jsons))
+    status = "failed"
+    try:
+        async with _client_session(max(max_core_concurrency, max_asset_concurrency)) as session:
+            context = _open_context(
+                session,
+                progress,
+                game_directory,
+                plan.mirror_source,
+                plan.verify_index,
+                speed_limit_kbps=speed_limit_kbps,
+                background_speed_limit_kbps=background_speed_limit_kbps,
+                background=background,
+                cache_strategy=cache_strategy,
+                cancel_token=cancel_token,
+                cancel_callback=cancel_callback,
+                object_store_dir=object_store_dir,
+                hash_workers=hash_workers,
+                extra_mirrors=extra_mirrors,
+                telemetry=telemetry,
+                controllers=_concurrency_controllers(
+                    auto_concurrency,
+                    max_core_concurrency,
+                    max_asset_concurrency,
+                    min_core_concurrency,
+                    min_asset_concurrency,
+                ),
+            )
+            progress.set_phase("下载核心文件")
+            progress.add_totals(
+                sum(job.size for job in [*plan.core_jobs, *plan.asset_jobs]),
+                len(plan.core_jobs) + len(plan.asset_jobs),
+            )
+            scheduler = JobScheduler(lambda job, queue_wait: _run_job(context, job, queue_wait), context.cancel_token)
+            scheduler.open_lane(
+                LANE_CORE,
+                max_core_concurrency,
+                on_drained=lambda: progress.set_phase("下载资源文件"),
+                controller=context.controllers.get("core"),
+            )
+            scheduler.open_lane(LANE_ASSETS, max_asset_concurrency, controller=context.controllers.get("assets"))
+            scheduler.submit(LANE_CORE, plan.core_jobs)
+            scheduler.submit(LANE_ASSETS, plan.asset_jobs)
+            scheduler.close()
+            await scheduler.run()
+            for version_json in plan.version_jsons:
+                if version_json.get("assetIndex", {}).get("id"):
+                    await loop.run_in_executor(None, _set_deferred_assets, game_directory, version_json["assetIndex"]["id"], 0)
+        await loop.run_in_executor(None, _commit_version_jobs, transactions, staged, plan.verify_index)
+        status = "completed"
+    except DownloadCancelled:
+        status = "cancelled"
+        raise
+    finally:
+        await loop.run_in_executor(None, plan.verify_index.save)
+        report = await loop.run_in_executor(None, telemetry.save, batch_download_report_path(game_directory), status)
+
+    progress.set_phase("下载完成")
     progress.emit(force=True)
-    extract_natives(version_json, game_directory, version_id)
-    logger.info("Game file repair finished: version=%s", version_id)
+    logger.info("Batch download finished: versions=%s", _version_ids(plan.version_jsons))
+    return report
+
+
+def batch_download_report_path(game_directory):
+    return os.path.join(game_directory, ".mcgo", "batch-download-report.json")
+
+
+async def download_versions(version_jsons, game_directory, mirror_source, progress_callback=None, plan_callback=None, **download_options):
+    """Plan, download and extract natives for several versions as one deduplicated batch.
+
+    download_options are those of read_download_options(); each is passed to the step that
+    uses it, and fast_first_launch is ignored because a batch always fetches every asset.
+    """
+    download_options.pop("fast_first_launch", None)
+    plan = await plan_game_files(
+        version_jsons,
+        game_directory,
+        mirror_source,
+        progress_callback,
+        **{key: value for key, value in download_options.items() if key not in _EXECUTE_ONLY_OPTIONS},
+    )
+    if plan_callback:
+        plan_callback(plan.summary())
+    report = await execute_download_plan(
+        plan,
+        progress_callback,
+        **{key: value for key, value in download_options.items() if key not in _PLAN_ONLY_OPTIONS},
+    )
+    loop = asyncio.get_running_loop()
+    for version_json in plan.version_jsons:
+        await loop.run_in_executor(None, extract_natives, version_json, game_directory, version_json["id"])
+    return plan, report
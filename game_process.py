@@ -0,0 +1,297 @@
+import ctypes
+import locale
+import os
+import subprocess
+import threading
+import time
+import uuid
+from collections import deque
+
+from log_utils import get_logger
+from storage_utils import load_json_file, save_json_atomic
+
+
+LOG_BUFFER_LINES = 2000
+SAMPLE_INTERVAL_SECONDS = 2.0
+SESSIONS_FILE = os.path.join(".mcgo", "game-sessions.json")
+SESSIONS_PER_VERSION = 20
+KEEP_FINISHED_SESSIONS = 10
+OOM_MARKERS = ("java.lang.OutOfMemoryError", "There is insufficient memory for the Java Runtime Environment")
+_sessions_lock = threading.Lock()
+logger = get_logger(__name__)
+
+
+def _read_linux_sample(pid):
+    with open(f"/proc/{pid}/stat", "r", encoding="ascii") as file_handle:
+        # The command name may contain spaces, fields after it are fixed.
+        fields = file_handle.read().rsplit(")", 1)[1].split()
+    ticks = os.sysconf("SC_CLK_TCK")
+    sample = {"cpu_seconds": (int(fields[11]) + int(fields[12])) / ticks, "threads": int(fields[17])}
+    with open(f"/proc/{pid}/status", "r", encoding="ascii", errors="replace") as file_handle:
+        for line in file_handle:
+            key, _, value = line.partition(":")
+            if key == "VmRSS":
+                sample["rss_mb"] = int(value.split()[0]) / 1024
+            elif key == "VmHWM":
+                sample["peak_rss_mb"] = int(value.split()[0]) / 1024
+    return sample
+
+
+class _ProcessMemoryCounters(ctypes.Structure):
+    _fields_ = [
+        ("cb", ctypes.c_ulong),
+        ("PageFaultCount", ctypes.c_ulong),
+        ("PeakWorkingSetSize", ctypes.c_size_t),
+        ("WorkingSetSize", ctypes.c_size_t),
+        ("QuotaPeakPagedPoolUsage", ctypes.c_size_t),
+        ("QuotaPagedPoolUsage", ctypes.c_size_t),
+        ("QuotaPeakNonPagedPoolUsage", ctypes.c_size_t),
+        ("QuotaNonPagedPoolUsage", ctypes.c_size_t),
+        ("PagefileUsage", ctypes.c_size_t),
+        ("PeakPagefileUsage", ctypes.c_size_t),
+    ]
+
+
+def _read_windows_sample(pid):
+    kernel32 = ctypes.windll.kernel32
+    # HANDLE is pointer sized; the default int restype would truncate it on 64-bit Windows.
+    kernel32.OpenProcess.restype = ctypes.c_void_p
+    kernel32.GetProcessTimes.argtypes = [ctypes.c_void_p, *[ctypes.POINTER(ctypes.c_ulonglong)] * 4]
+    kernel32.CloseHandle.argtypes = [ctypes.c_void_p]
+    ctypes.windll.psapi.GetProcessMemoryInfo.argtypes = [ctypes.c_void_p, ctypes.POINTER(_ProcessMemoryCounters), ctypes.c_ulong]
+    handle = kernel32.OpenProcess(0x1000 | 0x0010, False, pid)  # QUERY_LIMITED_INFORMATION | VM_READ
+    if not handle:
+        return None
+    try:
+        counters = _ProcessMemoryCounters()
+        counters.cb = ctypes.sizeof(counters)
+        if not ctypes.windll.psapi.GetProcessMemoryInfo(handle, ctypes.byref(counters), counters.cb):
+            return None
+        times = [ctypes.c_ulonglong() for _ in range(4)]
+        kernel32.GetProcessTimes(handle, *[ctypes.byref(item) for item in times])
+        return {
+            "rss_mb": counters.WorkingSetSize / (1024 * 1024),
+            "peak_rss_mb": counters.PeakWorkingSetSize / (1024 * 1024),
+            "cpu_seconds": (times[2].value + times[3].value) / 10_000_000,
+        }
+    finally:
+        kernel32.CloseHandle(handle)
+
+
+def sample_process(pid):
+    """Return {rss_mb, peak_rss_mb, cpu_seconds[, threads]} for pid, or None when it cannot be read."""
+    try:
+        if os.name == "nt":
+            return _read_windows_sample(pid)
+        if os.path.isdir("/proc"):
+            return _read_linux_sample(pid)
+    except (OSError, ValueError, IndexError, AttributeError) as exc:
+        logger.debug("Process sample failed: pid=%s error=%s", pid, exc)
+    return None
+
+
+class GameSession:
+    """One launched game process: its recent output, resource samples and final status."""
+
+    def __init__(self, process, version_id, game_directory, max_memory_mb=0, log_lines=LOG_BUFFER_LINES):
+        self.session_id = uuid.uuid4().hex
+        self.process = process
+        self.pid = process.pid
+        self.version_id = version_id
+        self.game_directory = game_directory
+        self.max_memory_mb = int(max_memory_mb or 0)
+        self.started_at = time.time()
+        self.ended_at = None
+        self.exit_code = None
+        self.oom = False
+        self.log = deque(maxlen=log_lines)
+        self.samples = deque(maxlen=60)
+        self.peak_rss_mb = 0.0
+        self.cpu_seconds = 0.0
+        self.max_threads = 0
+        self.finished = threading.Event()
+
+    @property
+    def running(self):
+        return not self.finished.is_set()
+
+    def lines(self, limit=None):
+        lines = list(self.log)
+        return lines[-limit:] if limit else lines
+
+    def add_line(self, line):
+        self.log.append(line)
+        if not self.oom and any(marker in line for marker in OOM_MARKERS):
+            self.oom = True
+            logger.warning("Game ran out of memory: version=%s pid=%s xmx=%sM", self.version_id, self.pid, self.max_memory_mb)
+
+    def sample(self):
+        sample = sample_process(self.pid)
+        if not sample:
+            return None
+        previous = self.samples[-1] if self.samples else None
+        sample["time"] = time.monotonic()
+        if previous:
+            elapsed = sample["time"] - previous["time"]
+            sample["cpu_percent"] = 100 * (sample["cpu_seconds"] - previous["cpu_seconds"]) / elapsed if elapsed > 0 else 0.0
+        self.samples.append(sample)
+        self.peak_rss_mb = max(self.peak_rss_mb, sample.get("peak_rss_mb", 0), sample.get("rss_mb", 0))
+        self.cpu_seconds = sample["cpu_seconds"]
+        self.max_threads = max(self.max_threads, sample.get("threads", 0))
+        return sample
+
+    def wait(self, timeout=None):
+        return self.finished.wait(timeout)
+
+    def summary(self):
+        ended_at = self.ended_at or time.time()
+        return {
+            "session_id": self.session_id,
+            "version_id": self.version_id,
+            "pid": self.pid,
+            "started_at": self.started_at,
+            "ended_at": self.ended_at,
+            "duration_seconds": round(ended_at - self.started_at, 1),
+            "exit_code": self.exit_code,
+            "max_memory_mb": self.max_memory_mb,
+            "peak_rss_mb": round(self.peak_rss_mb, 1),
+            "cpu_seconds": round(self.cpu_seconds, 1),
+            "max_threads": self.max_threads,
+            "oom": self.oom,
+        }
+
+
+class GameSupervisor:
+    """Owns launched game processes until they exit.
+
+    Each process gets one thread draining its merged stdout/stderr into the session's ring
+    buffer (so a chatty game never blocks on a full pipe); a single shared thread samples
+    memory, CPU time and thread count of every running session. When a process exits its
+    summary is appended to .mcgo/game-sessions.json of its game directory.
+    """
+
+    def __init__(self, sample_interval=SAMPLE_INTERVAL_SECONDS):
+        self.sample_interval = sample_interval
+        self.on_exit = []
+        self._sessions = {}
+        self._lock = threading.Lock()
+        self._sampler = None
+
+    def start(self, command, version_id, game_directory, max_memory_mb=0, **popen_kwargs):
+        process = subprocess.Popen(
+            command,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.STDOUT,
+            stdin=subprocess.DEVNULL,
+            **popen_kwargs,
+        )
+        session = GameSession(process, version_id, game_directory, max_memory_mb=max_memory_mb)
+        with self._lock:
+            finished = [key for key, item in self._sessions.items() if not item.running]
+            for key in finished[:-KEEP_FINISHED_SESSIONS]:
+                self._sessions.pop(key)
+            self._sessions[session.session_id] = session
+            if self._sampler is None or not self._sampler.is_alive():
+                self._sampler = threading.Thread(target=self._sample_loop, name="mcgo-game-sampler", daemon=True)
+                self._sampler.start()
+        threading.Thread(target=self._pump, args=(session,), name=f"mcgo-game-{session.pid}", daemon=True).start()
+        logger.info("Game process supervised: version=%s pid=%s session=%s", version_id, session.pid, session.session_id)
+        return session
+
+    def sessions(self, running_only=False):
+        with self._lock:
+            sessions = list(self._sessions.values())
+        return [session for session in sessions if session.running or not running_only]
+
+    def get(self, session_id):
+        with self._lock:
+            return self._sessions.get(session_id)
+
+    def _pump(self, session):
+        encoding = locale.getpreferredencoding(False)
+        try:
+            for raw_line in iter(session.process.stdout.readline, b""):
+                session.add_line(raw_line.decode(encoding, errors="replace").rstrip("\r\n"))
+        except (OSError, ValueError) as exc:
+            logger.debug("Game output stream closed: pid=%s error=%s", session.pid, exc)
+        finally:
+            session.process.stdout.close()
+        session.sample()
+        session.exit_code = session.process.wait()
+        session.ended_at = time.time()
+        try:
+            self._finish(session)
+        finally:
+            session.finished.set()
+
+    def _sample_loop(self):
+        while True:
+            running = self.sessions(running_only=True)
+            if not running:
+                with self._lock:
+                    if not any(session.running for session in self._sessions.values()):
+                        self._sampler = None
+                        return
+                continue
+            for session in running:
+                session.sample()
+            time.sleep(self.sample_interval)
+
+    def _finish(self, session):
+        summary = session.summary()
+        log = logger.warning if session.exit_code or session.oom else logger.info
+        log(
+            "Game process exited: version=%s pid=%s exit_code=%s peak_rss_mb=%.0f xmx=%s oom=%s duration=%.0fs",
+            session.version_id,
+            session.pid,
+            session.exit_code,
+            session.peak_rss_mb,
+            session.max_memory_mb,
+            session.oom,
+            summary["duration_seconds"],
+        )
+        try:
+            record_session(session.game_directory, summary)
+        except OSError as exc:
+            logger.warning("Failed to record game session: game_directory=%s error=%s", session.game_directory, exc)
+        for callback in list(self.on_exit):
+            try:
+                callback(session)
+            except Exception:
+                logger.exception("Game exit callback failed: pid=%s", session.pid)
+
+
+def _sessions_path(game_directory):
+    return os.path.join(game_directory, SESSIONS_FILE)
+
+
+def load_session_history(game_directory, version_id=None):
+    """Return recorded session summaries, oldest first, optionally only those of version_id."""
+    try:
+        history = load_json_file(_sessions_path(game_directory), {})
+    except (OSError, ValueError) as exc:
+        logger.debug("Ignoring unreadable session history: game_directory=%s error=%s", game_directory, exc)
+        return []
+    if not isinstance(history, dict):
+        return []
+    if version_id is not None:
+        return list(history.get(version_id) or [])
+    return [summary for summaries in history.values() for summary in summaries]
+
+
+def record_session(game_directory, summary):
+    with _sessions_lock:
+        path = _sessions_path(game_directory)
+        try:
+            history = load_json_file(path, {})
+        except ValueError:
+            history = {}
+        if not isinstance(history, dict):
+            history = {}
+        summaries = history.setdefault(summary["version_id"], [])
+        summaries.append(summary)
+        del summaries[:-SESSIONS_PER_VERSION]
+        save_json_atomic(path, history, indent=2)
+
+
+GAME_SUPERVISOR = GameSupervisor()
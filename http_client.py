@@ -1,10 +1,17 @@
+import threading
 import time
+from http.cookiejar import DefaultCookiePolicy
 
 import requests
+from requests.adapters import HTTPAdapter
 
 
 DEFAULT_TIMEOUT = 30
 DEFAULT_USER_AGENT = "McGo/1.0"
+POOL_CONNECTIONS = 16
+POOL_MAXSIZE = 32
+_session = None
+_session_lock = threading.Lock()
 
 
 class HttpRequestError(RuntimeError):
@@ -21,6 +28,23 @@ def _headers(headers=None):
     return merged
 
 
+def session():
+    """Process-wide requests.Session so blocking callers reuse keep-alive connections.
+
+    Cookies are never stored on the shared session; callers that need them pass cookies=.
+    """
+    global _session
+    with _session_lock:
+        if _session is None:
+            shared = requests.Session()
+            shared.cookies.set_policy(DefaultCookiePolicy(allowed_domains=[]))
+            adapter = HTTPAdapter(pool_connections=POOL_CONNECTIONS, pool_maxsize=POOL_MAXSIZE)
+            shared.mount("https://", adapter)
+            shared.mount("http://", adapter)
+            _session = shared
+        return _session
+
+
 def _friendly_request_error(exc, url):
     if isinstance(exc, requests.Timeout):
         return f"网络请求超时：{url}"
@@ -33,7 +57,7 @@ def request(method, url, *, timeout=DEFAULT_TIMEOUT, retries=2, headers=None, **
     last_error = None
     for attempt in range(max(1, retries + 1)):
         try:
-            response = requests.request(
+            response = session().request(
                 method,
                 url,
                 timeout=timeout,
@@ -0,0 +1,153 @@
+import os
+import shutil
+import threading
+import time
+
+from file_utils import sanitize_filename
+from log_utils import get_logger
+from storage_utils import load_json_file, save_json_atomic
+
+
+STAGING_DIR = os.path.join(".mcgo", "staging")
+JOURNAL_FILE = os.path.join(".mcgo", "install-journal.json")
+JOURNAL_VERSION = 1
+STALE_STAGING_SECONDS = 7 * 24 * 3600
+STATE_STAGING = "staging"
+STATE_COMMITTING = "committing"
+_journal_lock = threading.Lock()
+logger = get_logger(__name__)
+
+
+def _journal_path(game_directory):
+    return os.path.join(game_directory, JOURNAL_FILE)
+
+
+def _load_journal(game_directory):
+    try:
+        journal = load_json_file(_journal_path(game_directory), {})
+    except (OSError, ValueError) as exc:
+        logger.warning("Install journal is unreadable, starting fresh: game_directory=%s error=%s", game_directory, exc)
+        return {}
+    if not isinstance(journal, dict) or journal.get("version") != JOURNAL_VERSION:
+        return {}
+    return journal.get("transactions", {})
+
+
+def _update_journal(game_directory, version_id, entry):
+    """Set (or with entry=None remove) the journal entry of version_id."""
+    with _journal_lock:
+        transactions = _load_journal(game_directory)
+        if entry is None:
+            if version_id not in transactions:
+                return
+            transactions.pop(version_id)
+        else:
+            transactions[version_id] = entry
+        path = _journal_path(game_directory)
+        if transactions:
+            save_json_atomic(path, {"version": JOURNAL_VERSION, "transactions": transactions}, indent=2)
+        else:
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+
+
+class InstallTransaction:
+    """Stage the files of versions/<id>/ and move them into place only once everything verified.
+
+    A version counts as installed as soon as versions/<id>/<id>.json exists, so the JSON and
+    the client jar are written below .mcgo/staging/<id> instead. Shared libraries and assets
+    keep going to their final paths: each of them is already replaced atomically after its
+    SHA1 check and other versions may use them. The journal records each transaction so an
+    interrupted commit is rolled forward and an interrupted download resumes its staged
+    .part files on the next attempt.
+    """
+
+    def __init__(self, game_directory, version_id):
+        self.game_directory = os.path.abspath(game_directory)
+        self.version_id = version_id
+        self.version_directory = os.path.join(self.game_directory, "versions", version_id)
+        self.staging_directory = os.path.join(self.game_directory, STAGING_DIR, sanitize_filename(version_id, "version"))
+
+    def begin(self):
+        os.makedirs(self.staging_directory, exist_ok=True)
+        self._write_state(STATE_STAGING)
+        logger.debug("Install transaction started: version=%s staging=%s", self.version_id, self.staging_directory)
+        return self
+
+    def _write_state(self, state):
+        _update_journal(self.game_directory, self.version_id, {
+            "state": state,
+            "staging_directory": os.path.relpath(self.staging_directory, self.game_directory),
+            "updated_at": time.time(),
+        })
+
+    def staged_path(self, final_path):
+        """Return where final_path is staged, or None for paths outside versions/<id>/."""
+        relative = os.path.relpath(os.path.abspath(final_path), self.version_directory)
+        if relative == os.curdir or relative.startswith(os.pardir + os.sep) or relative == os.pardir or os.path.isabs(relative):
+            return None
+        return os.path.join(self.staging_directory, relative)
+
+    def stage_jobs(self, jobs):
+        """Redirect the jobs that target versions/<id>/ into the staging directory."""
+        staged = []
+        for job in jobs:
+            staged_path = self.staged_path(job.file_path)
+            if staged_path:
+                staged.append((job, job.file_path))
+                job.file_path = staged_path
+        return staged
+
+    def commit(self):
+        """Move every staged file into versions/<id>/, the version JSON last."""
+        self._write_state(STATE_COMMITTING)
+        moved = _move_staged_files(self.staging_directory, self.version_directory, f"{self.version_id}.json")
+        shutil.rmtree(self.staging_directory, ignore_errors=True)
+        _update_journal(self.game_directory, self.version_id, None)
+        logger.info("Install transaction committed: version=%s files=%d", self.version_id, moved)
+        return moved
+
+    def rollback(self):
+        shutil.rmtree(self.staging_directory, ignore_errors=True)
+        _update_journal(self.game_directory, self.version_id, None)
+        logger.info("Install transaction rolled back: version=%s", self.version_id)
+
+
+def _move_staged_files(staging_directory, target_directory, last_name):
+    staged = []
+    for root, _dirs, files in os.walk(staging_directory):
+        for name in files:
+            path = os.path.join(root, name)
+            if name.endswith(".part"):
+                continue
+            staged.append(os.path.relpath(path, staging_directory))
+    # The version JSON is what makes a version visible, so it only lands after everything else.
+    staged.sort(key=lambda relative: relative == last_name)
+    for relative in staged:
+        target_path = os.path.join(target_directory, relative)
+        os.makedirs(os.path.dirname(target_path), exist_ok=True)
+        os.replace(os.path.join(staging_directory, relative), target_path)
+    return len(staged)
+
+
+def recover_transactions(game_directory, now=None):
+    """Finish interrupted commits and drop stale or orphaned staging; returns {version: action}."""
+    now = time.time() if now is None else now
+    actions = {}
+    for version_id, entry in list(_load_journal(game_directory).items()):
+        transaction = InstallTransaction(game_directory, version_id)
+        state = entry.get("state") if isinstance(entry, dict) else ""
+        if state == STATE_COMMITTING and os.path.isdir(transaction.staging_directory):
+            transaction.commit()
+            actions[version_id] = "committed"
+        elif not os.path.isdir(transaction.staging_directory):
+            _update_journal(game_directory, version_id, None)
+            actions[version_id] = "dropped"
+        elif now - float(entry.get("updated_at") or 0) > STALE_STAGING_SECONDS:
+            transaction.rollback()
+            actions[version_id] = "rolled_back"
+    if actions:
+        logger.info("Install journal recovered: game_directory=%s actions=%s", game_directory, actions)
+    return actions
@@ -6,7 +6,10 @@ import zipfile
 from io import BytesIO
 
 import http_client
+from bandwidth import BANDWIDTH_LIMITER
+from file_utils import sha1_file
 from log_utils import get_logger
+from storage_utils import load_json_file, save_json_atomic
 
 
 MIRROR_SOURCES = {
@@ -104,77 +107,152 @@ def mirror_root(mirror_source):
     return MIRROR_SOURCES.get(mirror_source, MIRROR_SOURCES["official"])
 
 
-def stream_download(url, file_path, progress_callback=None, status_label="下载中", mirror_source=None):
+def _emit_stream_progress(progress_callback, status_label, file_path, downloaded, total, speed, completed):
+    if not progress_callback or not total:
+        return
+    progress_callback({
+        "progress": 1.0 if completed else min(1.0, downloaded / total),
+        "phase": status_label,
+        "current_file": os.path.basename(file_path),
+        "downloaded_bytes": downloaded,
+        "total_bytes": total,
+        "speed_bytes": speed,
+        "completed_files": 1 if completed else 0,
+        "total_files": 1,
+        "reused_files": 0,
+    })
+
+
+def _response_validator(response):
+    """If-Range value identifying the representation being downloaded; weak ETags cannot be used."""
+    etag = response.headers.get("etag") or ""
+    if etag and not etag.startswith("W/"):
+        return etag
+    return response.headers.get("last-modified") or ""
+
+
+def _discard_partial(part_path):
+    for path in (part_path, f"{part_path}.validator"):
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+
+def stream_download(
+    url,
+    file_path,
+    progress_callback=None,
+    status_label="下载中",
+    mirror_source=None,
+    expected_size=0,
+    expected_sha1="",
+):
+    """Download url into file_path through a .part file, resuming with Range across mirror fallbacks.
+
+    A leftover .part is only resumed when the result can be validated: either the caller
+    knows its SHA1, or the response that started it carried a strong ETag / Last-Modified,
+    which is sent back as If-Range so a file that changed upstream is downloaded again
+    in full instead of being spliced onto stale bytes.
+    """
     os.makedirs(os.path.dirname(file_path), exist_ok=True)
     logger.info("Starting stream download: label=%s target=%s url=%s", status_label, os.path.abspath(file_path), url)
+    part_path = f"{file_path}.part"
+    validator_path = f"{part_path}.validator"
     downloaded = 0
+    last_error = None
     try:
-        response = None
-        last_error = None
         for source in mirror_source_sequence(mirror_source or "official"):
             candidate_url = rewrite_download_url_for_mirror(url, source)
+            offset = os.path.getsize(part_path) if os.path.isfile(part_path) else 0
+            try:
+                validator = load_json_file(validator_path, {}).get("if_range", "") if offset else ""
+            except (OSError, ValueError, AttributeError):
+                validator = ""
+            if offset and (not (validator or expected_sha1) or (expected_size and offset > expected_size)):
+                logger.info("Discarding unverifiable partial download: label=%s bytes=%d target=%s", status_label, offset, part_path)
+                _discard_partial(part_path)
+                offset = 0
+            headers = None
+            if offset:
+                headers = {"Range": f"bytes={offset}-"}
+                if validator:
+                    headers["If-Range"] = validator
+            response = None
             try:
-                response = http_client.get(candidate_url, stream=True, timeout=60)
+                response = http_client.get(candidate_url, stream=True, timeout=60, headers=headers)
+                if offset and response.status_code == 416:
+                    _discard_partial(part_path)
+                    raise RuntimeError(f"断点续传范围无效：{candidate_url}")
                 http_client.raise_for_status(response, "下载文件")
-                url = candidate_url
-                break
+                if offset and response.status_code == 206 and validator and _response_validator(response) != validator:
+                    # The server ignored If-Range; the ranged body may belong to a newer file.
+                    _discard_partial(part_path)
+                    raise RuntimeError(f"远程文件已变化，无法续传：{candidate_url}")
             except Exception as exc:
                 if response is not None:
                     response.close()
-                response = None
                 last_error = exc
                 logger.warning("Stream download source failed: label=%s mirror=%s url=%s error=%s", status_label, source, candidate_url, exc)
-        if response is None:
-            raise last_error or RuntimeError(f"下载失败：{url}")
-        with response:
-            total = int(response.headers.get("content-length") or 0)
-            logger.debug(
-                "Stream download response: label=%s status=%s total_bytes=%d target=%s",
-                status_label,
-                response.status_code,
-                total,
-                os.path.abspath(file_path),
-            )
-            last_tick = time.monotonic()
-            last_bytes = 0
-            with open(file_path, "wb") as file_handle:
-                for chunk in response.iter_content(chunk_size=128 * 1024):
-                    if not chunk:
-                        continue
-                    file_handle.write(chunk)
-                    downloaded += len(chunk)
-                    now = time.monotonic()
-                    if progress_callback and total:
-                        speed = 0
-                        elapsed = max(now - last_tick, 1e-6)
-                        if downloaded > last_bytes:
-                            speed = max(0, int((downloaded - last_bytes) / elapsed))
-                            last_bytes = downloaded
-                            last_tick = now
-                        progress_callback({
-                            "progress": min(1.0, downloaded / total),
-                            "phase": status_label,
-                            "current_file": os.path.basename(file_path),
-                            "downloaded_bytes": downloaded,
-                            "total_bytes": total,
-                            "speed_bytes": speed,
-                            "completed_files": 0,
-                            "total_files": 1,
-                            "reused_files": 0,
-                        })
-            if progress_callback and total:
-                progress_callback({
-                    "progress": 1.0,
-                    "phase": status_label,
-                    "current_file": os.path.basename(file_path),
-                    "downloaded_bytes": downloaded,
-                    "total_bytes": total,
-                    "speed_bytes": 0,
-                    "completed_files": 1,
-                    "total_files": 1,
-                    "reused_files": 0,
-                })
-        logger.info("Stream download finished: label=%s bytes=%d target=%s", status_label, downloaded, os.path.abspath(file_path))
+                continue
+
+            url = candidate_url
+            with response:
+                resumed = bool(offset) and response.status_code == 206
+                downloaded = offset if resumed else 0
+                total = int(response.headers.get("content-length") or 0)
+                if total and resumed:
+                    total += offset
+                if not resumed:
+                    response_validator = _response_validator(response)
+                    if response_validator:
+                        save_json_atomic(validator_path, {"url": candidate_url, "if_range": response_validator}, indent=None)
+                    else:
+                        _discard_partial(part_path)
+                logger.debug(
+                    "Stream download response: label=%s status=%s total_bytes=%d resumed_from=%d target=%s",
+                    status_label,
+                    response.status_code,
+                    total,
+                    downloaded,
+                    os.path.abspath(file_path),
+                )
+                last_tick = time.monotonic()
+                last_bytes = downloaded
+                try:
+                    with open(part_path, "ab" if resumed else "wb") as file_handle:
+                        for chunk in response.iter_content(chunk_size=128 * 1024):
+                            if not chunk:
+                                continue
+                            file_handle.write(chunk)
+                            downloaded += len(chunk)
+                            BANDWIDTH_LIMITER.consume(len(chunk))
+                            now = time.monotonic()
+                            speed = 0
+                            if downloaded > last_bytes:
+                                speed = max(0, int((downloaded - last_bytes) / max(now - last_tick, 1e-6)))
+                                last_bytes = downloaded
+                                last_tick = now
+                            _emit_stream_progress(progress_callback, status_label, file_path, downloaded, total, speed, False)
+                except Exception as exc:
+                    last_error = exc
+                    logger.warning("Stream download interrupted: label=%s url=%s bytes=%d error=%s", status_label, candidate_url, downloaded, exc)
+                    continue
+            if total and downloaded != total:
+                last_error = RuntimeError(f"下载不完整：{downloaded}/{total} 字节")
+                logger.warning("Stream download incomplete: label=%s url=%s bytes=%d total=%d", status_label, candidate_url, downloaded, total)
+                continue
+            if (expected_size and downloaded != expected_size) or (expected_sha1 and sha1_file(part_path).lower() != expected_sha1.lower()):
+                _discard_partial(part_path)
+                last_error = RuntimeError(f"下载文件校验失败：{os.path.basename(file_path)}")
+                logger.warning("Stream download failed verification: label=%s url=%s bytes=%d", status_label, candidate_url, downloaded)
+                continue
+            os.replace(part_path, file_path)
+            _discard_partial(part_path)
+            _emit_stream_progress(progress_callback, status_label, file_path, downloaded, total, 0, True)
+            logger.info("Stream download finished: label=%s bytes=%d target=%s", status_label, downloaded, os.path.abspath(file_path))
+            return
+        raise last_error or RuntimeError(f"下载失败：{url}")
     except Exception:
         logger.exception("Stream download failed: label=%s bytes=%d target=%s url=%s", status_label, downloaded, os.path.abspath(file_path), url)
         raise
@@ -247,7 +325,15 @@ def download_profile_libraries(profile_json, game_dir, mirror_source, progress_c
                     "reused_files": completed_files,
                 })
             continue
-        stream_download(artifact_url, target_path, progress_callback, "下载安装依赖")
+        artifact = (library.get("downloads") or {}).get("artifact") or {}
+        stream_download(
+            artifact_url,
+            target_path,
+            progress_callback,
+            "下载安装依赖",
+            expected_size=library.get("size") or artifact.get("size") or 0,
+            expected_sha1=library.get("sha1") or artifact.get("sha1") or "",
+        )
         completed_files += 1
 
 
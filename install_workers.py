@@ -1,4 +1,3 @@
-import asyncio
 import json
 import os
 import shutil
@@ -7,7 +6,20 @@ import threading
 
 from PyQt6.QtCore import QThread, QObject, pyqtSignal as Signal
 
-from downloader import collect_missing_game_files, download_game_files, extract_natives, repair_game_files
+from download_engine import DOWNLOAD_ENGINE
+from download_scheduler import CancelToken
+from downloader import (
+    batch_download_report_path,
+    collect_missing_game_files,
+    download_assets,
+    download_game_files,
+    download_report_path,
+    download_versions,
+    extract_natives,
+    pending_deferred_assets,
+    repair_game_files,
+    repair_options,
+)
 from external_auth import authlib_injector_download_url
 from file_utils import sanitize_filename
 from install_services import MIRROR_SOURCES, get_version_metadata_with_fallback, stream_download
@@ -53,9 +65,11 @@ class DownloadWorker(QObject):
         self.download_options = dict(download_options or {})
         self.global_isolation = global_isolation
         self._cancel_event = threading.Event()
+        self._cancel_token = CancelToken(self.is_cancel_requested)
 
     def request_stop(self):
         self._cancel_event.set()
+        self._cancel_token.cancel()
 
     def is_cancel_requested(self):
         thread = QThread.currentThread()
@@ -85,20 +99,20 @@ class DownloadWorker(QObject):
                 self.metrics.emit(snapshot)
 
             self.status.emit(f"正在下载 Minecraft {self.version_id}...")
-            asyncio.run(download_game_files(
+            DOWNLOAD_ENGINE.run(download_game_files(
                 version_json,
                 self.game_dir,
                 self.version_id,
                 resolved_mirror_root,
                 progress_callback=on_progress,
-                cancel_callback=self.is_cancel_requested,
+                cancel_token=self._cancel_token,
                 **self.download_options,
             ))
             if self.is_cancel_requested():
                 raise RuntimeError("下载任务已取消")
             self.status.emit("正在解压 natives...")
             extract_natives(version_json, self.game_dir, self.version_id)
-            payload = {"version": self.version_id}
+            payload = {"version": self.version_id, "download_report": download_report_path(self.game_dir, self.version_id)}
             if self.auto_install_types:
                 self.install_status.emit("原版下载完成，开始安装附加组件...")
 
@@ -125,6 +139,91 @@ class DownloadWorker(QObject):
             self.failed.emit(str(exc))
 
 
+class BatchDownloadWorker(QObject):
+    """Download several vanilla versions into one game directory as a single deduplicated batch."""
+
+    progress = Signal(int)
+    metrics = Signal(dict)
+    status = Signal(str)
+    finished = Signal(dict)
+    failed = Signal(str)
+
+    def __init__(self, version_ids, mirror_source, game_dir, download_options=None):
+        super().__init__()
+        self.version_ids = list(version_ids)
+        self.mirror_source = mirror_source
+        self.game_dir = os.path.abspath(game_dir)
+        self.download_options = dict(download_options or {})
+        self._cancel_event = threading.Event()
+        self._cancel_token = CancelToken(self.is_cancel_requested)
+
+    def request_stop(self):
+        self._cancel_event.set()
+        self._cancel_token.cancel()
+
+    def is_cancel_requested(self):
+        thread = QThread.currentThread()
+        return self._cancel_event.is_set() or (thread and thread.isInterruptionRequested())
+
+    def run(self):
+        try:
+            logger.info(
+                "BatchDownloadWorker started: versions=%s mirror=%s game_dir=%s",
+                self.version_ids,
+                self.mirror_source,
+                self.game_dir,
+            )
+            version_jsons = []
+            resolved_sources = []
+            for version_id in self.version_ids:
+                if self.is_cancel_requested():
+                    raise RuntimeError("下载任务已取消")
+                self.status.emit(f"正在获取 {version_id} 版本信息...")
+                version_json, resolved_source = get_version_metadata_with_fallback(
+                    version_id,
+                    self.mirror_source,
+                    status_callback=self.status.emit,
+                )
+                version_jsons.append(version_json)
+                resolved_sources.append(resolved_source)
+            # One plan downloads from one mirror; the scoreboard still falls back per file.
+            resolved_mirror_root = MIRROR_SOURCES[resolved_sources[0]]
+
+            def on_progress(snapshot):
+                self.progress.emit(_progress_percent(snapshot))
+                self.metrics.emit(snapshot)
+
+            def on_plan(summary):
+                self.status.emit(
+                    f"下载计划：{len(summary['versions'])} 个版本共 {summary['requested_files']} 个文件，"
+                    f"去重后 {summary['unique_files']} 个，需下载 {summary['fetch_files']} 个"
+                )
+
+            self.status.emit(f"正在批量下载 {len(version_jsons)} 个版本...")
+            DOWNLOAD_ENGINE.run(download_versions(
+                version_jsons,
+                self.game_dir,
+                resolved_mirror_root,
+                progress_callback=on_progress,
+                plan_callback=on_plan,
+                cancel_token=self._cancel_token,
+                **self.download_options,
+            ))
+            if self.is_cancel_requested():
+                raise RuntimeError("下载任务已取消")
+            payload = {
+                "version": "、".join(self.version_ids),
+                "versions": self.version_ids,
+                "download_report": batch_download_report_path(self.game_dir),
+            }
+            self.progress.emit(100)
+            logger.info("BatchDownloadWorker finished: payload=%s", payload)
+            self.finished.emit(payload)
+        except Exception as exc:
+            logger.exception("BatchDownloadWorker failed: versions=%s", self.version_ids)
+            self.failed.emit(str(exc))
+
+
 class InstallWorker(QObject):
     progress = Signal(int)
     metrics = Signal(dict)
@@ -196,9 +295,11 @@ class RepairWorker(QObject):
         self.game_dir = os.path.abspath(game_dir)
         self.download_options = dict(download_options or {})
         self._cancel_event = threading.Event()
+        self._cancel_token = CancelToken(self.is_cancel_requested)
 
     def request_stop(self):
         self._cancel_event.set()
+        self._cancel_token.cancel()
 
     def is_cancel_requested(self):
         thread = QThread.currentThread()
@@ -228,19 +329,30 @@ class RepairWorker(QObject):
                     raise RuntimeError("修复任务已取消")
                 version_id = version_json.get("id", self.version_id)
                 self.status.emit(f"正在校验并补全 {version_id}（{index}/{len(chain)}）...")
-                missing_before = collect_missing_game_files(version_json, self.game_dir, version_id)
+                missing_before = collect_missing_game_files(
+                    version_json,
+                    self.game_dir,
+                    version_id,
+                    deep_verify=self.download_options.get("deep_verify", False),
+                    hash_workers=self.download_options.get("hash_workers", 0),
+                )
                 logger.info("Repair scan before: version=%s missing=%d", version_id, len(missing_before))
                 total_missing_before += len(missing_before)
-                asyncio.run(repair_game_files(
+                DOWNLOAD_ENGINE.run(repair_game_files(
                     version_json,
                     self.game_dir,
                     version_id,
                     MIRROR_SOURCES[self.mirror_source],
                     progress_callback=on_progress,
-                    cancel_callback=self.is_cancel_requested,
-                    **self.download_options,
+                    cancel_token=self._cancel_token,
+                    **repair_options(self.download_options),
                 ))
-                missing_after = collect_missing_game_files(version_json, self.game_dir, version_id)
+                missing_after = collect_missing_game_files(
+                    version_json,
+                    self.game_dir,
+                    version_id,
+                    hash_workers=self.download_options.get("hash_workers", 0),
+                )
                 logger.info("Repair scan after: version=%s missing=%d", version_id, len(missing_after))
                 total_missing_after += len(missing_after)
                 if missing_after:
@@ -269,6 +381,60 @@ class RepairWorker(QObject):
             self.failed.emit(str(exc))
 
 
+class DeferredAssetWorker(QObject):
+    """Fetch assets deferred by fast first launch while the game is running."""
+
+    status = Signal(str)
+    finished = Signal(dict)
+    failed = Signal(str)
+
+    def __init__(self, version_id, mirror_source, game_dir, download_options=None):
+        super().__init__()
+        self.version_id = version_id
+        self.mirror_source = mirror_source
+        self.game_dir = os.path.abspath(game_dir)
+        self.download_options = dict(download_options or {})
+        self._cancel_token = CancelToken()
+
+    def request_stop(self):
+        self._cancel_token.cancel()
+
+    def run(self):
+        try:
+            pending = pending_deferred_assets(self.game_dir)
+            chain = get_version_inheritance_chain(self.game_dir, self.version_id)
+            targets = [
+                version_json
+                for version_json in chain
+                if version_json.get("assetIndex", {}).get("id") in pending
+            ]
+            options = {
+                key: value
+                for key, value in self.download_options.items()
+                if key not in {"max_core_concurrency", "min_core_concurrency", "fast_first_launch"}
+            }
+            fetched = 0
+            for version_json in targets:
+                asset_index_id = version_json["assetIndex"]["id"]
+                logger.info("Deferred asset download started: version=%s asset_index=%s objects=%d", self.version_id, asset_index_id, pending[asset_index_id])
+                self.status.emit(f"正在后台下载 {self.version_id} 的剩余资源文件（{pending[asset_index_id]} 个）...")
+                DOWNLOAD_ENGINE.run(download_assets(
+                    version_json,
+                    self.game_dir,
+                    version_json.get("id", self.version_id),
+                    MIRROR_SOURCES[self.mirror_source],
+                    cancel_token=self._cancel_token,
+                    background=True,
+                    **options,
+                ))
+                fetched += pending[asset_index_id]
+            logger.info("Deferred asset download finished: version=%s objects=%d", self.version_id, fetched)
+            self.finished.emit({"version": self.version_id, "objects": fetched})
+        except Exception as exc:
+            logger.exception("DeferredAssetWorker failed: version=%s", self.version_id)
+            self.failed.emit(str(exc))
+
+
 class AuthlibInjectorDownloadWorker(QObject):
     progress = Signal(int)
     status = Signal(str)
@@ -0,0 +1,136 @@
+import os
+
+from app_settings import AUTO_GC_STRATEGY, system_memory_mb
+from game_process import load_session_history
+from log_utils import get_logger
+
+
+MIN_HEAP_MB = 1024
+MAX_HEAP_MB = 16384
+HEAP_STEP_MB = 256
+HEAP_HEADROOM = 1.25
+OOM_GROWTH = 1.5
+MAX_SHRINK = 0.75
+# Metaspace, code cache, thread stacks and LWJGL buffers live outside -Xmx but inside RSS.
+NON_HEAP_BASE_MB = 384
+NON_HEAP_PER_MOD_MB = 2
+HISTORY_SESSIONS = 5
+MIN_SIZING_SESSION_SECONDS = 120
+ZGC_MIN_HEAP_MB = 12288
+ZGC_MIN_JAVA = 21
+# (minimum enabled mods, heap in MB) from light to heavy instances.
+MOD_HEAP_STEPS = ((0, 2048), (40, 3072), (120, 4096), (250, 6144), (400, 8192))
+logger = get_logger(__name__)
+
+
+def count_mods(mods_directory):
+    try:
+        with os.scandir(mods_directory) as entries:
+            return sum(1 for entry in entries if entry.name.lower().endswith(".jar") and entry.is_file())
+    except OSError:
+        return 0
+
+
+def _heap_for_mods(mod_count):
+    heap_mb = MOD_HEAP_STEPS[0][1]
+    for minimum_mods, step_heap_mb in MOD_HEAP_STEPS:
+        if mod_count >= minimum_mods:
+            heap_mb = step_heap_mb
+    return heap_mb
+
+
+def _round_heap(value):
+    return int(value // HEAP_STEP_MB * HEAP_STEP_MB)
+
+
+def tune_jvm_memory(mod_count=0, history=(), total_mb=0, available_mb=0, java_major=None):
+    """Propose heap and GC settings for one launch.
+
+    The starting point comes from the number of enabled mods. Recent sessions of the same
+    version then take over: an OutOfMemoryError grows the heap by half. Otherwise the heap
+    used by sessions that ran long enough is estimated as peak RSS minus a non-heap
+    allowance, plus a quarter of headroom. A clean session never raises the heap it ran
+    with (G1 commits up to -Xmx, so RSS cannot show that more was needed) and one session
+    shrinks it by at most a quarter, never below half of the mod based estimate. The
+    result is capped by the memory currently free on the machine after a system reserve.
+    """
+    mod_heap_mb = _heap_for_mods(mod_count)
+    target_mb = mod_heap_mb
+    reasons = [f"{mod_count} 个 Mod"]
+
+    recent = [item for item in list(history)[-HISTORY_SESSIONS:] if isinstance(item, dict)]
+    out_of_memory = [item for item in recent if item.get("oom")]
+    sized = [
+        item
+        for item in recent
+        if not item.get("oom")
+        and item.get("peak_rss_mb")
+        and (item.get("duration_seconds") or 0) >= MIN_SIZING_SESSION_SECONDS
+    ]
+    if out_of_memory:
+        previous_mb = max(int(item.get("max_memory_mb") or 0) for item in out_of_memory)
+        target_mb = max(mod_heap_mb, int(previous_mb * OOM_GROWTH))
+        reasons.append(f"最近在 {previous_mb} MB 下内存不足")
+    elif sized:
+        observed_mb = max(float(item["peak_rss_mb"]) for item in sized)
+        heap_used_mb = observed_mb - NON_HEAP_BASE_MB - NON_HEAP_PER_MOD_MB * mod_count
+        target_mb = max(mod_heap_mb // 2, int(heap_used_mb * HEAP_HEADROOM))
+        previous_mb = int(sized[-1].get("max_memory_mb") or 0)
+        if previous_mb:
+            target_mb = max(int(previous_mb * MAX_SHRINK), min(previous_mb, target_mb))
+        reasons.append(f"最近 {len(sized)} 次峰值内存 {observed_mb:.0f} MB")
+
+    if available_mb > 0:
+        reserve_mb = 2048 if total_mb >= 8192 else 1024
+        cap_mb = max(MIN_HEAP_MB, available_mb - reserve_mb)
+        if target_mb > cap_mb:
+            target_mb = cap_mb
+            reasons.append(f"可用内存 {available_mb} MB")
+
+    max_memory_mb = max(MIN_HEAP_MB, min(MAX_HEAP_MB, _round_heap(target_mb)))
+    if max_memory_mb < 4096:
+        region_mb = 4
+    elif max_memory_mb < 12288:
+        region_mb = 8
+    else:
+        region_mb = 16
+    return {
+        "max_memory_mb": max_memory_mb,
+        # A quarter of the maximum as initial heap avoids early resize cycles without reserving it all.
+        "min_memory_mb": max(512, _round_heap(max_memory_mb // 4)),
+        "gc_strategy": "ZGC" if (java_major or 0) >= ZGC_MIN_JAVA and max_memory_mb >= ZGC_MIN_HEAP_MB else "G1GC",
+        "gc_region_mb": region_mb,
+        "reason": "，".join(reasons),
+    }
+
+
+def auto_memory_options(game_directory, version_id, mods_directory, java_major=None):
+    """tune_jvm_memory for version_id using its mods folder, session history and free memory."""
+    total_mb, available_mb = system_memory_mb()
+    tuned = tune_jvm_memory(
+        mod_count=count_mods(mods_directory),
+        history=load_session_history(game_directory, version_id),
+        total_mb=total_mb,
+        available_mb=available_mb,
+        java_major=java_major,
+    )
+    logger.debug(
+        "JVM memory tuned: version=%s xmx=%d xms=%d gc=%s region=%dM reason=%s",
+        version_id,
+        tuned["max_memory_mb"],
+        tuned["min_memory_mb"],
+        tuned["gc_strategy"],
+        tuned["gc_region_mb"],
+        tuned["reason"],
+    )
+    return tuned
+
+
+def apply_auto_memory(launch_options, tuned):
+    """Copy tuned settings into launch_options; a GC chosen in the version settings is kept."""
+    launch_options["max_memory_mb"] = tuned["max_memory_mb"]
+    launch_options["min_memory_mb"] = tuned["min_memory_mb"]
+    launch_options["gc_region_mb"] = tuned["gc_region_mb"]
+    if launch_options.get("gc_strategy", AUTO_GC_STRATEGY) == AUTO_GC_STRATEGY:
+        launch_options["gc_strategy"] = tuned["gc_strategy"]
+    return launch_options
@@ -0,0 +1,208 @@
+import asyncio
+import os
+import subprocess
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+from auth import MicrosoftAuthenticator, cached_minecraft_token
+from external_auth import refresh_external_account
+from java_utils import get_java_major_version
+from launcher import get_version_inheritance_chain, infer_required_java_version, load_launch_plan
+from log_utils import get_logger
+from process_utils import hidden_subprocess_kwargs
+
+
+LAUNCH_STAGE_WORKERS = 4
+logger = get_logger(__name__)
+
+
+def run_stage_graph(stages, on_stage_done=None, max_workers=LAUNCH_STAGE_WORKERS):
+    """Run {name: (dependencies, function)} concurrently, each stage as soon as its dependencies finished.
+
+    function(results) receives the results of the stages finished so far. The first failing
+    stage cancels everything not yet started and its exception is raised; stages already
+    running are left to finish in the background. Returns {name: result}.
+    """
+    for name, (dependencies, _function) in stages.items():
+        unknown = [dependency for dependency in dependencies if dependency not in stages]
+        if unknown:
+            raise ValueError(f"stage {name} depends on unknown stages {unknown}")
+
+    results = {}
+    pending = dict(stages)
+    running = {}
+    started_at = {}
+    executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="mcgo-launch")
+    try:
+        while pending or running:
+            for name, (dependencies, function) in list(pending.items()):
+                if all(dependency in results for dependency in dependencies):
+                    started_at[name] = time.perf_counter()
+                    running[executor.submit(function, results)] = name
+                    pending.pop(name)
+            if not running:
+                raise ValueError(f"launch stages have a dependency cycle: {sorted(pending)}")
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                name = running.pop(future)
+                results[name] = future.result()
+                logger.debug("Launch stage finished: stage=%s seconds=%.3f", name, time.perf_counter() - started_at[name])
+                if on_stage_done:
+                    on_stage_done(name, results[name])
+    finally:
+        executor.shutdown(wait=False, cancel_futures=True)
+    return results
+
+
+def prepare_account(account, client_id, redirect_uri, status=None):
+    """Validate or refresh account for launching; returns (account, username, uuid, access_token)."""
+    status = status or (lambda message: None)
+    account = dict(account)
+    username = account.get("username") or None
+    uuid = account.get("uuid") or None
+    token = account.get("access_token") or None
+
+    if account.get("type") == "offline":
+        if not username:
+            raise Exception("离线账号需要填写用户名。")
+        return account, username, uuid, token
+
+    if account.get("type") == "microsoft":
+        cached_token = cached_minecraft_token(account)
+        if cached_token:
+            logger.info("Reusing cached Minecraft access token: username=%s expires_at=%s", username, account.get("access_token_expires_at"))
+            return account, username, uuid, cached_token
+        refresh_token = account.get("refresh_token", "")
+        if not refresh_token:
+            raise Exception("该 Microsoft 账号没有可用的刷新令牌，请重新登录。")
+        status("正在刷新 Microsoft 登录状态...")
+        session = MicrosoftAuthenticator(client_id, redirect_uri)
+        asyncio.run(session.refresh_access_token(refresh_token))
+        uuid, username, _ = asyncio.run(session.get_minecraft_profile())
+        account["refresh_token"] = session.refresh_token
+        account["access_token"] = session.minecraft_access_token
+        account["access_token_expires_at"] = session.minecraft_token_expires_at
+        account["username"] = username
+        account["uuid"] = uuid
+        account["display_name"] = username
+        return account, username, uuid, session.minecraft_access_token
+
+    if account.get("type") == "external":
+        if not username or not uuid or not token:
+            raise Exception("外置登录账号缺少用户名、UUID 或 Access Token，请重新登录。")
+        status("正在刷新或验证外置登录状态...")
+        account = refresh_external_account(account)
+        return (
+            account,
+            account.get("username") or username,
+            account.get("uuid") or uuid,
+            account.get("access_token") or token,
+        )
+
+    raise Exception(f"不支持的账号类型：{account.get('type')}")
+
+
+def check_java(java_path, game_directory, version_id, java_major=None):
+    """Probe the Java major version (unless already known) and reject runtimes older than the version requires."""
+    java_major = java_major or get_java_major_version(java_path)
+    required = infer_required_java_version(game_directory, version_id)
+    if java_major and required and java_major < required:
+        raise Exception(f"Minecraft {version_id} 至少需要 Java {required}，当前选择的是 Java {java_major}。")
+    return java_major
+
+
+def check_game_files(game_directory, version_id, hash_workers=0):
+    """Run the pre-launch integrity scan over the inheritance chain and raise listing the damaged files."""
+    from downloader import collect_missing_game_files
+
+    chain = get_version_inheritance_chain(game_directory, version_id)
+    if not chain:
+        raise Exception(f"未找到版本清单：{version_id}")
+
+    issues = []
+    for version_json in reversed(chain):
+        chain_id = version_json.get("id", version_id)
+        try:
+            missing = collect_missing_game_files(
+                version_json,
+                game_directory,
+                chain_id,
+                include_assets=True,
+                hash_workers=hash_workers,
+                skip_deferred=True,
+            )
+        except Exception as exc:
+            issues.append(f"{chain_id}: 完整性检查失败：{exc}")
+            continue
+        for item in missing[:20]:
+            issues.append(f"{chain_id}: {item.get('reason', '缺失')} {item.get('path') or item.get('label')}")
+        if len(missing) > 20:
+            issues.append(f"{chain_id}: 还有 {len(missing) - 20} 个文件未列出")
+    if issues:
+        preview = "\n".join(issues[:8])
+        if len(issues) > 8:
+            preview += f"\n还有 {len(issues) - 8} 项未列出。"
+        logger.warning("Pre-launch file check failed: version=%s issues=%d", version_id, len(issues))
+        raise Exception(f"启动前检查未通过：\n{preview}\n\n请先在版本维护中执行补全/修复。")
+
+
+def check_natives(plan):
+    natives_dir = plan["natives_dir"]
+    if not plan.get("natives_required"):
+        return natives_dir
+    try:
+        with os.scandir(natives_dir) as entries:
+            extracted = any(entries)
+    except OSError:
+        extracted = False
+    if not extracted:
+        raise Exception(f"{plan['version_name']}: natives 未解压，请先使用版本补全/修复")
+    return natives_dir
+
+
+def run_pre_launch_command(command, cwd):
+    if command:
+        subprocess.run(command, shell=True, cwd=cwd, check=True, **hidden_subprocess_kwargs())
+
+
+def launch_stages(
+    java_path,
+    version_id,
+    game_directory,
+    account,
+    launch_options,
+    client_id,
+    redirect_uri,
+    status=None,
+    java_major=None,
+    hash_workers=0,
+    on_account_refreshed=None,
+):
+    """Stage graph of the work before the JVM is spawned.
+
+    Account refresh, launch plan resolution (with the natives check that needs it), the
+    game file integrity scan and the Java probe are independent network / disk /
+    subprocess work and run concurrently; the pre-launch command only runs once all of
+    them succeeded. A refresh rotates the account's tokens, so on_account_refreshed(account)
+    is called as soon as it finishes, even if another stage fails the launch afterwards.
+    """
+    runtime_directory = launch_options.get("runtime_directory") or game_directory
+    pre_launch_command = (launch_options.get("pre_launch_command") or "").strip()
+
+    def refresh_account(results):
+        prepared = prepare_account(account, client_id, redirect_uri, status=status)
+        if on_account_refreshed and prepared[0] != account:
+            on_account_refreshed(prepared[0])
+        return prepared
+
+    return {
+        "account": ((), refresh_account),
+        "plan": ((), lambda results: load_launch_plan(game_directory, version_id)),
+        "natives": (("plan",), lambda results: check_natives(results["plan"])),
+        "files": ((), lambda results: check_game_files(game_directory, version_id, hash_workers=hash_workers)),
+        "java": ((), lambda results: check_java(java_path, game_directory, version_id, java_major=java_major)),
+        "pre_launch": (
+            ("account", "natives", "files", "java"),
+            lambda results: run_pre_launch_command(pre_launch_command, runtime_directory),
+        ),
+    }
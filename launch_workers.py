@@ -1,13 +1,9 @@
-import asyncio
-import subprocess
-
 from PyQt6.QtCore import QObject, pyqtSignal as Signal
 
-from auth import MicrosoftAuthenticator
-from external_auth import authlib_injector_args, refresh_external_account
+from external_auth import authlib_injector_args
+from launch_pipeline import launch_stages, run_stage_graph
 from launcher import launch_minecraft
 from log_utils import get_logger, redact_mapping
-from process_utils import hidden_subprocess_kwargs
 
 
 logger = get_logger(__name__)
@@ -19,8 +15,9 @@ class LaunchWorker(QObject):
     stage = Signal(str)
     finished = Signal(dict)
     failed = Signal(str)
+    account_refreshed = Signal(dict)
 
-    def __init__(self, java_path, version, game_dir, account, launch_options, client_id, redirect_uri):
+    def __init__(self, java_path, version, game_dir, account, launch_options, client_id, redirect_uri, java_major=None, hash_workers=0):
         super().__init__()
         self.java_path = java_path
         self.version = version
@@ -29,6 +26,8 @@ class LaunchWorker(QObject):
         self.launch_options = dict(launch_options or {})
         self.client_id = client_id
         self.redirect_uri = redirect_uri
+        self.java_major = java_major
+        self.hash_workers = hash_workers
 
     def run(self):
         try:
@@ -49,58 +48,42 @@ class LaunchWorker(QObject):
                 }),
                 len(self.launch_options.get("extra_jvm_args") or []),
             )
-            username = account.get("username") or None
-            uuid = account.get("uuid") or None
-            token = account.get("access_token") or None
+            stage_labels = {
+                "account": "账号登录校验",
+                "plan": "解析启动计划",
+                "natives": "校验 natives",
+                "files": "校验游戏文件",
+                "java": "检测 Java 版本",
+                "pre_launch": "执行启动前命令",
+            }
+            stages = launch_stages(
+                self.java_path,
+                self.version,
+                self.game_dir,
+                account,
+                self.launch_options,
+                self.client_id,
+                self.redirect_uri,
+                status=self.status.emit,
+                java_major=self.java_major,
+                hash_workers=self.hash_workers,
+                on_account_refreshed=self.account_refreshed.emit,
+            )
+            completed = []
 
-            if account.get("type") == "offline":
-                if not username:
-                    raise Exception("离线账号需要填写用户名。")
-                self.stage.emit("离线账号校验")
-                self.progress.emit(25)
-            elif account.get("type") == "microsoft":
-                refresh_token = account.get("refresh_token", "")
-                if not refresh_token:
-                    raise Exception("该 Microsoft 账号没有可用的刷新令牌，请重新登录。")
+            def on_stage_done(name, _result):
+                completed.append(name)
+                self.stage.emit(stage_labels.get(name, name))
+                self.progress.emit(10 + 60 * len(completed) // len(stages))
 
-                self.stage.emit("刷新 Microsoft 登录")
-                self.progress.emit(20)
-                self.status.emit("正在刷新 Microsoft 登录状态...")
-                session = MicrosoftAuthenticator(self.client_id, self.redirect_uri)
-                asyncio.run(session.refresh_access_token(refresh_token))
-                uuid, username, _ = asyncio.run(session.get_minecraft_profile())
-                token = session.minecraft_access_token
-                account["refresh_token"] = session.refresh_token
-                account["username"] = username
-                account["uuid"] = uuid
-                account["display_name"] = username
-            elif account.get("type") == "external":
-                if not username or not uuid or not token:
-                    raise Exception("外置登录账号缺少用户名、UUID 或 Access Token，请重新登录。")
-                self.stage.emit("外置登录校验")
-                self.progress.emit(18)
-                self.status.emit("正在刷新或验证外置登录状态...")
-                account = refresh_external_account(account)
-                username = account.get("username") or username
-                uuid = account.get("uuid") or uuid
-                token = account.get("access_token") or token
-                self.progress.emit(25)
-                self.status.emit("正在使用外置登录账号启动...")
-            else:
-                raise Exception(f"不支持的账号类型：{account.get('type')}")
+            self.stage.emit("准备启动")
+            self.progress.emit(10)
+            self.status.emit("正在并行校验账号、启动计划、游戏文件和 Java...")
+            results = run_stage_graph(stages, on_stage_done=on_stage_done)
+            account, username, uuid, token = results["account"]
 
             self.stage.emit("构建启动命令")
-            self.progress.emit(70)
-            pre_launch_command = (self.launch_options.get("pre_launch_command") or "").strip()
-            if pre_launch_command:
-                self.status.emit("正在执行启动前命令...")
-                subprocess.run(
-                    pre_launch_command,
-                    shell=True,
-                    cwd=self.launch_options.get("runtime_directory") or self.game_dir,
-                    check=True,
-                    **hidden_subprocess_kwargs(),
-                )
+            self.progress.emit(80)
             self.status.emit(f"正在启动 Minecraft {self.version}...")
             jvm_args = list(self.launch_options.get("extra_jvm_args") or [])
             if account.get("type") == "external":
@@ -120,6 +103,10 @@ class LaunchWorker(QObject):
                 window_width=self.launch_options.get("window_width", 0),
                 window_height=self.launch_options.get("window_height", 0),
                 gc_strategy=self.launch_options.get("gc_strategy", "G1GC"),
+                gc_region_mb=self.launch_options.get("gc_region_mb", 0),
+                use_argfile=self.launch_options.get("use_argfile", False),
+                class_data_sharing=self.launch_options.get("class_data_sharing", False),
+                java_major_version=results["java"],
             )
             if not launched:
                 raise Exception(f"本地未找到版本 {self.version}，请先下载。")
@@ -131,6 +118,8 @@ class LaunchWorker(QObject):
                 "version": self.version,
                 "account": account,
                 "username": username,
+                "pid": launched.pid,
+                "session_id": launched.session_id,
             })
         except Exception as exc:
             logger.exception("LaunchWorker failed: version=%s", self.version)
@@ -2,14 +2,28 @@ import os
 import subprocess
 import json
 import configparser
+import locale
 import re
 import platform
 import shlex
 
+from file_utils import sanitize_filename, sha1_text
+from game_process import GAME_SUPERVISOR
+from java_utils import get_java_major_version
 from log_utils import get_logger, redact_command
+from storage_utils import atomic_write_bytes, load_json_file, save_json_atomic
+from version_cache import VERSION_CACHE
 
 config = configparser.ConfigParser()
 config.read("launcher_config.ini")
+LAUNCH_PLAN_DIR = os.path.join(".mcgo", "launch-plans")
+LAUNCH_PLAN_VERSION = 3
+CDS_ARCHIVE_DIR = os.path.join(".mcgo", "cds")
+ARGFILE_MIN_JAVA = 9
+DYNAMIC_CDS_MIN_JAVA = 13
+AUTO_CDS_MIN_JAVA = 19
+DEFAULT_MAX_MEMORY_MB = 2048
+DEFAULT_G1_REGION_MB = 32
 logger = get_logger(__name__)
 
 
@@ -229,15 +243,59 @@ def _substitute(value, context):
     return re.sub(r"\$\{([^}]+)\}", replace, value)
 
 
-def _merge_version_chain(chain):
+def _library_coordinate(library):
+    """Return (group:artifact[:classifier], version) identifying library on the classpath."""
+    name = library.get("name") or ""
+    parts = name.split(":")
+    if len(parts) >= 3:
+        key = ":".join(parts[:2] + parts[3:4])
+        return key, parts[2]
+    path = library.get("downloads", {}).get("artifact", {}).get("path")
+    return (path or name or None), ""
+
+
+def _merge_libraries(chain, features=None):
+    """Resolve the libraries of chain to one entry per group:artifact(:classifier).
+
+    Libraries whose rules exclude this platform are dropped first so they never shadow an
+    allowed one. A manifest overrides the ones it inherits from (the loader's ASM or Guava
+    wins over vanilla's); duplicates inside one manifest keep the highest version. The
+    classpath order follows the first declaration of each coordinate, parents first.
+    Returns (libraries, conflicts), conflicts listing every coordinate that had different
+    versions.
+    """
+    selected = {}
+    conflicts = {}
+    for depth, version_json in enumerate(reversed(chain)):
+        for library in version_json.get("libraries", []):
+            if not isinstance(library, dict) or not _library_allowed(library, features=features):
+                continue
+            key, version = _library_coordinate(library)
+            if not key:
+                continue
+            current = selected.get(key)
+            if current is None:
+                selected[key] = (depth, version, library, version_json.get("id", ""))
+                continue
+            current_depth, current_version, _current_library, _source = current
+            if current_version != version:
+                conflict = conflicts.setdefault(key, {"library": key, "versions": [current_version]})
+                if version not in conflict["versions"]:
+                    conflict["versions"].append(version)
+            if depth > current_depth or _compare_version_strings(version, current_version) > 0:
+                selected[key] = (depth, version, library, version_json.get("id", ""))
+
+    for key, conflict in conflicts.items():
+        _depth, version, _library, source = selected[key]
+        conflict["selected"] = version
+        conflict["source"] = source
+    return [entry[2] for entry in selected.values()], list(conflicts.values())
+
+
+def _merge_version_chain(chain, features=None):
+    """Merge an inheritance chain (child first) into one manifest; returns (resolved, library_conflicts)."""
     resolved = {}
-    libraries = {}
     for version_json in reversed(chain):
-        for library in version_json.get("libraries", []):
-            key = library.get("name") or library.get("downloads", {}).get("artifact", {}).get("path")
-            if key:
-                libraries[key] = library
-
         for key, value in version_json.items():
             if key == "libraries":
                 continue
@@ -248,8 +306,8 @@ def _merge_version_chain(chain):
                 continue
             resolved[key] = value
 
-    resolved["libraries"] = list(libraries.values())
-    return resolved
+    resolved["libraries"], conflicts = _merge_libraries(chain, features=features)
+    return resolved, conflicts
 
 
 def _maven_library_path(name):
@@ -297,7 +355,7 @@ def _memory_arguments(min_memory_mb=0, max_memory_mb=0):
     return arguments
 
 
-def _gc_arguments(strategy):
+def _gc_arguments(strategy, region_mb=0):
     normalized = (strategy or "G1GC").strip().lower()
     if normalized in {"none", "默认", "default", "vanilla"}:
         return []
@@ -311,47 +369,87 @@ def _gc_arguments(strategy):
         "-XX:G1NewSizePercent=20",
         "-XX:G1ReservePercent=20",
         "-XX:MaxGCPauseMillis=50",
-        "-XX:G1HeapRegionSize=32M",
+        f"-XX:G1HeapRegionSize={int(region_mb or DEFAULT_G1_REGION_MB)}M",
     ]
 
 
-def build_launch_command(
-    java_path,
-    version_id,
-    game_directory=".minecraft",
-    minecraft_access_token=None,
-    username=None,
-    uuid=None,
-    runtime_directory=None,
-    extra_jvm_args=None,
-    extra_game_args=None,
-    min_memory_mb=0,
-    max_memory_mb=0,
-    window_width=0,
-    window_height=0,
-    gc_strategy="G1GC",
-):
-    """构建 Minecraft 启动命令。"""
-    logger.info(
-        "Building launch command: version=%s java=%s game_directory=%s runtime_directory=%s extra_jvm_args=%d",
-        version_id,
-        java_path,
-        os.path.abspath(game_directory),
-        os.path.abspath(runtime_directory or game_directory),
-        len(extra_jvm_args or []),
-    )
-    version_json = get_version_json(game_directory, version_id)
-    if not version_json:
+def _without_user_overrides(tuning_arguments, extra_jvm_args):
+    """Drop heap and GC flags the user already passes, so they neither get overridden nor clash."""
+    user_arguments = list(extra_jvm_args or [])
+    user_prefixes = {prefix for prefix in ("-Xmx", "-Xms") if any(item.startswith(prefix) for item in user_arguments)}
+    user_gc = any(re.fullmatch(r"-XX:\+Use\w*GC", item) for item in user_arguments)
+    kept = []
+    for item in tuning_arguments:
+        if item[:4] in user_prefixes or (user_gc and item.startswith("-XX:")):
+            continue
+        kept.append(item)
+    return kept
+
+
+def _launch_plan_path(game_directory, version_id):
+    return os.path.join(game_directory, LAUNCH_PLAN_DIR, f"{sanitize_filename(version_id, 'version')}.json")
+
+
+def _source_signature(version_directory, json_path):
+    # The directory mtime changes whenever a manifest or jar is added, removed or replaced,
+    # which covers find_version_json_path / find_version_jar_path picking another file.
+    json_stat = os.stat(json_path)
+    return [
+        version_directory,
+        int(os.stat(version_directory).st_mtime_ns),
+        json_path,
+        int(json_stat.st_size),
+        int(json_stat.st_mtime_ns),
+    ]
+
+
+def _platform_key():
+    return [_current_os_name(), _current_os_arch()]
+
+
+def _compile_launch_plan(game_directory, version_id):
+    """Resolve everything about a launch that only depends on files on disk."""
+    chain = []
+    sources = []
+    current_id = version_id
+    seen = set()
+    while current_id and current_id not in seen:
+        seen.add(current_id)
+        json_path = find_version_json_path(game_directory, current_id)
+        if not json_path:
+            break
+        try:
+            # Stat before reading so an edit during compilation leaves a stale signature behind.
+            source = _source_signature(os.path.join(game_directory, "versions", current_id), json_path)
+        except OSError:
+            break
+        version_json = _load_json_file(json_path)
+        if not version_json:
+            break
+        chain.append(version_json)
+        sources.append(source)
+        current_id = version_json.get("inheritsFrom")
+
+    if not chain:
         logger.error("Version manifest not found: version=%s game_directory=%s", version_id, os.path.abspath(game_directory))
         raise FileNotFoundError(f"未找到版本清单：{version_id}")
 
-    chain = get_version_inheritance_chain(game_directory, version_id)
-    version_json = _merge_version_chain(chain)
+    library_features = {
+        "is_demo_user": False,
+        "has_custom_resolution": False,
+    }
+    version_json, library_conflicts = _merge_version_chain(chain, features=library_features)
     logger.debug(
         "Version inheritance chain resolved: version=%s chain=%s",
         version_id,
         [item.get("id") for item in chain],
     )
+    if library_conflicts:
+        logger.info(
+            "Library version conflicts resolved: version=%s conflicts=%s",
+            version_id,
+            ", ".join(f"{item['library']} {item['versions']} -> {item['selected']}" for item in library_conflicts),
+        )
 
     version_jars = []
     for item in chain:
@@ -373,12 +471,183 @@ def build_launch_command(
             break
     natives_dir = os.path.join(game_directory, 'versions', natives_version_id, f"{natives_version_id}-natives")
 
+    classpath = []
+    missing_libraries = []
+    seen_paths = set()
+    for library in version_json["libraries"]:
+        path = _library_path(game_directory, library)
+        if not path or path in seen_paths:
+            continue
+        seen_paths.add(path)
+        if os.path.exists(path):
+            classpath.append(path)
+        else:
+            missing_libraries.append(path)
+
+    natives_required = any(
+        library.get("natives") or any(str(key).startswith("natives-") for key in library.get("downloads", {}).get("classifiers", {}))
+        for library in version_json["libraries"]
+    )
+    modern_arguments = version_json.get("arguments", {})
+    return {
+        "version": LAUNCH_PLAN_VERSION,
+        "version_id": version_id,
+        "game_directory": game_directory,
+        "platform": _platform_key(),
+        "sources": sources,
+        "missing_libraries": missing_libraries,
+        "library_conflicts": library_conflicts,
+        "version_name": version_json["id"],
+        "version_type": version_json.get("type", "release"),
+        "asset_index": version_json.get("assetIndex", {}).get("id", ""),
+        "main_class": version_json["mainClass"],
+        "natives_dir": natives_dir,
+        "natives_required": natives_required,
+        "classpath": classpath,
+        "version_jars": version_jars,
+        "jvm_arguments": modern_arguments.get("jvm", []),
+        "game_arguments": modern_arguments.get("game", []),
+        "minecraft_arguments": version_json.get("minecraftArguments", ""),
+    }
+
+
+def _launch_plan_current(plan, game_directory, version_id):
+    if not isinstance(plan, dict) or plan.get("version") != LAUNCH_PLAN_VERSION:
+        return False
+    if plan.get("version_id") != version_id or plan.get("game_directory") != game_directory:
+        return False
+    if plan.get("platform") != _platform_key() or not plan.get("sources"):
+        return False
+    try:
+        for source in plan["sources"]:
+            if _source_signature(source[0], source[2]) != source:
+                return False
+    except (OSError, TypeError, IndexError):
+        return False
+    # Libraries that were missing at compile time would have been skipped; recompile once they show up.
+    return not any(os.path.exists(path) for path in plan.get("missing_libraries", []))
+
+
+def load_launch_plan(game_directory, version_id):
+    """Return the compiled launch plan of version_id, recompiling when its manifests changed.
+
+    The plan is stored in .mcgo/launch-plans/ of the game directory and keyed by the size
+    and mtime of every manifest in the inheritance chain and the mtime of their version
+    directories, so repeat launches skip parsing, merging and checking every library.
+    """
+    plan_path = _launch_plan_path(game_directory, version_id)
+    try:
+        plan = load_json_file(plan_path, None)
+    except (OSError, ValueError) as exc:
+        logger.debug("Ignoring unreadable launch plan: path=%s error=%s", plan_path, exc)
+        plan = None
+    if _launch_plan_current(plan, game_directory, version_id):
+        logger.debug("Launch plan reused: version=%s path=%s", version_id, plan_path)
+        return plan
+
+    plan = _compile_launch_plan(game_directory, version_id)
+    try:
+        save_json_atomic(plan_path, plan, indent=None)
+    except OSError as exc:
+        logger.warning("Failed to save launch plan: path=%s error=%s", plan_path, exc)
+    logger.info(
+        "Launch plan compiled: version=%s libraries=%d missing_libraries=%d",
+        version_id,
+        len(plan["classpath"]),
+        len(plan["missing_libraries"]),
+    )
+    return plan
+
+
+def _argfile_token(argument):
+    if argument and not re.search(r'[\s"\'#\\]', argument):
+        return argument
+    escaped = argument.replace("\\", "\\\\").replace('"', '\\"')
+    return f'"{escaped}"'
+
+
+def _write_argfile(game_directory, version_id, arguments):
+    """Write arguments as a JVM @argfile and return its path, or None when they cannot be encoded."""
+    text = "\n".join(_argfile_token(str(argument)) for argument in arguments) + "\n"
+    try:
+        # The java launcher reads argument files in the platform charset, not UTF-8.
+        data = text.encode(locale.getpreferredencoding(False))
+    except (UnicodeEncodeError, LookupError) as exc:
+        logger.warning("JVM arguments cannot be written to an argfile, passing them inline: version=%s error=%s", version_id, exc)
+        return None
+    path = os.path.abspath(os.path.join(game_directory, LAUNCH_PLAN_DIR, f"{sanitize_filename(version_id, 'version')}.jvm-args"))
+    atomic_write_bytes(path, data)
+    return path
+
+
+def _class_data_sharing_arguments(game_directory, version_id, java_path, java_major, classpath_string):
+    """Return JVM flags that create or reuse this version's AppCDS archive.
+
+    The archive name hashes the Java binary and the classpath, so a changed launch plan
+    gets a fresh archive and the outdated one is removed. Java 19+ validates and
+    regenerates the archive itself; Java 13-18 dumps it when the game exits and maps it
+    on the following launches.
+    """
+    if not java_major or java_major < DYNAMIC_CDS_MIN_JAVA:
+        logger.debug("Class data sharing skipped: version=%s java_major=%s", version_id, java_major)
+        return []
+    directory = os.path.abspath(os.path.join(game_directory, CDS_ARCHIVE_DIR))
+    prefix = sanitize_filename(version_id, "version")
+    key = sha1_text(f"{os.path.abspath(java_path)}\n{java_major}\n{classpath_string}")[:16]
+    archive_path = os.path.join(directory, f"{prefix}.{key}.jsa")
+    os.makedirs(directory, exist_ok=True)
+    for name in os.listdir(directory):
+        if name.endswith(".jsa") and name.rsplit(".", 2)[0] == prefix and os.path.join(directory, name) != archive_path:
+            try:
+                os.remove(os.path.join(directory, name))
+                logger.info("Outdated CDS archive removed: version=%s archive=%s", version_id, name)
+            except OSError as exc:
+                logger.debug("Failed to remove outdated CDS archive: archive=%s error=%s", name, exc)
+    if java_major >= AUTO_CDS_MIN_JAVA:
+        return ["-XX:+AutoCreateSharedArchive", f"-XX:SharedArchiveFile={archive_path}"]
+    if os.path.isfile(archive_path):
+        return [f"-XX:SharedArchiveFile={archive_path}"]
+    return [f"-XX:ArchiveClassesAtExit={archive_path}"]
+
+
+def build_launch_command(
+    java_path,
+    version_id,
+    game_directory=".minecraft",
+    minecraft_access_token=None,
+    username=None,
+    uuid=None,
+    runtime_directory=None,
+    extra_jvm_args=None,
+    extra_game_args=None,
+    min_memory_mb=0,
+    max_memory_mb=0,
+    window_width=0,
+    window_height=0,
+    gc_strategy="G1GC",
+    gc_region_mb=0,
+    use_argfile=False,
+    class_data_sharing=False,
+    java_major_version=None,
+):
+    """构建 Minecraft 启动命令。"""
+    logger.info(
+        "Building launch command: version=%s java=%s game_directory=%s runtime_directory=%s extra_jvm_args=%d",
+        version_id,
+        java_path,
+        os.path.abspath(game_directory),
+        os.path.abspath(runtime_directory or game_directory),
+        len(extra_jvm_args or []),
+    )
+    plan = load_launch_plan(game_directory, version_id)
+    natives_dir = plan["natives_dir"]
+    version_jars = plan["version_jars"]
+
     if not max_memory_mb:
-        max_memory_mb = 2048
-    default_jvm_arguments = [
+        max_memory_mb = DEFAULT_MAX_MEMORY_MB
+    tuning_arguments = [
         *_memory_arguments(min_memory_mb, max_memory_mb),
-        *_gc_arguments(gc_strategy),
-        f"-Djava.library.path={natives_dir}",
+        *_gc_arguments(gc_strategy, gc_region_mb),
     ]
 
     assets_dir = os.path.join(game_directory, "assets")
@@ -390,14 +659,7 @@ def build_launch_command(
         "has_custom_resolution": False,
     }
 
-    classpath = []
-    for library in version_json["libraries"]:
-        if not _library_allowed(library, features=features):
-            continue
-        path = _library_path(game_directory, library)
-        if path and os.path.exists(path):
-            classpath.append(path)
-    classpath.extend(version_jars)
+    classpath = [*plan["classpath"], *version_jars]
     classpath_string = os.pathsep.join(classpath)
     logger.info(
         "Launch classpath prepared: version=%s libraries=%d version_jars=%d natives=%s",
@@ -409,17 +671,17 @@ def build_launch_command(
 
     context = {
         "auth_player_name": username if username else config.get("USER", "username", fallback="Player"),
-        "version_name": version_json["id"],
+        "version_name": plan["version_name"],
         "game_directory": runtime_directory,
         "assets_root": assets_dir,
-        "assets_index_name": version_json.get("assetIndex", {}).get("id", ""),
+        "assets_index_name": plan["asset_index"],
         "auth_uuid": uuid if uuid else config.get("USER", "uuid", fallback="00000000-0000-0000-0000-000000000000"),
         "auth_access_token": minecraft_access_token if minecraft_access_token else config.get("USER", "accessToken", fallback="0"),
         "auth_xuid": "0",
         "clientid": "",
         "client_id": "",
         "user_type": "msa" if minecraft_access_token else "mojang",
-        "version_type": version_json.get("type", "release"),
+        "version_type": plan["version_type"],
         "launcher_name": "McGo",
         "launcher_version": "1.0",
         "natives_directory": natives_dir,
@@ -432,11 +694,10 @@ def build_launch_command(
     }
 
     features["has_custom_resolution"] = bool(window_width and window_height)
-    modern_arguments = version_json.get("arguments", {})
-    if modern_arguments.get("game"):
-        game_arguments = _argument_list(modern_arguments.get("game", []), context=context, features=features)
+    if plan["game_arguments"]:
+        game_arguments = _argument_list(plan["game_arguments"], context=context, features=features)
     else:
-        legacy_arguments = version_json.get("minecraftArguments", "")
+        legacy_arguments = plan["minecraft_arguments"]
         if legacy_arguments:
             game_arguments = [
                 _substitute(value, context)
@@ -455,24 +716,37 @@ def build_launch_command(
                 "--versionType", context["version_type"],
             ]
 
-    resolved_modern_jvm = _argument_list(modern_arguments.get("jvm", []), context=context, features=features)
-    if resolved_modern_jvm:
-        jvm_arguments = resolved_modern_jvm
-        if "-Djava.library.path=" not in " ".join(resolved_modern_jvm):
-            jvm_arguments = [*jvm_arguments, f"-Djava.library.path={natives_dir}"]
-    else:
-        jvm_arguments = default_jvm_arguments
+    resolved_modern_jvm = _argument_list(plan["jvm_arguments"], context=context, features=features)
+    jvm_arguments = list(resolved_modern_jvm)
+    if "-Djava.library.path=" not in " ".join(resolved_modern_jvm):
+        jvm_arguments.append(f"-Djava.library.path={natives_dir}")
 
-    command = [
-        java_path,
+    # Manifests only declare natives/classpath flags, so heap and GC settings come first and
+    # user supplied JVM arguments after them.
+    launch_jvm_arguments = [
+        *_without_user_overrides(tuning_arguments, extra_jvm_args),
         *(extra_jvm_args or []),
         *jvm_arguments,
     ]
     if "-cp" not in jvm_arguments and "--class-path" not in jvm_arguments:
-        command.extend(["-cp", classpath_string])
+        launch_jvm_arguments.extend(["-cp", classpath_string])
+    if use_argfile or class_data_sharing:
+        java_major_version = java_major_version or get_java_major_version(java_path)
+    if class_data_sharing:
+        launch_jvm_arguments = [
+            *_class_data_sharing_arguments(game_directory, version_id, java_path, java_major_version, classpath_string),
+            *launch_jvm_arguments,
+        ]
+    if use_argfile and (java_major_version or 0) >= ARGFILE_MIN_JAVA:
+        argfile_path = _write_argfile(game_directory, version_id, launch_jvm_arguments)
+        if argfile_path:
+            launch_jvm_arguments = [f"@{argfile_path}"]
+    elif use_argfile:
+        logger.info("Argfile skipped, Java %s does not support it: version=%s", java_major_version, version_id)
+    command = [java_path, *launch_jvm_arguments]
     if extra_game_args:
         game_arguments.extend(extra_game_args)
-    command.extend([version_json["mainClass"], *game_arguments])
+    command.extend([plan["main_class"], *game_arguments])
     logger.debug("Launch command built: %s", redact_command(command))
     return command
 
@@ -492,8 +766,12 @@ def launch_minecraft(
     window_width=0,
     window_height=0,
     gc_strategy="G1GC",
+    gc_region_mb=0,
+    use_argfile=False,
+    class_data_sharing=False,
+    java_major_version=None,
 ):
-    """启动 Minecraft。"""
+    """启动 Minecraft，返回受 GAME_SUPERVISOR 管理的 GameSession。"""
     logger.info("Launching Minecraft: version=%s username=%s", version_id, username or "<config>")
     command = build_launch_command(
         java_path,
@@ -510,10 +788,20 @@ def launch_minecraft(
         window_width=window_width,
         window_height=window_height,
         gc_strategy=gc_strategy,
+        gc_region_mb=gc_region_mb,
+        use_argfile=use_argfile,
+        class_data_sharing=class_data_sharing,
+        java_major_version=java_major_version,
+    )
+    session = GAME_SUPERVISOR.start(
+        command,
+        version_id,
+        game_directory,
+        max_memory_mb=max_memory_mb or DEFAULT_MAX_MEMORY_MB,
+        **_hidden_subprocess_kwargs(),
     )
-    process = subprocess.Popen(command, **_hidden_subprocess_kwargs())
-    logger.info("Minecraft process started: version=%s pid=%s", version_id, getattr(process, "pid", "unknown"))
-    return True
+    logger.info("Minecraft process started: version=%s pid=%s", version_id, session.pid)
+    return session
 
 
 def get_local_versions(game_directory=".minecraft"):
@@ -529,7 +817,7 @@ def get_local_versions(game_directory=".minecraft"):
     return versions
 
 
-def get_version_json(game_directory, version_id):
+def _read_version_json(game_directory, version_id):
     version_json_path = find_version_json_path(game_directory, version_id)
     if not version_json_path or not os.path.exists(version_json_path):
         return None
@@ -537,7 +825,12 @@ def get_version_json(game_directory, version_id):
     return _load_json_file(version_json_path)
 
 
-def get_version_inheritance_chain(game_directory, version_id):
+def get_version_json(game_directory, version_id):
+    """Return the parsed manifest of version_id; the result is cached and must not be modified."""
+    return VERSION_CACHE.get("json", game_directory, version_id, lambda: _read_version_json(game_directory, version_id))
+
+
+def _resolve_inheritance_chain(game_directory, version_id):
     chain = []
     current_id = version_id
     seen = set()
@@ -553,6 +846,17 @@ def get_version_inheritance_chain(game_directory, version_id):
     return chain
 
 
+def get_version_inheritance_chain(game_directory, version_id):
+    chain = VERSION_CACHE.get(
+        "chain",
+        game_directory,
+        version_id,
+        lambda: _resolve_inheritance_chain(game_directory, version_id),
+        dependencies=lambda chain: [item.get("inheritsFrom") for item in chain],
+    )
+    return list(chain)
+
+
 def infer_required_java_version(game_directory, version_id):
     normalized = version_id.lower()
     match = re.match(r"(\d+)\.(\d+)", normalized)
@@ -0,0 +1,121 @@
+import threading
+import time
+from urllib.parse import urlparse
+
+from log_utils import get_logger
+
+
+EWMA_ALPHA = 0.3
+MIN_THROUGHPUT_BYTES = 64 * 1024
+FAILURE_COOLDOWN = 30.0
+FAILURE_COOLDOWN_THRESHOLD = 3
+logger = get_logger(__name__)
+
+
+def _ewma(previous, value):
+    return value if previous is None else previous + EWMA_ALPHA * (value - previous)
+
+
+def url_host(url):
+    return urlparse(url).netloc.lower()
+
+
+class MirrorStats:
+    __slots__ = ("latency", "throughput", "error_rate", "successes", "failures", "consecutive_failures", "cooldown_until")
+
+    def __init__(self):
+        self.latency = None
+        self.throughput = None
+        self.error_rate = 0.0
+        self.successes = 0
+        self.failures = 0
+        self.consecutive_failures = 0
+        self.cooldown_until = 0.0
+
+    def snapshot(self):
+        return {
+            "latency": self.latency,
+            "throughput": self.throughput,
+            "error_rate": self.error_rate,
+            "successes": self.successes,
+            "failures": self.failures,
+            "cooling_down": self.cooldown_until > time.monotonic(),
+        }
+
+
+class MirrorScoreboard:
+    """Per-host latency, throughput and error rate shared by every download in the process.
+
+    Candidates are ranked by the expected time to fetch a file of the given size, so small
+    assets favour low latency and large jars favour throughput. Hosts without samples keep
+    their configured order ahead of measured ones until they have been tried once.
+    """
+
+    def __init__(self):
+        self.extra_mirrors = []
+        self._stats = {}
+        self._lock = threading.Lock()
+
+    def configure(self, extra_mirrors=()):
+        self.extra_mirrors = [str(root).rstrip("/") for root in extra_mirrors or () if str(root).strip()]
+
+    def _entry(self, host):
+        stats = self._stats.get(host)
+        if stats is None:
+            stats = self._stats[host] = MirrorStats()
+        return stats
+
+    def record_success(self, url, latency, byte_count=0, transfer_seconds=0.0):
+        with self._lock:
+            stats = self._entry(url_host(url))
+            stats.latency = _ewma(stats.latency, max(0.0, latency))
+            if byte_count >= MIN_THROUGHPUT_BYTES and transfer_seconds > 0:
+                stats.throughput = _ewma(stats.throughput, byte_count / transfer_seconds)
+            stats.error_rate = _ewma(stats.error_rate, 0.0)
+            stats.successes += 1
+            stats.consecutive_failures = 0
+
+    def record_failure(self, url, status=0):
+        with self._lock:
+            host = url_host(url)
+            stats = self._entry(host)
+            stats.error_rate = _ewma(stats.error_rate, 1.0)
+            stats.failures += 1
+            stats.consecutive_failures += 1
+            if status == 429 or stats.consecutive_failures >= FAILURE_COOLDOWN_THRESHOLD:
+                stats.cooldown_until = time.monotonic() + FAILURE_COOLDOWN
+                logger.info("Mirror cooling down: host=%s status=%s failures=%d", host, status, stats.consecutive_failures)
+
+    def is_healthy(self, url):
+        stats = self._stats.get(url_host(url))
+        return not stats or stats.cooldown_until <= time.monotonic()
+
+    def expected_cost(self, url, size=0):
+        stats = self._stats.get(url_host(url))
+        if not stats:
+            return None
+        if stats.latency is None:
+            return float("inf")
+        cost = stats.latency
+        if size and stats.throughput:
+            cost += size / stats.throughput
+        return cost * (1.0 + 4.0 * stats.error_rate)
+
+    def rank(self, urls, size=0):
+        """Order candidate urls, best first; the sort is stable so ties keep the configured order."""
+        now = time.monotonic()
+
+        def key(url):
+            stats = self._stats.get(url_host(url))
+            cooling = bool(stats and stats.cooldown_until > now)
+            cost = self.expected_cost(url, size)
+            return (cooling, cost is not None, cost or 0.0)
+
+        return sorted(urls, key=key)
+
+    def snapshot(self):
+        with self._lock:
+            return {host: stats.snapshot() for host, stats in self._stats.items()}
+
+
+MIRROR_SCOREBOARD = MirrorScoreboard()
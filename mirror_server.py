@@ -0,0 +1,322 @@
+import argparse
+import asyncio
+import hashlib
+import logging
+import os
+import re
+import uuid
+
+import aiohttp
+from aiohttp import web
+
+from download_engine import REQUEST_TIMEOUT
+from downloader import BMCLAPI_ROOT, CHUNK_SIZE, _candidate_urls
+from log_utils import get_logger
+from mirror_scoreboard import MirrorScoreboard
+from object_store import OBJECT_STORE_DIR, ObjectStore
+
+
+DEFAULT_PORT = 8765
+MIRROR_CACHE_DIR = os.path.join("cache", "mirror")
+PASSTHROUGH_LIMIT = 64 * 1024 * 1024
+CHECKSUM_SUFFIXES = (".sha1", ".sha256", ".sha512", ".md5")
+_SHA1_PATTERN = re.compile(r"^[0-9a-f]{40}$")
+logger = get_logger(__name__)
+
+
+def _safe_join(root, relative_path):
+    """Join a URL path below root, or return None when it would escape root."""
+    root = os.path.abspath(root)
+    path = os.path.normpath(os.path.join(root, *relative_path.split("/")))
+    return path if path.startswith(root + os.sep) else None
+
+
+def _remove_file(path):
+    try:
+        os.remove(path)
+    except OSError:
+        pass
+
+
+class MirrorServer:
+    """BMCLAPI-layout HTTP mirror serving local libraries and the shared object store.
+
+    Other McGo instances add this server's root to [DOWNLOAD] extra_mirrors. Requests are
+    answered from disk when possible; misses are fetched from the upstream through the
+    downloader's mirror rewriting, verified against the SHA1 in the path (assets) or the
+    upstream .sha1 file (libraries), stored and then served, so each file crosses the WAN
+    once. With fill_on_miss disabled the server only serves what it already has.
+    """
+
+    def __init__(self, upstream=BMCLAPI_ROOT, object_store_dir="", game_directories=(), cache_dir=MIRROR_CACHE_DIR, fill_on_miss=True):
+        self.upstream = str(upstream or BMCLAPI_ROOT).rstrip("/")
+        self.object_store = ObjectStore(object_store_dir or OBJECT_STORE_DIR)
+        self.game_directories = [os.path.abspath(path) for path in game_directories if path]
+        self.maven_cache_dir = os.path.join(os.path.abspath(cache_dir or MIRROR_CACHE_DIR), "maven")
+        self.fill_on_miss = fill_on_miss
+        self.scoreboard = MirrorScoreboard()
+        self.scoreboard.configure([self.upstream])
+        self.stats = {"local": 0, "filled": 0, "missing": 0, "passthrough": 0}
+        self._session = None
+        self._fill_locks = {}
+        self._runner = None
+
+    def make_app(self):
+        app = web.Application()
+        app.router.add_get("/assets/{prefix}/{sha1}", self.handle_asset)
+        app.router.add_get("/v1/objects/{sha1}/{name}", self.handle_object)
+        app.router.add_get("/maven/{path:.+}", self.handle_maven)
+        app.router.add_get("/{path:.*}", self.handle_passthrough)
+        app.on_cleanup.append(self._close_session)
+        return app
+
+    async def start(self, host="127.0.0.1", port=DEFAULT_PORT):
+        """Start listening and return the bound port (useful with port=0)."""
+        self._runner = web.AppRunner(self.make_app())
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, host, port)
+        await site.start()
+        bound_port = site._server.sockets[0].getsockname()[1]
+        logger.info(
+            "Mirror server listening: host=%s port=%d upstream=%s fill_on_miss=%s store=%s",
+            host,
+            bound_port,
+            self.upstream,
+            self.fill_on_miss,
+            self.object_store.root,
+        )
+        return bound_port
+
+    async def stop(self):
+        if self._runner is not None:
+            await self._runner.cleanup()
+            self._runner = None
+
+    async def _close_session(self, app=None):
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+
+    def _client_session(self):
+        if self._session is None or self._session.closed:
+            self._session = aiohttp.ClientSession(timeout=REQUEST_TIMEOUT)
+        return self._session
+
+    def _local_asset(self, sha1):
+        if self.object_store.verify(sha1):
+            return self.object_store.object_path(sha1)
+        for game_directory in self.game_directories:
+            path = os.path.join(game_directory, "assets", "objects", sha1[:2], sha1)
+            if not os.path.isfile(path):
+                continue
+            # Game directories are not trusted: the copy is hashed in the store before serving.
+            self.object_store.ingest(path, sha1)
+            if self.object_store.verify(sha1):
+                return self.object_store.object_path(sha1)
+            logger.warning("Mirror skipped a corrupt local asset: sha1=%s path=%s", sha1, path)
+        return None
+
+    def _local_library(self, relative_path):
+        for root in (*[os.path.join(path, "libraries") for path in self.game_directories], self.maven_cache_dir):
+            path = _safe_join(root, relative_path)
+            if path and os.path.isfile(path):
+                return path
+        return None
+
+    async def _serve(self, kind, key, local_path, official_url, fill_path, sha1="", resolve_sha1=None):
+        path = await asyncio.to_thread(local_path)
+        if path:
+            self.stats["local"] += 1
+            logger.debug("Mirror served from disk: kind=%s key=%s", kind, key)
+            return web.FileResponse(path)
+        if not self.fill_on_miss:
+            self.stats["missing"] += 1
+            raise web.HTTPNotFound(text=f"{key} is not cached on this mirror")
+        lock = self._fill_locks.setdefault(key, asyncio.Lock())
+        async with lock:
+            # Concurrent requests for the same file wait for the first fill instead of refetching.
+            path = await asyncio.to_thread(local_path)
+            if not path and resolve_sha1:
+                sha1 = await resolve_sha1()
+            if not path and (sha1 or not resolve_sha1) and await self._fill(official_url, fill_path, sha1):
+                self.stats["filled"] += 1
+                path = fill_path
+        self._fill_locks.pop(key, None)
+        if not path:
+            self.stats["missing"] += 1
+            raise web.HTTPNotFound(text=f"{key} is not available upstream")
+        return web.FileResponse(path)
+
+    def _upstream_urls(self, official_url):
+        # Fill only from the configured upstream so WAN usage stays predictable; an official
+        # upstream has no rewritten form and keeps the official URLs.
+        urls = _candidate_urls(official_url, self.upstream, self.scoreboard)
+        return [url for url in urls if url.startswith(f"{self.upstream}/")] or urls
+
+    async def _upstream_sha1(self, official_url):
+        """The SHA1 published next to official_url upstream, or "" when none could be read."""
+        for url in self._upstream_urls(official_url):
+            try:
+                async with self._client_session().get(f"{url}.sha1") as response:
+                    if response.status != 200:
+                        continue
+                    text = (await response.content.read(1024)).decode("ascii", errors="ignore")
+            except (aiohttp.ClientError, asyncio.TimeoutError) as exc:
+                logger.debug("Mirror checksum request failed: url=%s.sha1 error=%s", url, exc)
+                continue
+            digest = (text.split() or [""])[0].lower()
+            if _SHA1_PATTERN.match(digest):
+                return digest
+        logger.warning("Mirror refuses to cache a library without upstream checksum: url=%s", official_url)
+        return ""
+
+    async def _fill(self, official_url, target_path, sha1=""):
+        """Fetch official_url through the upstream mirror into target_path, verifying sha1 if given."""
+        os.makedirs(os.path.dirname(target_path), exist_ok=True)
+        for url in self._upstream_urls(official_url):
+            temp_path = f"{target_path}.{uuid.uuid4().hex}.tmp"
+            try:
+                async with self._client_session().get(url) as response:
+                    if response.status != 200:
+                        if response.status != 404:
+                            self.scoreboard.record_failure(url, response.status)
+                        logger.debug("Mirror upstream miss: url=%s status=%d", url, response.status)
+                        continue
+                    digest = hashlib.sha1()
+                    with open(temp_path, "wb") as file_handle:
+                        async for chunk in response.content.iter_chunked(CHUNK_SIZE):
+                            file_handle.write(chunk)
+                            digest.update(chunk)
+                if sha1 and digest.hexdigest() != sha1:
+                    logger.warning("Mirror upstream returned corrupt data: url=%s expected=%s actual=%s", url, sha1, digest.hexdigest())
+                    continue
+                os.replace(temp_path, target_path)
+                logger.info("Mirror filled from upstream: url=%s target=%s", url, target_path)
+                return True
+            except (aiohttp.ClientError, asyncio.TimeoutError, OSError) as exc:
+                self.scoreboard.record_failure(url, getattr(exc, "status", 0))
+                logger.warning("Mirror upstream request failed: url=%s error=%s", url, exc)
+            finally:
+                _remove_file(temp_path)
+        return False
+
+    async def handle_asset(self, request):
+        sha1 = request.match_info["sha1"].lower()
+        if not _SHA1_PATTERN.match(sha1) or request.match_info["prefix"] != sha1[:2]:
+            raise web.HTTPNotFound()
+        return await self._serve(
+            "asset",
+            sha1,
+            lambda: self._local_asset(sha1),
+            f"https://resources.download.minecraft.net/{sha1[:2]}/{sha1}",
+            self.object_store.object_path(sha1),
+            sha1,
+        )
+
+    async def handle_object(self, request):
+        sha1 = request.match_info["sha1"].lower()
+        if not _SHA1_PATTERN.match(sha1):
+            raise web.HTTPNotFound()
+        return await self._serve(
+            "object",
+            sha1,
+            lambda: self._local_asset(sha1),
+            f"https://piston-data.mojang.com/v1/objects/{sha1}/{request.match_info['name']}",
+            self.object_store.object_path(sha1),
+            sha1,
+        )
+
+    async def handle_maven(self, request):
+        relative_path = request.match_info["path"]
+        fill_path = _safe_join(self.maven_cache_dir, relative_path)
+        if not fill_path:
+            raise web.HTTPNotFound()
+        official_url = f"https://libraries.minecraft.net/{relative_path}"
+        if relative_path.lower().endswith(CHECKSUM_SUFFIXES):
+            # Checksums are what fills are verified against, so they are never cached themselves.
+            path = self._local_library(relative_path)
+            if path:
+                return web.FileResponse(path)
+            return await self.handle_passthrough(request)
+        # Unlike assets, library paths carry no hash, so a fill is checked against the upstream .sha1.
+        return await self._serve(
+            "maven",
+            relative_path,
+            lambda: self._local_library(relative_path),
+            official_url,
+            fill_path,
+            resolve_sha1=lambda: self._upstream_sha1(official_url),
+        )
+
+    async def handle_passthrough(self, request):
+        """Forward metadata requests (version manifests, loader lists) to the upstream without caching."""
+        if not self.fill_on_miss:
+            raise web.HTTPNotFound(text="offline mirror does not proxy metadata")
+        url = f"{self.upstream}{request.rel_url}"
+        try:
+            async with self._client_session().get(url) as response:
+                chunks = []
+                size = 0
+                async for chunk in response.content.iter_chunked(CHUNK_SIZE):
+                    size += len(chunk)
+                    if size > PASSTHROUGH_LIMIT:
+                        # A truncated body would reach the client as a complete 200 response.
+                        logger.warning("Mirror passthrough body too large: url=%s limit=%d", url, PASSTHROUGH_LIMIT)
+                        raise web.HTTPBadGateway(text="upstream response exceeds the passthrough limit")
+                    chunks.append(chunk)
+                self.stats["passthrough"] += 1
+                return web.Response(
+                    status=response.status,
+                    body=b"".join(chunks),
+                    content_type=response.content_type,
+                )
+        except (aiohttp.ClientError, asyncio.TimeoutError) as exc:
+            logger.warning("Mirror passthrough failed: url=%s error=%s", url, exc)
+            raise web.HTTPBadGateway(text=str(exc))
+
+
+async def run_mirror_server(host, port, **options):
+    server = MirrorServer(**options)
+    await server.start(host, port)
+    try:
+        await asyncio.Event().wait()
+    finally:
+        await server.stop()
+
+
+def main(argv=None):
+    from app_settings import config, load_config
+
+    load_config()
+    parser = argparse.ArgumentParser(description="McGo LAN download mirror")
+    parser.add_argument("--host", default="127.0.0.1", help="listen address; pass 0.0.0.0 to serve the LAN")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT, help="listen TCP port")
+    parser.add_argument("--upstream", default=BMCLAPI_ROOT, help="BMCLAPI-compatible upstream used to fill misses")
+    parser.add_argument(
+        "--game-dir",
+        action="append",
+        default=[],
+        help="game directory whose libraries and assets are served (repeatable)",
+    )
+    parser.add_argument("--object-store", default=config.get("DOWNLOAD", "object_store_dir", fallback=""), help="shared object store directory")
+    parser.add_argument("--cache-dir", default=MIRROR_CACHE_DIR, help="directory for libraries fetched on a miss")
+    parser.add_argument("--offline", action="store_true", help="serve local files only, never contact the upstream")
+    parser.add_argument("--log-level", default="INFO", help="logging level")
+    args = parser.parse_args(argv)
+    logging.basicConfig(
+        level=getattr(logging, args.log_level.upper(), logging.INFO),
+        format="%(asctime)s %(levelname)s %(name)s: %(message)s",
+    )
+    asyncio.run(run_mirror_server(
+        args.host,
+        args.port,
+        upstream=args.upstream,
+        object_store_dir=args.object_store,
+        game_directories=args.game_dir or [config.get("GAME", "directory", fallback=".minecraft")],
+        cache_dir=args.cache_dir,
+        fill_on_miss=not args.offline,
+    ))
+
+
+if __name__ == "__main__":
+    main()
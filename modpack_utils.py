@@ -5,6 +5,7 @@ import zipfile
 
 from file_utils import sanitize_filename
 from launcher import get_version_json
+from version_cache import VERSION_CACHE
 from version_utils import (
     resolve_base_minecraft_version,
     runtime_directory_for_version,
@@ -37,6 +38,10 @@ def iter_pack_files(root_dir):
 
 
 def detect_export_loader(game_dir, version_id):
+    return VERSION_CACHE.get("export_loader", game_dir, version_id, lambda: _detect_export_loader(game_dir, version_id))
+
+
+def _detect_export_loader(game_dir, version_id):
     version_json = get_version_json(game_dir, version_id) or {}
     text = " ".join([
         version_id,
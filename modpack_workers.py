@@ -1,4 +1,3 @@
-import asyncio
 import json
 import os
 import shutil
@@ -7,6 +6,8 @@ import zipfile
 import http_client
 from PyQt6.QtCore import QObject, pyqtSignal as Signal
 
+from bandwidth import BANDWIDTH_LIMITER
+from download_engine import DOWNLOAD_ENGINE
 from downloader import download_game_files, extract_natives
 from file_utils import sanitize_filename
 from install_services import INSTALL_TYPE_LABELS, MIRROR_SOURCES, get_version_metadata_with_fallback
@@ -88,6 +89,7 @@ class ModpackImportWorker(QObject):
                 for chunk in response.iter_content(chunk_size=128 * 1024):
                     if chunk:
                         handle.write(chunk)
+                        BANDWIDTH_LIMITER.consume(len(chunk))
 
     def _ensure_minecraft_version(self, minecraft_version):
         if not minecraft_version or get_version_json(self.game_dir, minecraft_version):
@@ -98,7 +100,7 @@ class ModpackImportWorker(QObject):
             self.mirror_source,
             status_callback=self.status.emit,
         )
-        asyncio.run(download_game_files(
+        DOWNLOAD_ENGINE.run(download_game_files(
             version_json,
             self.game_dir,
             minecraft_version,
@@ -0,0 +1,128 @@
+import os
+import shutil
+import uuid
+import zipfile
+
+from log_utils import get_logger
+from object_store import link_or_copy
+from storage_utils import load_json_file, save_json_atomic
+
+
+NATIVES_CACHE_DIR = os.path.join("cache", "natives")
+MANIFEST_NAME = ".natives-manifest.json"
+MANIFEST_VERSION = 1
+logger = get_logger(__name__)
+
+
+def _extract_entries(jar_path, target_directory):
+    files = []
+    root = os.path.normpath(target_directory)
+    with zipfile.ZipFile(jar_path, "r") as zip_ref:
+        for file_info in zip_ref.infolist():
+            if file_info.filename.startswith("META-INF") or file_info.filename.endswith("/"):
+                continue
+            extract_path = os.path.normpath(os.path.join(root, file_info.filename))
+            if not extract_path.startswith(root + os.sep):
+                logger.warning("Skipping suspicious native path: archive=%s entry=%s", jar_path, file_info.filename)
+                continue
+            zip_ref.extract(file_info, root)
+            files.append(os.path.relpath(extract_path, root).replace(os.sep, "/"))
+    return files
+
+
+class NativesCache:
+    """Native jars extracted once per SHA1 and linked into each version's natives directory."""
+
+    def __init__(self, root=NATIVES_CACHE_DIR):
+        self.root = os.path.abspath(root or NATIVES_CACHE_DIR)
+
+    def directory(self, sha1):
+        return os.path.join(self.root, sha1)
+
+    def _listing_path(self, sha1):
+        return os.path.join(self.root, f"{sha1}.json")
+
+    def files(self, sha1):
+        listing = load_json_file(self._listing_path(sha1), None)
+        if not isinstance(listing, list) or not os.path.isdir(self.directory(sha1)):
+            return None
+        return listing
+
+    def extract(self, sha1, jar_path):
+        """Return the files of jar_path under its shared directory, extracting it on first use."""
+        files = self.files(sha1)
+        if files is not None:
+            return files
+        os.makedirs(self.root, exist_ok=True)
+        temp_directory = os.path.join(self.root, f".{sha1}.{uuid.uuid4().hex}.tmp")
+        try:
+            files = _extract_entries(jar_path, temp_directory)
+            os.makedirs(temp_directory, exist_ok=True)
+            try:
+                os.replace(temp_directory, self.directory(sha1))
+            except OSError:
+                # Another launcher process finished the same jar first; its copy is identical.
+                shutil.rmtree(temp_directory, ignore_errors=True)
+            save_json_atomic(self._listing_path(sha1), files, indent=None)
+        except Exception:
+            shutil.rmtree(temp_directory, ignore_errors=True)
+            raise
+        logger.debug("Extracted shared natives: sha1=%s files=%d jar=%s", sha1, len(files), jar_path)
+        return files
+
+    def link_into(self, sha1, files, target_directory):
+        source_directory = self.directory(sha1)
+        for relative in files:
+            link_or_copy(
+                os.path.join(source_directory, *relative.split("/")),
+                os.path.join(target_directory, *relative.split("/")),
+            )
+
+
+def sync_natives_directory(natives_directory, jars, cache=None):
+    """Bring natives_directory in line with jars, a list of (sha1, jar_path).
+
+    A manifest in the directory records which files each jar contributed, so unchanged jars
+    are skipped without opening them, new or changed jars are linked from the shared cache,
+    and files of jars that are no longer used are removed. Returns (files, extracted jars).
+    """
+    cache = cache or NativesCache()
+    os.makedirs(natives_directory, exist_ok=True)
+    manifest_path = os.path.join(natives_directory, MANIFEST_NAME)
+    manifest = load_json_file(manifest_path, {})
+    previous = manifest.get("jars", {}) if isinstance(manifest, dict) and manifest.get("version") == MANIFEST_VERSION else {}
+
+    current = {}
+    extracted = 0
+    for sha1, jar_path in jars:
+        files = previous.get(sha1)
+        if isinstance(files, list) and all(os.path.isfile(os.path.join(natives_directory, *item.split("/"))) for item in files):
+            current[sha1] = files
+            continue
+        try:
+            files = cache.extract(sha1, jar_path)
+            cache.link_into(sha1, files, natives_directory)
+        except FileNotFoundError:
+            logger.warning("Native library file does not exist: %s", jar_path)
+            continue
+        except Exception as exc:
+            logger.exception("Failed to extract natives from %s: %s", jar_path, exc)
+            continue
+        current[sha1] = files
+        extracted += 1
+
+    kept = {item for files in current.values() for item in files}
+    for sha1, files in previous.items():
+        if sha1 in current or not isinstance(files, list):
+            continue
+        for item in files:
+            if item in kept:
+                continue
+            try:
+                os.remove(os.path.join(natives_directory, *item.split("/")))
+            except OSError:
+                pass
+
+    if current != previous:
+        save_json_atomic(manifest_path, {"version": MANIFEST_VERSION, "jars": current}, indent=None)
+    return len(kept), extracted
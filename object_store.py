@@ -0,0 +1,128 @@
+import os
+import shutil
+import threading
+import uuid
+
+from file_utils import sha1_file
+from log_utils import get_logger
+
+
+OBJECT_STORE_DIR = os.path.join("cache", "objects")
+_FICLONE = 0x40049409
+logger = get_logger(__name__)
+
+
+def _reflink(source_path, target_path):
+    try:
+        import fcntl
+    except ImportError:
+        return False
+    try:
+        with open(source_path, "rb") as source, open(target_path, "wb") as target:
+            fcntl.ioctl(target.fileno(), _FICLONE, source.fileno())
+        return True
+    except OSError:
+        try:
+            os.remove(target_path)
+        except OSError:
+            pass
+        return False
+
+
+def link_or_copy(source_path, target_path):
+    """Place source_path at target_path via hardlink, reflink or copy, returning the method used."""
+    directory = os.path.dirname(os.path.abspath(target_path))
+    os.makedirs(directory, exist_ok=True)
+    temp_path = os.path.join(directory, f".{os.path.basename(target_path)}.{uuid.uuid4().hex}.tmp")
+    try:
+        try:
+            os.link(source_path, temp_path)
+            method = "hardlink"
+        except OSError:
+            if _reflink(source_path, temp_path):
+                method = "reflink"
+            else:
+                shutil.copy2(source_path, temp_path)
+                method = "copy"
+        os.replace(temp_path, target_path)
+        return method
+    except Exception:
+        try:
+            os.remove(temp_path)
+        except OSError:
+            pass
+        raise
+
+
+class ObjectStore:
+    """SHA1-keyed file store shared by every game directory, sharded like assets/objects/xx/."""
+
+    def __init__(self, root=OBJECT_STORE_DIR):
+        self.root = os.path.abspath(root or OBJECT_STORE_DIR)
+        # sha1 -> (size, mtime_ns) of objects hashed by this instance, so each is read at most once.
+        self._verified = {}
+        self._lock = threading.Lock()
+
+    def object_path(self, sha1):
+        digest = str(sha1 or "").lower()
+        return os.path.join(self.root, digest[:2], digest)
+
+    def has(self, sha1, size=0):
+        if not sha1:
+            return False
+        try:
+            stat = os.stat(self.object_path(sha1))
+        except OSError:
+            return False
+        return not size or stat.st_size == size
+
+    def verify(self, sha1, size=0):
+        """Like has(), but also hash the object and evict it when its content does not match sha1."""
+        if not sha1:
+            return False
+        digest = str(sha1).lower()
+        path = self.object_path(digest)
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return False
+        if size and stat.st_size != size:
+            return False
+        signature = (stat.st_size, stat.st_mtime_ns)
+        with self._lock:
+            if self._verified.get(digest) == signature:
+                return True
+        try:
+            actual = sha1_file(path)
+        except OSError as exc:
+            logger.debug("Failed to hash stored object: sha1=%s error=%s", digest, exc)
+            return False
+        if actual != digest:
+            logger.warning("Evicting corrupt stored object: sha1=%s actual=%s path=%s", digest, actual, path)
+            with self._lock:
+                self._verified.pop(digest, None)
+            try:
+                os.remove(path)
+            except OSError as exc:
+                logger.warning("Failed to evict corrupt stored object: path=%s error=%s", path, exc)
+            return False
+        with self._lock:
+            self._verified[digest] = signature
+        return True
+
+    def materialize(self, sha1, target_path):
+        method = link_or_copy(self.object_path(sha1), target_path)
+        logger.debug("Materialized stored object: sha1=%s method=%s target=%s", sha1, method, target_path)
+        return method
+
+    def ingest(self, source_path, sha1, size=0):
+        """Add an already verified file to the store; existing objects are left untouched."""
+        if not sha1 or self.has(sha1, size):
+            return False
+        try:
+            method = link_or_copy(source_path, self.object_path(sha1))
+        except OSError as exc:
+            logger.debug("Failed to add object to store: sha1=%s source=%s error=%s", sha1, source_path, exc)
+            return False
+        logger.debug("Stored object: sha1=%s method=%s source=%s", sha1, method, source_path)
+        return True
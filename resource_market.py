@@ -5,6 +5,7 @@ import tempfile
 import time
 
 import http_client
+from bandwidth import BANDWIDTH_LIMITER
 from file_utils import sanitize_filename, sha1_file, sha1_text
 from log_utils import get_logger
 from version_utils import (
@@ -72,6 +73,7 @@ def _stream_download(url, file_path, progress_callback=None, status_label="下
                     continue
                 file_handle.write(chunk)
                 downloaded += len(chunk)
+                BANDWIDTH_LIMITER.consume(len(chunk))
                 if progress_callback:
                     elapsed = max(0.001, time.monotonic() - start_time)
                     progress_callback({
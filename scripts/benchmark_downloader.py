@@ -0,0 +1,327 @@
+"""Benchmark the download pipeline against a local fake mirror.
+
+Starts an aiohttp stand-in serving a synthetic version (client jar, libraries and an asset
+index with thousands of objects) with configurable latency, bandwidth and failure injection,
+then measures wall time, CPU time and peak RSS of download_game_files, repair_game_files and
+collect_missing_game_files. Each phase runs in a fresh process by default so CPU and peak RSS
+belong to that phase alone; the mirror runs in this process and is not counted.
+
+    python scripts/benchmark_downloader.py --assets 4000 --latency-ms 20 --json bench.json
+    python scripts/benchmark_downloader.py --baseline bench.json --tolerance 0.25
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import hashlib
+import json
+import logging
+import multiprocessing
+import os
+import random
+import shutil
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+from aiohttp import web  # noqa: E402
+
+
+PHASES = ("download", "repair", "scan_cold", "scan_warm")
+CHUNK_SIZE = 64 * 1024
+
+
+def _synthetic_bytes(name, size):
+    seed = hashlib.sha256(name.encode()).digest()
+    return (seed * (size // len(seed) + 1))[:size]
+
+
+class FakeMirror:
+    """aiohttp stand-in for a download mirror serving one synthetic version."""
+
+    def __init__(self, assets=3000, libraries=40, latency_ms=0.0, bandwidth_kbps=0, failure_rate=0.0, seed=1):
+        self.latency = max(0.0, latency_ms) / 1000
+        self.bandwidth = max(0, bandwidth_kbps) * 1024
+        self.failure_rate = max(0.0, min(failure_rate, 1.0))
+        self.stats = {"requests": 0, "failures": 0, "bytes": 0}
+        self._random = random.Random(seed)
+        self._files = {}
+        self._objects = {}
+        self._library_specs = []
+        self._asset_index = {"objects": {}}
+        self._loop = None
+        self._thread = None
+        self._runner = None
+        self.root = ""
+
+        self._client = _synthetic_bytes("client", 4 * 1024 * 1024)
+        self._files["/client.jar"] = self._client
+        for index in range(libraries):
+            data = _synthetic_bytes(f"library-{index}", self._random.randint(16, 1024) * 1024)
+            path = f"com/example/lib{index}/1.0/lib{index}-1.0.jar"
+            self._files[f"/maven/{path}"] = data
+            self._library_specs.append((index, path, data))
+        for index in range(assets):
+            data = _synthetic_bytes(f"asset-{index}", self._random.randint(256, 32 * 1024))
+            digest = hashlib.sha1(data).hexdigest()
+            self._objects[digest] = data
+            self._asset_index["objects"][f"minecraft/bench/{index}.bin"] = {"hash": digest, "size": len(data)}
+        self._index_bytes = json.dumps(self._asset_index).encode()
+        self._files["/indexes/bench.json"] = self._index_bytes
+
+    @property
+    def total_bytes(self):
+        return sum(len(data) for data in self._files.values()) + sum(len(data) for data in self._objects.values())
+
+    def version_json(self):
+        return {
+            "id": "bench",
+            "downloads": {"client": {
+                "url": f"{self.root}/client.jar",
+                "sha1": hashlib.sha1(self._client).hexdigest(),
+                "size": len(self._client),
+            }},
+            "libraries": [
+                {
+                    "name": f"com.example:lib{index}:1.0",
+                    "downloads": {"artifact": {
+                        "path": path,
+                        "url": f"{self.root}/maven/{path}",
+                        "sha1": hashlib.sha1(data).hexdigest(),
+                        "size": len(data),
+                    }},
+                }
+                for index, path, data in self._library_specs
+            ],
+            "assetIndex": {
+                "id": "bench",
+                "url": f"{self.root}/indexes/bench.json",
+                "sha1": hashlib.sha1(self._index_bytes).hexdigest(),
+                "size": len(self._index_bytes),
+                "totalSize": sum(len(data) for data in self._objects.values()),
+            },
+        }
+
+    def _lookup(self, path):
+        if path.startswith("/objects/"):
+            return self._objects.get(path.rsplit("/", 1)[-1])
+        return self._files.get(path)
+
+    async def _handle(self, request):
+        self.stats["requests"] += 1
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        if self.failure_rate and self._random.random() < self.failure_rate:
+            self.stats["failures"] += 1
+            return web.Response(status=503)
+        data = self._lookup(request.path)
+        if data is None:
+            return web.Response(status=404)
+        status = 200
+        range_header = request.headers.get("Range", "")
+        if range_header.startswith("bytes="):
+            start = int(range_header[6:].split("-")[0] or 0)
+            if start >= len(data):
+                return web.Response(status=416)
+            data, status = data[start:], 206
+        if not self.bandwidth:
+            self.stats["bytes"] += len(data)
+            return web.Response(status=status, body=data)
+        response = web.StreamResponse(status=status)
+        response.content_length = len(data)
+        await response.prepare(request)
+        for offset in range(0, len(data), CHUNK_SIZE):
+            chunk = data[offset:offset + CHUNK_SIZE]
+            await response.write(chunk)
+            self.stats["bytes"] += len(chunk)
+            await asyncio.sleep(len(chunk) / self.bandwidth)
+        await response.write_eof()
+        return response
+
+    def start(self, host="127.0.0.1"):
+        started = threading.Event()
+
+        async def serve():
+            app = web.Application()
+            app.router.add_get("/{path:.*}", self._handle)
+            self._runner = web.AppRunner(app, access_log=None)
+            await self._runner.setup()
+            site = web.TCPSite(self._runner, host, 0)
+            await site.start()
+            self.root = f"http://{host}:{site._server.sockets[0].getsockname()[1]}"
+            started.set()
+
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._loop.run_forever, name="fake-mirror", daemon=True)
+        self._thread.start()
+        asyncio.run_coroutine_threadsafe(serve(), self._loop)
+        started.wait(10)
+        return self.root
+
+    def stop(self):
+        if self._loop is None:
+            return
+        asyncio.run_coroutine_threadsafe(self._runner.cleanup(), self._loop).result(10)
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join(5)
+        self._loop.close()
+        self._loop = None
+
+
+def _peak_rss_mb():
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return round(peak / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)
+
+
+def run_phase(phase, root, workspace, version_json, options, log_level="WARNING"):
+    """Run one benchmark phase and return its measurements; the workspace stands in for HOME."""
+    os.chdir(workspace)
+    for variable in ("HOME", "USERPROFILE", "APPDATA"):
+        os.environ[variable] = workspace
+    import downloader
+
+    root_logger = logging.getLogger()
+    previous_level, previous_base_url = root_logger.level, downloader.ASSET_BASE_URL
+    root_logger.setLevel(getattr(logging, log_level.upper(), logging.WARNING))
+    downloader.ASSET_BASE_URL = f"{root}/objects"
+    game_directory = os.path.join(workspace, ".minecraft")
+    wall_started = time.perf_counter()
+    cpu_started = time.process_time()
+    try:
+        if phase == "download":
+            asyncio.run(downloader.download_game_files(version_json, game_directory, version_json["id"], "", **options))
+            result = 0
+        elif phase == "repair":
+            asyncio.run(downloader.repair_game_files(version_json, game_directory, version_json["id"], "", **options))
+            result = 0
+        else:
+            if phase == "scan_cold":
+                try:
+                    os.remove(os.path.join(game_directory, ".mcgo", "verify-index.json"))
+                except OSError:
+                    pass
+            result = len(downloader.collect_missing_game_files(
+                version_json, game_directory, version_json["id"], hash_workers=options.get("hash_workers", 0)
+            ))
+    finally:
+        root_logger.setLevel(previous_level)
+        downloader.ASSET_BASE_URL = previous_base_url
+    return {
+        "phase": phase,
+        "wall_seconds": round(time.perf_counter() - wall_started, 3),
+        "cpu_seconds": round(time.process_time() - cpu_started, 3),
+        "peak_rss_mb": _peak_rss_mb(),
+        "missing": result,
+    }
+
+
+def run_benchmark(assets=3000, libraries=40, latency_ms=0.0, bandwidth_kbps=0, failure_rate=0.0, in_process=False, options=None, log_level="WARNING"):
+    mirror = FakeMirror(assets, libraries, latency_ms, bandwidth_kbps, failure_rate)
+    mirror.start()
+    workspace = tempfile.mkdtemp(prefix="mcgo-bench-")
+    options = {"object_store_dir": os.path.join(workspace, "objects"), **(options or {})}
+    previous_directory = os.getcwd()
+    previous_environment = dict(os.environ)
+    results = []
+    try:
+        version_json = mirror.version_json()
+        pool = None if in_process else multiprocessing.get_context("spawn").Pool(1, maxtasksperchild=1)
+        for phase in PHASES:
+            arguments = (phase, mirror.root, workspace, version_json, options, log_level)
+            results.append(run_phase(*arguments) if in_process else pool.apply(run_phase, arguments))
+        if pool:
+            pool.close()
+            pool.join()
+    finally:
+        os.chdir(previous_directory)
+        os.environ.clear()
+        os.environ.update(previous_environment)
+        mirror.stop()
+        shutil.rmtree(workspace, ignore_errors=True)
+    return {
+        "config": {
+            "assets": assets,
+            "libraries": libraries,
+            "latency_ms": latency_ms,
+            "bandwidth_kbps": bandwidth_kbps,
+            "failure_rate": failure_rate,
+            "in_process": in_process,
+            "total_bytes": mirror.total_bytes,
+            **{key: value for key, value in options.items() if key != "object_store_dir"},
+        },
+        "mirror": dict(mirror.stats),
+        "phases": results,
+    }
+
+
+def compare_with_baseline(report, baseline, tolerance):
+    """Return the phases whose wall time regressed beyond tolerance relative to baseline."""
+    previous = {item["phase"]: item for item in baseline.get("phases", [])}
+    regressions = []
+    for item in report["phases"]:
+        before = previous.get(item["phase"])
+        if before and before["wall_seconds"] > 0 and item["wall_seconds"] > before["wall_seconds"] * (1 + tolerance):
+            regressions.append((item["phase"], before["wall_seconds"], item["wall_seconds"]))
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the McGo download pipeline against a local fake mirror")
+    parser.add_argument("--assets", type=int, default=3000, help="number of synthetic asset objects")
+    parser.add_argument("--libraries", type=int, default=40, help="number of synthetic libraries")
+    parser.add_argument("--latency-ms", type=float, default=0.0, help="added latency per request")
+    parser.add_argument("--bandwidth-kbps", type=int, default=0, help="per-response bandwidth cap, 0 for unlimited")
+    parser.add_argument("--failure-rate", type=float, default=0.0, help="fraction of requests answered with 503")
+    parser.add_argument("--max-core", type=int, default=12, help="max_core_concurrency")
+    parser.add_argument("--max-asset", type=int, default=24, help="max_asset_concurrency")
+    parser.add_argument("--fixed-concurrency", action="store_true", help="disable concurrency auto-tuning")
+    parser.add_argument("--hash-workers", type=int, default=0, help="verification pool size, 0 for automatic")
+    parser.add_argument("--in-process", action="store_true", help="run phases in this process (peak RSS is cumulative)")
+    parser.add_argument("--log-level", default="WARNING", help="root log level; DEBUG reproduces the launcher's file logging")
+    parser.add_argument("--json", help="write the report to this path")
+    parser.add_argument("--baseline", help="compare wall times with a previous --json report")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="allowed slowdown against the baseline")
+    args = parser.parse_args(argv)
+
+    report = run_benchmark(
+        assets=args.assets,
+        libraries=args.libraries,
+        latency_ms=args.latency_ms,
+        bandwidth_kbps=args.bandwidth_kbps,
+        failure_rate=args.failure_rate,
+        in_process=args.in_process,
+        options={
+            "max_core_concurrency": args.max_core,
+            "max_asset_concurrency": args.max_asset,
+            "auto_concurrency": not args.fixed_concurrency,
+            "hash_workers": args.hash_workers,
+        },
+        log_level=args.log_level,
+    )
+    print(f"{'phase':<10} {'wall s':>8} {'cpu s':>8} {'peak MB':>8} {'missing':>8}")
+    for item in report["phases"]:
+        print(f"{item['phase']:<10} {item['wall_seconds']:>8.3f} {item['cpu_seconds']:>8.3f} {item['peak_rss_mb'] or 0:>8.1f} {item['missing']:>8}")
+    print(f"mirror: {report['mirror']}")
+    if args.json:
+        Path(args.json).write_text(json.dumps(report, indent=2), encoding="utf-8")
+    if args.baseline:
+        regressions = compare_with_baseline(report, json.loads(Path(args.baseline).read_text(encoding="utf-8")), args.tolerance)
+        for phase, before, after in regressions:
+            print(f"REGRESSION {phase}: {before:.3f}s -> {after:.3f}s")
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
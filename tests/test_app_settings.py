@@ -17,13 +17,25 @@ def test_read_download_options_clamps_numeric_values():
         app_settings.config["DOWNLOAD"]["max_core_threads"] = "0"
         app_settings.config["DOWNLOAD"]["max_asset_threads"] = "-3"
         app_settings.config["DOWNLOAD"]["speed_limit_kbps"] = "-1"
+        app_settings.config["DOWNLOAD"]["background_speed_limit_kbps"] = "-5"
         app_settings.config["DOWNLOAD"]["cache_strategy"] = "force"
+        app_settings.config["DOWNLOAD"]["hash_threads"] = "-2"
+        app_settings.config["DOWNLOAD"]["extra_mirrors"] = " https://mirror.example/ ,, "
 
         assert app_settings.read_download_options() == {
             "max_core_concurrency": 1,
             "max_asset_concurrency": 1,
+            "min_core_concurrency": 1,
+            "min_asset_concurrency": 1,
+            "auto_concurrency": True,
             "speed_limit_kbps": 0,
+            "background_speed_limit_kbps": 0,
             "cache_strategy": "force",
+            "object_store_dir": "",
+            "deep_verify": False,
+            "hash_workers": 0,
+            "fast_first_launch": False,
+            "extra_mirrors": ["https://mirror.example"],
         }
     finally:
         app_settings.config.clear()
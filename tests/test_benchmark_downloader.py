@@ -0,0 +1,22 @@
+import importlib.util
+from pathlib import Path
+
+
+def _load_benchmark():
+    path = Path(__file__).resolve().parents[1] / "scripts" / "benchmark_downloader.py"
+    spec = importlib.util.spec_from_file_location("benchmark_downloader", path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def test_benchmark_harness_runs_every_phase_against_fake_mirror():
+    benchmark = _load_benchmark()
+
+    report = benchmark.run_benchmark(assets=30, libraries=3, failure_rate=0.05, in_process=True, options={"auto_concurrency": False})
+
+    assert [item["phase"] for item in report["phases"]] == list(benchmark.PHASES)
+    assert all(item["missing"] == 0 for item in report["phases"])
+    assert report["mirror"]["bytes"] >= report["config"]["total_bytes"]
+    slower = {"phases": [{**item, "wall_seconds": item["wall_seconds"] * 3 + 1} for item in report["phases"]]}
+    assert [phase for phase, _, _ in benchmark.compare_with_baseline(slower, report, 0.2)] == list(benchmark.PHASES)
@@ -1,6 +1,14 @@
+import asyncio
+import hashlib
 import os
 
+import aiohttp
+import pytest
+
 import downloader
+from bandwidth import BandwidthLimiter
+from download_scheduler import LANE_ASSETS, LANE_CORE, CancelToken, ConcurrencyController, DownloadCancelled, JobScheduler
+from mirror_scoreboard import MirrorScoreboard
 
 
 def test_rewrite_url_uses_bmclapi_maven_for_libraries():
@@ -45,6 +53,577 @@ def test_core_jobs_skip_synthesized_artifact_for_native_only_library(monkeypatch
     assert [job.label for job in jobs] == ["jinput-platform-2.0.5-natives-windows.jar"]
 
 
+def test_candidate_urls_prefer_fastest_healthy_mirror():
+    scoreboard = MirrorScoreboard()
+    scoreboard.configure(["https://mirror.example/"])
+    url = "https://libraries.minecraft.net/com/example/demo/1.0/demo-1.0.jar"
+    scoreboard.record_success("https://libraries.minecraft.net/a.jar", 0.8, 1024 * 1024, 4.0)
+    scoreboard.record_success("https://bmclapi2.bangbang93.com/maven/a.jar", 0.1, 1024 * 1024, 0.5)
+    for _ in range(3):
+        scoreboard.record_failure("https://mirror.example/maven/a.jar", 503)
+
+    candidates = downloader._candidate_urls(url, "https://launchermeta.mojang.com", scoreboard, 4 * 1024 * 1024)
+
+    assert candidates == [
+        "https://bmclapi2.bangbang93.com/maven/com/example/demo/1.0/demo-1.0.jar",
+        url,
+        "https://mirror.example/maven/com/example/demo/1.0/demo-1.0.jar",
+    ]
+    assert not scoreboard.is_healthy(candidates[-1])
+
+
+def test_scheduler_runs_core_lane_first_and_starts_large_files_early():
+    started = []
+
+    async def handler(job, queue_wait):
+        started.append(job.label)
+        await asyncio.sleep(0)
+
+    def jobs(prefix, sizes):
+        return [downloader.DownloadJob("", "", "", size=size, label=f"{prefix}{size}") for size in sizes]
+
+    scheduler = JobScheduler(handler)
+    scheduler.open_lane(LANE_CORE, 1)
+    scheduler.open_lane(LANE_ASSETS, 4)
+    scheduler.submit(LANE_ASSETS, jobs("asset", [1, 50, 2, 3]))
+    scheduler.submit(LANE_CORE, jobs("core", [10, 900]))
+    scheduler.close()
+    asyncio.run(scheduler.run())
+
+    assert started[0] == "core900"
+    assert started[1:3] == ["asset50", "asset1"]
+    assert sorted(started) == sorted(["core10", "core900", "asset1", "asset2", "asset3", "asset50"])
+
+
+
+def test_scheduler_pulls_streamed_jobs_in_bounded_chunks():
+    pulled = []
+    started = []
+
+    def generate():
+        for index in range(50):
+            pulled.append(index)
+            yield downloader.DownloadJob("", "", "", size=index, label=str(index))
+
+    async def handler(job, queue_wait):
+        # Only the current chunk plus the refill below chunk_size may be materialized.
+        assert len(pulled) - len(started) <= 20
+        started.append(job.label)
+        await asyncio.sleep(0)
+
+    scheduler = JobScheduler(handler)
+    scheduler.open_lane(LANE_ASSETS, 2)
+    scheduler.submit_stream(LANE_ASSETS, generate(), chunk_size=10)
+    scheduler.close()
+    asyncio.run(scheduler.run())
+
+    assert sorted(started, key=int) == [str(index) for index in range(50)]
+
+def test_scheduler_cancel_token_interrupts_waiting_workers():
+    token = CancelToken()
+
+    async def handler(job, queue_wait):
+        asyncio.get_running_loop().call_later(0.01, token.cancel)
+        await asyncio.sleep(30)
+
+    scheduler = JobScheduler(handler, token)
+    scheduler.open_lane(LANE_CORE, 2)
+    scheduler.submit(LANE_CORE, [downloader.DownloadJob("", "", "", size=1)])
+
+    async def scenario():
+        try:
+            await asyncio.wait_for(scheduler.run(), timeout=5)
+        except DownloadCancelled:
+            return True
+        return False
+
+    assert asyncio.run(scenario())
+
+
+def test_bandwidth_limiter_caps_background_only_while_foreground_is_active():
+    now = [0.0]
+    limiter = BandwidthLimiter(clock=lambda: now[0])
+    limiter.configure(256 * 1024, 128 * 1024)
+
+    assert limiter.reserve(256 * 1024) == 1.0
+    now[0] = 1.5
+    assert limiter.reserve(192 * 1024, background=True) == 0.5
+    now[0] = 10.0
+    assert limiter.reserve(256 * 1024, background=True) == 0.0
+
+    limiter.configure(0)
+    assert limiter.reserve(10 * 1024 * 1024) == 0.0
+
+
+def test_fast_first_launch_defers_sounds_and_extra_languages(tmp_path):
+    objects = {
+        "icons/icon_16x16.png": {"hash": "a" * 40, "size": 1},
+        "minecraft/sounds.json": {"hash": "b" * 40, "size": 1},
+        "minecraft/sounds/ambient/cave/cave1.ogg": {"hash": "c" * 40, "size": 1},
+        "minecraft/lang/zh_cn.json": {"hash": "d" * 40, "size": 1},
+        "minecraft/lang/de_de.json": {"hash": "e" * 40, "size": 1},
+    }
+    critical, deferred = downloader.split_deferred_assets({"objects": objects})
+    assert sorted(deferred) == ["minecraft/lang/de_de.json", "minecraft/sounds/ambient/cave/cave1.ogg"]
+    assert downloader.split_deferred_assets({"objects": objects, "virtual": True})[1] == {}
+
+    index_dir = tmp_path / "assets" / "indexes"
+    index_dir.mkdir(parents=True)
+    (index_dir / "demo.json").write_text(downloader.json.dumps({"objects": objects}), encoding="utf-8")
+    version_json = {"id": "demo", "assetIndex": {"id": "demo", "url": "https://example.invalid/demo.json"}}
+    downloader._set_deferred_assets(str(tmp_path), "demo", len(deferred))
+
+    missing = downloader.collect_missing_game_files(version_json, str(tmp_path), "demo", skip_deferred=True)
+    assert len(missing) == len(critical)
+    assert len(downloader.collect_missing_game_files(version_json, str(tmp_path), "demo")) == len(objects)
+
+    downloader._set_deferred_assets(str(tmp_path), "demo", 0)
+    assert downloader.pending_deferred_assets(str(tmp_path)) == {}
+
+
+def test_asset_jobs_are_compact_and_deduplicated(tmp_path):
+    object_hash = "ab" + "c" * 38
+    asset_index = {"objects": {
+        "minecraft/sounds/a.ogg": {"hash": object_hash, "size": 7},
+        "minecraft/sounds/copy.ogg": {"hash": object_hash, "size": 7},
+    }}
+
+    jobs = downloader._build_asset_jobs(asset_index, str(tmp_path), "https://bmclapi2.bangbang93.com")
+
+    assert len(jobs) == 1
+    assert not hasattr(jobs[0], "__dict__")
+    assert jobs[0].file_path == os.path.join(str(tmp_path), "assets", "objects", "ab", object_hash)
+    assert jobs[0].url == f"https://bmclapi2.bangbang93.com/assets/ab/{object_hash}"
+
+
+def test_extract_natives_shares_cache_and_skips_unchanged_jars(tmp_path, monkeypatch):
+    import zipfile
+
+    monkeypatch.setattr(downloader.platform, "system", lambda: "Linux")
+    monkeypatch.setattr(downloader.platform, "machine", lambda: "x86_64")
+    jar = tmp_path / "game" / "libraries" / "lwjgl-natives-linux.jar"
+    jar.parent.mkdir(parents=True)
+    with zipfile.ZipFile(jar, "w") as archive:
+        archive.writestr("liblwjgl.so", b"native")
+        archive.writestr("META-INF/MANIFEST.MF", b"skip")
+
+    def version(version_id, sha1):
+        return {"libraries": [{
+            "natives": {"linux": "natives-linux"},
+            "downloads": {"classifiers": {"natives-linux": {"path": "lwjgl-natives-linux.jar", "sha1": sha1}}},
+        }]}
+
+    game_dir = str(tmp_path / "game")
+    cache_dir = str(tmp_path / "natives-cache")
+    jar_sha1 = hashlib.sha1(jar.read_bytes()).hexdigest()
+    downloader.extract_natives(version("a", jar_sha1), game_dir, "a", cache_dir)
+    downloader.extract_natives(version("b", jar_sha1), game_dir, "b", cache_dir)
+    first = tmp_path / "game" / "versions" / "a" / "a-natives" / "liblwjgl.so"
+    second = tmp_path / "game" / "versions" / "b" / "b-natives" / "liblwjgl.so"
+    assert first.read_bytes() == b"native"
+    assert os.path.samefile(first, second)
+    assert not (tmp_path / "game" / "versions" / "a" / "a-natives" / "META-INF").exists()
+
+    import natives_cache
+
+    extracted = []
+    monkeypatch.setattr(natives_cache, "_extract_entries", lambda *args: extracted.append(args) or [])
+    downloader.extract_natives(version("a", jar_sha1), game_dir, "a", cache_dir)
+    assert extracted == []
+    assert first.exists()
+
+
+def test_extract_natives_keys_cache_by_jar_content_when_declared_sha1_mismatches(tmp_path, monkeypatch):
+    import zipfile
+
+    monkeypatch.setattr(downloader.platform, "system", lambda: "Linux")
+    monkeypatch.setattr(downloader.platform, "machine", lambda: "x86_64")
+    jar = tmp_path / "game" / "libraries" / "lwjgl-natives-linux.jar"
+    jar.parent.mkdir(parents=True)
+    with zipfile.ZipFile(jar, "w") as archive:
+        archive.writestr("liblwjgl.so", b"tampered")
+    declared = "1" * 40
+    cache_dir = tmp_path / "natives-cache"
+    (cache_dir / declared).mkdir(parents=True)
+    (cache_dir / declared / "liblwjgl.so").write_bytes(b"native")
+    (cache_dir / f"{declared}.json").write_text('["liblwjgl.so"]')
+    version_json = {"libraries": [{
+        "natives": {"linux": "natives-linux"},
+        "downloads": {"classifiers": {"natives-linux": {"path": "lwjgl-natives-linux.jar", "sha1": declared}}},
+    }]}
+
+    downloader.extract_natives(version_json, str(tmp_path / "game"), "a", str(cache_dir))
+
+    assert (tmp_path / "game" / "versions" / "a" / "a-natives" / "liblwjgl.so").read_bytes() == b"tampered"
+    assert (cache_dir / hashlib.sha1(jar.read_bytes()).hexdigest()).is_dir()
+
+
 def test_run_jobs_does_not_create_one_task_per_job():
     # The bounded queue should create at most the configured concurrency workers.
     assert os.path.basename(downloader.__file__) == "downloader.py"
+
+
+def test_process_job_materializes_from_shared_object_store(tmp_path):
+    payload = b"shared library"
+    sha1 = hashlib.sha1(payload).hexdigest()
+    store = downloader.ObjectStore(str(tmp_path / "store"))
+    source = tmp_path / "source.jar"
+    source.write_bytes(payload)
+    assert store.ingest(str(source), sha1, len(payload))
+
+    game_dir = tmp_path / "game"
+    job = downloader.DownloadJob(
+        url="https://libraries.minecraft.net/demo.jar",
+        file_path=str(game_dir / "libraries" / "demo.jar"),
+        relative_path=os.path.join("libraries", "demo.jar"),
+        size=len(payload),
+        sha1=sha1,
+        label="demo.jar",
+    )
+    context = downloader.DownloadContext(
+        session=None,
+        progress=downloader.DownloadProgress(),
+        target_game_dir=str(game_dir),
+        object_store=store,
+    )
+    result = asyncio.run(downloader._process_job(context, job))
+
+    assert result == "reused"
+    assert (game_dir / "libraries" / "demo.jar").read_bytes() == payload
+
+
+
+def test_corrupt_store_object_is_evicted_instead_of_materialized(tmp_path):
+    payload = b"shared library"
+    sha1 = hashlib.sha1(payload).hexdigest()
+    store = downloader.ObjectStore(str(tmp_path / "store"))
+    source = tmp_path / "source.jar"
+    source.write_bytes(b"shared librarx")
+    assert store.ingest(str(source), sha1, len(payload))
+
+    target = tmp_path / "game" / "libraries" / "demo.jar"
+    job = downloader.DownloadJob(
+        url="https://libraries.minecraft.net/demo.jar",
+        file_path=str(target),
+        relative_path=os.path.join("libraries", "demo.jar"),
+        size=len(payload),
+        sha1=sha1,
+        label="demo.jar",
+    )
+    assert downloader._reuse_local_file(job, [], str(tmp_path / "game"), object_store=store) == ""
+    assert not target.exists()
+    assert not store.has(sha1)
+
+def test_verify_index_skips_rehash_until_file_changes(tmp_path, monkeypatch):
+    payload = b"client jar"
+    sha1 = hashlib.sha1(payload).hexdigest()
+    target = tmp_path / "versions" / "demo" / "demo.jar"
+    target.parent.mkdir(parents=True)
+    target.write_bytes(payload)
+
+    index = downloader.VerifyIndex(str(tmp_path))
+    assert downloader._matches_file(str(target), len(payload), sha1, index)
+    index.save()
+
+    hashed = []
+    real_sha1 = downloader._sha1_file
+    monkeypatch.setattr(downloader, "_sha1_file", lambda path: hashed.append(path) or real_sha1(path))
+    reloaded = downloader.VerifyIndex(str(tmp_path))
+    assert downloader._matches_file(str(target), len(payload), sha1, reloaded)
+    assert hashed == []
+
+    deep = downloader.VerifyIndex(str(tmp_path), deep=True)
+    assert downloader._matches_file(str(target), len(payload), sha1, deep)
+    assert hashed == [str(target)]
+
+
+def test_download_single_resumes_part_file_with_range(tmp_path):
+    from aiohttp import web
+
+    payload = bytes(range(256)) * 64
+    sha1 = hashlib.sha1(payload).hexdigest()
+    seen_ranges = []
+
+    async def handler(request):
+        range_header = request.headers.get("Range", "")
+        seen_ranges.append(range_header)
+        if range_header:
+            start = int(range_header.split("=")[1].split("-")[0])
+            return web.Response(status=206, body=payload[start:])
+        return web.Response(body=payload)
+
+    target = tmp_path / "libraries" / "demo.jar"
+    target.parent.mkdir(parents=True)
+    (tmp_path / "libraries" / "demo.jar.part").write_bytes(payload[:1000])
+
+    async def scenario():
+        app = web.Application()
+        app.router.add_get("/demo.jar", handler)
+        runner = web.AppRunner(app)
+        await runner.setup()
+        site = web.TCPSite(runner, "127.0.0.1", 0)
+        await site.start()
+        port = site._server.sockets[0].getsockname()[1]
+        job = downloader.DownloadJob(
+            url=f"http://127.0.0.1:{port}/demo.jar",
+            file_path=str(target),
+            relative_path=os.path.join("libraries", "demo.jar"),
+            size=len(payload),
+            sha1=sha1,
+            label="demo.jar",
+        )
+        progress = downloader.DownloadProgress()
+        try:
+            async with aiohttp.ClientSession() as session:
+                context = downloader.DownloadContext(session=session, progress=progress, target_game_dir=str(tmp_path))
+                await downloader._download_single(context, job, progress)
+        finally:
+            await runner.cleanup()
+        return progress
+
+    progress = asyncio.run(scenario())
+
+    assert seen_ranges == ["bytes=1000-"]
+    assert target.read_bytes() == payload
+    assert not (tmp_path / "libraries" / "demo.jar.part").exists()
+    assert progress.ready_bytes == len(payload)
+
+
+def test_run_job_records_telemetry_per_phase(tmp_path):
+    from aiohttp import web
+
+    from download_telemetry import DownloadTelemetry, telemetry_trace_config
+
+    payload = b"x" * 4096
+    sha1 = hashlib.sha1(payload).hexdigest()
+    (tmp_path / "libraries").mkdir()
+    (tmp_path / "libraries" / "kept.jar").write_bytes(payload)
+    report_port = []
+
+    def job(name):
+        return downloader.DownloadJob(
+            url="",
+            file_path=str(tmp_path / "libraries" / name),
+            relative_path=os.path.join("libraries", name),
+            size=len(payload),
+            sha1=sha1,
+            label=name,
+        )
+
+    async def handler(request):
+        return web.Response(body=payload)
+
+    async def scenario():
+        app = web.Application()
+        app.router.add_get("/fresh.jar", handler)
+        runner = web.AppRunner(app)
+        await runner.setup()
+        site = web.TCPSite(runner, "127.0.0.1", 0)
+        await site.start()
+        port = site._server.sockets[0].getsockname()[1]
+        report_port.append(port)
+        fresh = job("fresh.jar")
+        fresh.url = f"http://127.0.0.1:{port}/fresh.jar"
+        telemetry = DownloadTelemetry("download", "demo")
+        try:
+            async with aiohttp.ClientSession(trace_configs=[telemetry_trace_config()]) as session:
+                context = downloader.DownloadContext(
+                    session=session,
+                    progress=downloader.DownloadProgress(),
+                    target_game_dir=str(tmp_path),
+                    cache_strategy="redownload",
+                    telemetry=telemetry,
+                )
+                await downloader._run_job(context, job("kept.jar"), queue_wait=0.5)
+                await downloader._run_job(context, fresh)
+        finally:
+            await runner.cleanup()
+        return telemetry
+
+    telemetry = asyncio.run(scenario())
+    report_path = downloader.download_report_path(str(tmp_path), "demo")
+    report = telemetry.save(report_path)
+
+    core = report["phases"]["core"]
+    assert core["outcomes"] == {"reused": 1, "downloaded": 1}
+    assert core["bytes_reused"] == len(payload)
+    assert core["bytes_fetched"] == len(payload)
+    assert core["queue_wait_max"] == 0.5
+    assert core["new_connections"] == 1 and core["ttfb_p50"] is not None
+    assert list(report["mirrors"]) == [f"127.0.0.1:{report_port[0]}"]
+    assert downloader.load_json_file(report_path, {})["status"] == "completed"
+
+
+def test_concurrency_controller_grows_with_throughput_and_backs_off():
+    now = [0.0]
+    controller = ConcurrencyController(2, 24, clock=lambda: now[0])
+    assert controller.limit == 4
+
+    def window(byte_count, latency=0.05, **kwargs):
+        now[0] += 1.0
+        controller.record(byte_count, latency, **kwargs)
+
+    window(1000)
+    assert controller.limit == 8
+    window(2000)
+    assert controller.limit == 16
+    window(2000)
+    assert controller.limit == 16
+    window(4000)
+    assert controller.limit == 17
+    window(0, None, error=True, throttled=True)
+    assert controller.limit == 8
+    window(4000, latency=1.0)
+    assert controller.limit == 6
+    for _ in range(10):
+        window(0, None, error=True)
+    assert controller.limit == 2
+
+
+def test_batch_plan_deduplicates_shared_files_across_versions(tmp_path):
+    from aiohttp import web
+
+    blobs = {name: f"{name} payload".encode() * 50 for name in ("client1", "client2", "shared", "a", "b", "c")}
+    digests = {name: hashlib.sha1(data).hexdigest() for name, data in blobs.items()}
+    indexes = {
+        "idx1": {"objects": {"a.ogg": {"hash": digests["a"], "size": len(blobs["a"])}, "b.ogg": {"hash": digests["b"], "size": len(blobs["b"])}}},
+        "idx2": {"objects": {"b.ogg": {"hash": digests["b"], "size": len(blobs["b"])}, "c.ogg": {"hash": digests["c"], "size": len(blobs["c"])}}},
+    }
+    index_bytes = {key: downloader.json.dumps(value).encode() for key, value in indexes.items()}
+    served = []
+
+    async def handler(request):
+        name = request.path.rsplit("/", 1)[-1]
+        served.append(name)
+        if name in index_bytes:
+            return web.Response(body=index_bytes[name])
+        for blob_name, digest in digests.items():
+            if name in (blob_name, digest):
+                return web.Response(body=blobs[blob_name])
+        return web.Response(status=404)
+
+    # Object "a" is already in place, so only the other unique files are fetched.
+    existing = tmp_path / "assets" / "objects" / digests["a"][:2] / digests["a"]
+    existing.parent.mkdir(parents=True)
+    existing.write_bytes(blobs["a"])
+
+    async def scenario():
+        app = web.Application()
+        app.router.add_get("/{path:.*}", handler)
+        runner = web.AppRunner(app)
+        await runner.setup()
+        site = web.TCPSite(runner, "127.0.0.1", 0)
+        await site.start()
+        root = f"http://127.0.0.1:{site._server.sockets[0].getsockname()[1]}"
+        monkey_base = downloader.ASSET_BASE_URL
+        downloader.ASSET_BASE_URL = f"{root}/objects"
+
+        def version(version_id, client, index_id):
+            return {
+                "id": version_id,
+                "downloads": {"client": {"url": f"{root}/client/{client}", "sha1": digests[client], "size": len(blobs[client])}},
+                "libraries": [{
+                    "name": "com.example:shared:1.0",
+                    "downloads": {"artifact": {
+                        "path": "com/example/shared/1.0/shared-1.0.jar",
+                        "url": f"{root}/lib/shared",
+                        "sha1": digests["shared"],
+                        "size": len(blobs["shared"]),
+                    }},
+                }],
+                "assetIndex": {"id": index_id, "url": f"{root}/indexes/{index_id}", "size": len(index_bytes[index_id])},
+            }
+
+        from app_settings import read_download_options
+
+        # The UI passes every configured option; each must reach the step that accepts it.
+        options = {**read_download_options(), "object_store_dir": str(tmp_path / "store"), "auto_concurrency": False}
+        try:
+            plan, report = await downloader.download_versions(
+                [version("v1", "client1", "idx1"), version("v2", "client2", "idx2")],
+                str(tmp_path),
+                "",
+                **options,
+            )
+        finally:
+            downloader.ASSET_BASE_URL = monkey_base
+            await runner.cleanup()
+        return plan, report
+
+    plan, report = asyncio.run(scenario())
+    summary = plan.summary()
+
+    assert summary["requested_files"] == 8
+    assert summary["unique_files"] == 6
+    assert summary["existing_files"] == 1
+    assert summary["fetch_files"] == 5
+    assert summary["fetch_bytes"] == sum(len(blobs[name]) for name in ("client1", "client2", "shared", "b", "c"))
+    assert sorted(served) == sorted(["idx1", "idx2", "client1", "client2", "shared", digests["b"], digests["c"]])
+    assert report["status"] == "completed"
+    assert report["total"]["bytes_fetched"] == summary["fetch_bytes"]
+    assert (tmp_path / "versions" / "v2" / "v2.json").exists()
+
+
+def test_cancelled_download_keeps_its_report_out_of_versions(tmp_path):
+    token = CancelToken()
+    token.cancel()
+    version_json = {
+        "id": "demo",
+        "downloads": {"client": {"url": "http://127.0.0.1:9/client.jar", "sha1": "0" * 40, "size": 1}},
+        "libraries": [],
+    }
+
+    with pytest.raises(DownloadCancelled):
+        asyncio.run(downloader.download_game_files(version_json, str(tmp_path), "demo", "official", cancel_token=token))
+
+    assert not (tmp_path / "versions" / "demo").exists()
+    staged_report = tmp_path / ".mcgo" / "staging" / "demo" / "download-report.json"
+    assert downloader.load_json_file(str(staged_report), {})["status"] == "cancelled"
+
+
+def test_repair_options_from_configured_download_options_bind_to_repair_game_files():
+    import inspect
+
+    from app_settings import read_download_options
+
+    options = downloader.repair_options(read_download_options())
+    bound = inspect.signature(downloader.repair_game_files).bind(
+        {"id": "demo"}, "game", "demo", "official", progress_callback=None, cancel_token=None, **options
+    )
+    assert bound.arguments["deep_verify"] is False
+    assert "fast_first_launch" not in options
+
+
+def test_reuse_from_another_game_directory_copies_instead_of_linking(tmp_path):
+    data = b"library bytes"
+    source = tmp_path / "other" / "libraries" / "demo.jar"
+    source.parent.mkdir(parents=True)
+    source.write_bytes(data)
+    target_dir = tmp_path / "game"
+    job = downloader.DownloadJob(
+        url="https://example.invalid/demo.jar",
+        file_path=str(target_dir / "libraries" / "demo.jar"),
+        relative_path=os.path.join("libraries", "demo.jar"),
+        size=len(data),
+        sha1=hashlib.sha1(data).hexdigest(),
+    )
+
+    assert downloader._try_copy_from_cache(job, [str(tmp_path / "other")], str(target_dir))
+    assert (target_dir / "libraries" / "demo.jar").read_bytes() == data
+    assert not os.path.samefile(source, job.file_path)
+
+
+def test_repair_extracts_natives_off_the_event_loop(tmp_path, monkeypatch):
+    import threading
+
+    threads = []
+    monkeypatch.setattr(downloader, "extract_natives", lambda *args: threads.append(threading.current_thread()))
+
+    async def scenario():
+        await downloader.repair_game_files({"id": "demo", "libraries": []}, str(tmp_path), "demo", "")
+        return threading.current_thread()
+
+    loop_thread = asyncio.run(scenario())
+
+    assert len(threads) == 1
+    assert threads[0] is not loop_thread
@@ -0,0 +1,30 @@
+import sys
+
+from game_process import GameSupervisor, load_session_history
+
+
+def test_supervisor_buffers_output_and_records_exit(tmp_path):
+    supervisor = GameSupervisor(sample_interval=0.01)
+    exited = []
+    supervisor.on_exit.append(exited.append)
+    script = (
+        "import sys, time\n"
+        "for index in range(50):\n"
+        "    print(f'line {index}', flush=True)\n"
+        "print('Exception in thread main java.lang.OutOfMemoryError: Java heap space', file=sys.stderr, flush=True)\n"
+        "time.sleep(0.2)\n"
+        "sys.exit(3)\n"
+    )
+
+    session = supervisor.start([sys.executable, "-c", script], "1.20.1", str(tmp_path), max_memory_mb=1024)
+    assert session.wait(timeout=10)
+
+    assert session.exit_code == 3
+    assert session.oom
+    assert session.lines(limit=2) == ["line 49", "Exception in thread main java.lang.OutOfMemoryError: Java heap space"]
+    assert session.peak_rss_mb > 0
+    assert exited == [session]
+    assert supervisor.get(session.session_id) is session
+    assert supervisor.sessions(running_only=True) == []
+    history = load_session_history(str(tmp_path), "1.20.1")
+    assert [(item["exit_code"], item["oom"], item["max_memory_mb"]) for item in history] == [(3, True, 1024)]
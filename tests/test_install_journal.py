@@ -0,0 +1,51 @@
+import os
+
+import install_journal
+from install_journal import InstallTransaction, recover_transactions
+
+
+class _Job:
+    def __init__(self, file_path):
+        self.file_path = file_path
+
+
+def test_transaction_stages_version_files_until_commit(tmp_path):
+    transaction = InstallTransaction(str(tmp_path), "1.20.1").begin()
+    version_directory = tmp_path / "versions" / "1.20.1"
+    client = _Job(str(version_directory / "1.20.1.jar"))
+    library = _Job(str(tmp_path / "libraries" / "demo.jar"))
+
+    staged = transaction.stage_jobs([client, library])
+
+    assert staged == [(client, str(version_directory / "1.20.1.jar"))]
+    assert library.file_path == str(tmp_path / "libraries" / "demo.jar")
+    os.makedirs(os.path.dirname(client.file_path), exist_ok=True)
+    with open(client.file_path, "wb") as file_handle:
+        file_handle.write(b"jar")
+    with open(transaction.staged_path(str(version_directory / "1.20.1.json")), "w", encoding="utf-8") as file_handle:
+        file_handle.write("{}")
+    with open(client.file_path + ".part", "wb") as file_handle:
+        file_handle.write(b"partial")
+    assert not version_directory.exists()
+
+    assert transaction.commit() == 2
+    assert (version_directory / "1.20.1.jar").read_bytes() == b"jar"
+    assert (version_directory / "1.20.1.json").exists()
+    assert not os.path.exists(transaction.staging_directory)
+    assert not (tmp_path / install_journal.JOURNAL_FILE).exists()
+
+
+def test_recover_rolls_interrupted_commit_forward_and_expires_stale_staging(tmp_path):
+    committing = InstallTransaction(str(tmp_path), "a").begin()
+    with open(os.path.join(committing.staging_directory, "a.json"), "w", encoding="utf-8") as file_handle:
+        file_handle.write("{}")
+    committing._write_state(install_journal.STATE_COMMITTING)
+    InstallTransaction(str(tmp_path), "fresh").begin()
+    InstallTransaction(str(tmp_path), "stale").begin()
+    install_journal._update_journal(str(tmp_path), "stale", {"state": "staging", "updated_at": 0})
+
+    actions = recover_transactions(str(tmp_path))
+
+    assert actions == {"a": "committed", "stale": "rolled_back"}
+    assert (tmp_path / "versions" / "a" / "a.json").exists()
+    assert list(install_journal._load_journal(str(tmp_path))) == ["fresh"]
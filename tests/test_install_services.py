@@ -0,0 +1,65 @@
+import pytest
+
+import install_services
+
+
+class FakeResponse:
+    def __init__(self, status_code, body=b"", headers=None):
+        self.status_code = status_code
+        self.body = body
+        self.headers = {"content-length": str(len(body)), **(headers or {})}
+        self.closed = False
+
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            raise RuntimeError(f"HTTP {self.status_code}")
+
+    def iter_content(self, chunk_size):
+        yield self.body
+
+    def close(self):
+        self.closed = True
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def test_stream_download_resumes_only_with_a_matching_validator(tmp_path, monkeypatch):
+    target = tmp_path / "lib.jar"
+    requests = []
+    responses = []
+
+    def fake_get(url, headers=None, **kwargs):
+        requests.append(dict(headers or {}))
+        return responses.pop(0)
+
+    monkeypatch.setattr(install_services.http_client, "get", fake_get)
+
+    # A leftover without validator or SHA1 is thrown away and downloaded in full.
+    (tmp_path / "lib.jar.part").write_bytes(b"stale")
+    responses.append(FakeResponse(200, b"new content", {"etag": '"v2"'}))
+    install_services.stream_download("https://example.com/lib.jar", str(target))
+    assert requests[-1] == {}
+    assert target.read_bytes() == b"new content"
+
+    # A leftover with a stored validator is resumed with If-Range.
+    (tmp_path / "lib.jar.part").write_bytes(b"new ")
+    install_services.save_json_atomic(str(tmp_path / "lib.jar.part.validator"), {"if_range": '"v2"'})
+    responses.append(FakeResponse(206, b"content", {"etag": '"v2"'}))
+    install_services.stream_download("https://example.com/lib.jar", str(target))
+    assert requests[-1] == {"Range": "bytes=4-", "If-Range": '"v2"'}
+    assert target.read_bytes() == b"new content"
+    assert not (tmp_path / "lib.jar.part.validator").exists()
+
+
+def test_stream_download_closes_failed_responses(tmp_path, monkeypatch):
+    failed = [FakeResponse(500), FakeResponse(503)]
+    pending = list(failed)
+    monkeypatch.setattr(install_services.http_client, "get", lambda url, **kwargs: pending.pop(0))
+
+    with pytest.raises(Exception):
+        install_services.stream_download("https://example.com/lib.jar", str(tmp_path / "lib.jar"))
+    assert all(item.closed for item in failed)
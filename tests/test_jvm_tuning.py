@@ -0,0 +1,68 @@
+from jvm_tuning import apply_auto_memory, count_mods, tune_jvm_memory
+
+
+def test_tuning_grows_after_oom_and_shrinks_by_one_step_at_most():
+    oom = [{"max_memory_mb": 4096, "peak_rss_mb": 4300, "duration_seconds": 900, "oom": True}]
+    tuned = tune_jvm_memory(mod_count=150, history=oom, total_mb=32768, available_mb=24000, java_major=17)
+    assert tuned["max_memory_mb"] == 6144
+    assert tuned["gc_strategy"] == "G1GC"
+    assert tuned["gc_region_mb"] == 8
+
+    clean = [
+        {"max_memory_mb": 4096, "peak_rss_mb": 1500, "duration_seconds": 1800, "oom": False},
+        {"max_memory_mb": 4096, "peak_rss_mb": 9000, "duration_seconds": 5, "oom": False},
+    ]
+    tuned = tune_jvm_memory(mod_count=150, history=clean, total_mb=32768, available_mb=24000)
+    assert tuned["max_memory_mb"] == 3072
+    assert tuned["min_memory_mb"] == 768
+
+
+def test_repeated_clean_sessions_of_a_small_pack_settle():
+    history = []
+    heaps = []
+    for _ in range(8):
+        tuned = tune_jvm_memory(mod_count=10, history=history, total_mb=32768, available_mb=24000)
+        heaps.append(tuned["max_memory_mb"])
+        # G1 commits the whole heap over a long session, while only about 1 GB is live.
+        history.append({
+            "max_memory_mb": tuned["max_memory_mb"],
+            "peak_rss_mb": tuned["max_memory_mb"] + 600,
+            "duration_seconds": 3600,
+            "oom": False,
+        })
+    assert heaps == sorted(heaps, reverse=True)
+    assert heaps[-1] == heaps[-2] == heaps[0]
+
+    history = []
+    heaps = []
+    for _ in range(8):
+        tuned = tune_jvm_memory(mod_count=10, history=history, total_mb=32768, available_mb=24000)
+        heaps.append(tuned["max_memory_mb"])
+        history.append({
+            "max_memory_mb": tuned["max_memory_mb"],
+            "peak_rss_mb": min(tuned["max_memory_mb"], 900) + 500,
+            "duration_seconds": 3600,
+            "oom": False,
+        })
+    assert heaps == sorted(heaps, reverse=True)
+    assert heaps[-1] == heaps[-2] < heaps[0]
+
+
+def test_tuning_respects_free_memory_and_picks_zgc_for_large_heaps():
+    tuned = tune_jvm_memory(mod_count=500, history=[], total_mb=8192, available_mb=3000)
+    assert tuned["max_memory_mb"] == 1024
+    assert "可用内存" in tuned["reason"]
+
+    heavy = [{"max_memory_mb": 10240, "duration_seconds": 600, "oom": True}]
+    tuned = tune_jvm_memory(mod_count=500, history=heavy, total_mb=65536, available_mb=60000, java_major=21)
+    assert tuned["max_memory_mb"] == 15360
+    assert tuned["gc_strategy"] == "ZGC"
+    assert apply_auto_memory({"gc_strategy": "ParallelGC"}, tuned)["gc_strategy"] == "ParallelGC"
+
+
+def test_count_mods_only_counts_jars(tmp_path):
+    (tmp_path / "a.jar").write_bytes(b"")
+    (tmp_path / "b.JAR").write_bytes(b"")
+    (tmp_path / "c.jar.disabled").write_bytes(b"")
+    assert count_mods(str(tmp_path)) == 2
+    assert count_mods(str(tmp_path / "missing")) == 0
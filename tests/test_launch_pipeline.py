@@ -0,0 +1,106 @@
+import threading
+import time
+
+import pytest
+
+import launch_pipeline
+from launch_pipeline import check_game_files, prepare_account, run_stage_graph
+
+
+def test_stage_graph_runs_independent_stages_concurrently():
+    both_started = threading.Barrier(2, timeout=2)
+    order = []
+
+    def independent(name):
+        def run(results):
+            both_started.wait()
+            order.append(name)
+            return name
+
+        return run
+
+    results = run_stage_graph({
+        "account": ((), independent("account")),
+        "java": ((), independent("java")),
+        "launch": (("account", "java"), lambda results: order.append("launch") or results["account"] + results["java"]),
+    })
+
+    assert results["launch"] == "accountjava"
+    assert order[-1] == "launch"
+
+
+def test_stage_graph_raises_first_failure_and_skips_dependents():
+    ran = []
+
+    def fail(results):
+        raise RuntimeError("auth failed")
+
+    with pytest.raises(RuntimeError, match="auth failed"):
+        run_stage_graph({
+            "account": ((), fail),
+            "launch": (("account",), lambda results: ran.append("launch")),
+        })
+    assert ran == []
+
+
+def test_microsoft_account_reuses_a_valid_cached_token(monkeypatch):
+    class Unreachable:
+        def __init__(self, *args):
+            raise AssertionError("token refresh should be skipped")
+
+    monkeypatch.setattr(launch_pipeline, "MicrosoftAuthenticator", Unreachable)
+    account = {
+        "type": "microsoft",
+        "username": "Steve",
+        "uuid": "abc",
+        "access_token": "cached",
+        "access_token_expires_at": time.time() + 3600,
+        "refresh_token": "refresh",
+    }
+
+    assert prepare_account(account, "client", "redirect")[1:] == ("Steve", "abc", "cached")
+    account["access_token_expires_at"] = time.time() + 60
+    with pytest.raises(AssertionError, match="refresh should be skipped"):
+        prepare_account(account, "client", "redirect")
+
+
+def test_game_file_check_reports_missing_files_of_the_whole_chain(monkeypatch):
+    import downloader
+
+    chain = [{"id": "fabric-loader-1"}, {"id": "1.20.1"}]
+    monkeypatch.setattr(launch_pipeline, "get_version_inheritance_chain", lambda game_directory, version_id: chain)
+    monkeypatch.setattr(
+        downloader,
+        "collect_missing_game_files",
+        lambda version_json, game_directory, version_id, **kwargs: [{"reason": "缺失", "path": f"{version_id}.jar"}] if version_id == "1.20.1" else [],
+    )
+
+    with pytest.raises(Exception, match="1.20.1: 缺失 1.20.1.jar"):
+        check_game_files("game", "fabric-loader-1")
+
+
+def test_refreshed_account_is_reported_even_when_another_stage_fails(monkeypatch):
+    account = {"id": "1", "type": "microsoft", "refresh_token": "old"}
+    refreshed = {**account, "refresh_token": "new"}
+    account_done = threading.Event()
+
+    def fake_prepare(account, client_id, redirect_uri, status=None):
+        account_done.set()
+        return refreshed, "Steve", "abc", "token"
+
+    def fail_files(game_directory, version_id, hash_workers=0):
+        account_done.wait(timeout=2)
+        raise Exception("files damaged")
+
+    monkeypatch.setattr(launch_pipeline, "prepare_account", fake_prepare)
+    monkeypatch.setattr(launch_pipeline, "check_game_files", fail_files)
+    monkeypatch.setattr(launch_pipeline, "load_launch_plan", lambda game_directory, version_id: {"natives_dir": "", "natives_required": False})
+    monkeypatch.setattr(launch_pipeline, "check_java", lambda *args, **kwargs: 17)
+    reported = []
+
+    stages = launch_pipeline.launch_stages(
+        "java", "1.20.1", "game", account, {}, "client", "redirect", on_account_refreshed=reported.append
+    )
+    with pytest.raises(Exception, match="files damaged"):
+        run_stage_graph(stages)
+    assert reported == [refreshed]
@@ -48,3 +48,134 @@ def test_build_launch_command_includes_runtime_and_memory(tmp_path):
     assert "net.minecraft.client.main.Main" in command
     assert "Steve" in command
     assert os.pathsep.join([str(library_path), str(tmp_path / "versions" / "1.20.1" / "1.20.1.jar")]) in command
+
+
+def test_modern_jvm_arguments_keep_memory_and_gc_settings(tmp_path):
+    write_version(
+        tmp_path,
+        "1.20.1",
+        {
+            "mainClass": "net.minecraft.client.main.Main",
+            "libraries": [],
+            "arguments": {"game": [], "jvm": ["-Djava.library.path=${natives_directory}", "-cp", "${classpath}"]},
+        },
+    )
+    command = build_launch_command(
+        "java", "1.20.1", game_directory=str(tmp_path), username="Steve", max_memory_mb=4096, gc_region_mb=8
+    )
+    assert "-Xmx4096M" in command
+    assert "-XX:G1HeapRegionSize=8M" in command
+    assert sum(item.startswith("-Djava.library.path=") for item in command) == 1
+
+    command = build_launch_command(
+        "java",
+        "1.20.1",
+        game_directory=str(tmp_path),
+        username="Steve",
+        max_memory_mb=4096,
+        min_memory_mb=1024,
+        extra_jvm_args=["-Xmx6G", "-XX:+UseZGC"],
+    )
+    assert "-Xmx4096M" not in command
+    assert "-XX:+UseG1GC" not in command
+    assert command.index("-Xms1024M") < command.index("-Xmx6G")
+
+
+
+def test_launch_plan_is_reused_until_chain_or_libraries_change(tmp_path, monkeypatch):
+    import launcher
+
+    write_version(
+        tmp_path,
+        "1.20.1",
+        {"mainClass": "net.minecraft.client.main.Main", "libraries": [{"name": "com.example:demo:1.0"}]},
+    )
+    write_version(tmp_path, "fabric", {"inheritsFrom": "1.20.1", "mainClass": "net.fabricmc.Main", "libraries": []}, jar=False)
+    first = build_launch_command("java", "fabric", game_directory=str(tmp_path))
+    assert "net.fabricmc.Main" in first
+    assert (tmp_path / ".mcgo" / "launch-plans" / "fabric.json").exists()
+
+    loads = []
+    original_load = launcher._load_json_file
+    monkeypatch.setattr(launcher, "_load_json_file", lambda path: loads.append(path) or original_load(path))
+    assert build_launch_command("java", "fabric", game_directory=str(tmp_path)) == first
+    assert loads == []
+
+    library_path = tmp_path / "libraries" / "com" / "example" / "demo" / "1.0" / "demo-1.0.jar"
+    library_path.parent.mkdir(parents=True)
+    library_path.write_bytes(b"lib")
+    command = build_launch_command("java", "fabric", game_directory=str(tmp_path))
+    assert str(library_path) in command[command.index("-cp") + 1].split(os.pathsep)
+    assert loads
+
+    loads.clear()
+    manifest = tmp_path / "versions" / "fabric" / "fabric.json"
+    manifest.write_text(json.dumps({"id": "fabric", "inheritsFrom": "1.20.1", "mainClass": "net.fabricmc.Other"}), encoding="utf-8")
+    os.utime(manifest, ns=(1, 1))
+    assert "net.fabricmc.Other" in build_launch_command("java", "fabric", game_directory=str(tmp_path))
+
+
+def test_merge_keeps_one_library_per_artifact_and_reports_conflicts(monkeypatch):
+    import launcher
+
+    monkeypatch.setattr(launcher, "_current_os_name", lambda: "linux")
+    vanilla = {
+        "id": "1.20.1",
+        "libraries": [
+            {"name": "org.ow2.asm:asm:9.3"},
+            {"name": "com.google.guava:guava:31.1-jre"},
+            {"name": "org.lwjgl:lwjgl:3.3.1"},
+            {"name": "org.lwjgl:lwjgl:3.3.1:natives-linux", "rules": [{"action": "allow", "os": {"name": "linux"}}]},
+            {"name": "org.lwjgl:lwjgl:3.3.2:natives-linux", "rules": [{"action": "allow", "os": {"name": "windows"}}]},
+        ],
+    }
+    loader = {
+        "id": "forge",
+        "inheritsFrom": "1.20.1",
+        "libraries": [{"name": "org.ow2.asm:asm:9.5"}, {"name": "org.ow2.asm:asm:9.4"}, {"name": "com.google.guava:guava:31.1-jre"}],
+    }
+
+    resolved, conflicts = launcher._merge_version_chain([loader, vanilla])
+
+    assert [library["name"] for library in resolved["libraries"]] == [
+        "org.ow2.asm:asm:9.5",
+        "com.google.guava:guava:31.1-jre",
+        "org.lwjgl:lwjgl:3.3.1",
+        "org.lwjgl:lwjgl:3.3.1:natives-linux",
+    ]
+    assert conflicts == [{"library": "org.ow2.asm:asm", "versions": ["9.3", "9.5", "9.4"], "selected": "9.5", "source": "forge"}]
+
+
+def test_argfile_and_class_data_sharing_follow_java_version(tmp_path):
+    write_version(tmp_path, "1.20.1", {"mainClass": "net.minecraft.client.main.Main", "libraries": []})
+    archive_dir = tmp_path / ".mcgo" / "cds"
+    archive_dir.mkdir(parents=True)
+    (archive_dir / "1.20.1.0000000000000000.jsa").write_bytes(b"old")
+    (archive_dir / "1.20.1-forge.0000000000000000.jsa").write_bytes(b"other")
+
+    command = build_launch_command(
+        "java",
+        "1.20.1",
+        game_directory=str(tmp_path),
+        extra_jvm_args=["-Dpath=C:\\Games\\My Pack"],
+        use_argfile=True,
+        class_data_sharing=True,
+        java_major_version=17,
+    )
+
+    assert command[1].startswith("@") and command[2] == "net.minecraft.client.main.Main"
+    lines = open(command[1][1:], encoding="utf-8").read().splitlines()
+    assert lines[0].startswith("-XX:ArchiveClassesAtExit=")
+    assert '"-Dpath=C:\\\\Games\\\\My Pack"' in lines
+    assert lines[-2] == "-cp"
+    assert sorted(os.listdir(archive_dir)) == ["1.20.1-forge.0000000000000000.jsa"]
+
+    archive_path = lines[0].split("=", 1)[1]
+    open(archive_path, "wb").close()
+    command = build_launch_command("java", "1.20.1", game_directory=str(tmp_path), class_data_sharing=True, java_major_version=17)
+    assert f"-XX:SharedArchiveFile={archive_path}" in command
+    command = build_launch_command("java", "1.20.1", game_directory=str(tmp_path), class_data_sharing=True, java_major_version=21)
+    assert command[1] == "-XX:+AutoCreateSharedArchive" and command[2].startswith("-XX:SharedArchiveFile=")
+    assert not os.path.exists(archive_path)
+    command = build_launch_command("java", "1.20.1", game_directory=str(tmp_path), use_argfile=True, class_data_sharing=True, java_major_version=8)
+    assert "-cp" in command and not any(item.startswith("@") or "SharedArchive" in item for item in command)
@@ -0,0 +1,151 @@
+import asyncio
+import hashlib
+
+import aiohttp
+from aiohttp import web
+
+from mirror_server import MirrorServer
+
+
+def test_mirror_server_fills_misses_once_and_serves_from_store(tmp_path):
+    asset = b"sound data" * 100
+    asset_sha1 = hashlib.sha1(asset).hexdigest()
+    library = b"jar bytes"
+    upstream_hits = []
+
+    async def upstream_handler(request):
+        upstream_hits.append(request.path)
+        if request.path == f"/assets/{asset_sha1[:2]}/{asset_sha1}":
+            return web.Response(body=asset)
+        if request.path == "/maven/com/example/demo/1.0/demo-1.0.jar":
+            return web.Response(body=library)
+        if request.path == "/maven/com/example/demo/1.0/demo-1.0.jar.sha1":
+            return web.Response(text=f"{hashlib.sha1(library).hexdigest()}  demo-1.0.jar")
+        if request.path == "/maven/com/example/bad/1.0/bad-1.0.jar":
+            return web.Response(body=b"tampered")
+        if request.path == "/maven/com/example/bad/1.0/bad-1.0.jar.sha1":
+            return web.Response(text=hashlib.sha1(library).hexdigest())
+        if request.path == "/maven/com/example/unsigned/1.0/unsigned-1.0.jar":
+            return web.Response(body=library)
+        if request.path == "/mc/game/version_manifest.json":
+            return web.json_response({"versions": []})
+        return web.Response(status=404)
+
+    game_directory = tmp_path / ".minecraft"
+    local_library = game_directory / "libraries" / "org" / "local" / "1.0" / "local-1.0.jar"
+    local_library.parent.mkdir(parents=True)
+    local_library.write_bytes(b"local")
+
+    async def scenario():
+        upstream = web.Application()
+        upstream.router.add_get("/{path:.*}", upstream_handler)
+        upstream_runner = web.AppRunner(upstream)
+        await upstream_runner.setup()
+        upstream_site = web.TCPSite(upstream_runner, "127.0.0.1", 0)
+        await upstream_site.start()
+        upstream_port = upstream_site._server.sockets[0].getsockname()[1]
+
+        server = MirrorServer(
+            upstream=f"http://127.0.0.1:{upstream_port}",
+            object_store_dir=str(tmp_path / "objects"),
+            game_directories=[str(game_directory)],
+            cache_dir=str(tmp_path / "mirror"),
+        )
+        offline = MirrorServer(object_store_dir=str(tmp_path / "objects"), fill_on_miss=False)
+        port = await server.start("127.0.0.1", 0)
+        offline_port = await offline.start("127.0.0.1", 0)
+        results = {}
+        try:
+            async with aiohttp.ClientSession() as session:
+                async def fetch(url):
+                    async with session.get(url) as response:
+                        return response.status, await response.read()
+
+                root = f"http://127.0.0.1:{port}"
+                asset_url = f"{root}/assets/{asset_sha1[:2]}/{asset_sha1}"
+                results["assets"] = await asyncio.gather(fetch(asset_url), fetch(asset_url))
+                results["asset_again"] = await fetch(asset_url)
+                results["maven"] = await fetch(f"{root}/maven/com/example/demo/1.0/demo-1.0.jar")
+                results["maven_sha1"] = await fetch(f"{root}/maven/com/example/demo/1.0/demo-1.0.jar.sha1")
+                results["corrupt"] = await fetch(f"{root}/maven/com/example/bad/1.0/bad-1.0.jar")
+                results["unsigned"] = await fetch(f"{root}/maven/com/example/unsigned/1.0/unsigned-1.0.jar")
+                results["local"] = await fetch(f"{root}/maven/org/local/1.0/local-1.0.jar")
+                results["missing"] = await fetch(f"{root}/maven/org/none/1.0/none-1.0.jar")
+                results["traversal"] = await fetch(f"{root}/maven/..%2F..%2Fsecret")
+                results["manifest"] = await fetch(f"{root}/mc/game/version_manifest.json")
+                offline_root = f"http://127.0.0.1:{offline_port}"
+                results["offline_hit"] = await fetch(f"{offline_root}/assets/{asset_sha1[:2]}/{asset_sha1}")
+                results["offline_miss"] = await fetch(f"{offline_root}/assets/00/{'0' * 40}")
+        finally:
+            await server.stop()
+            await offline.stop()
+            await upstream_runner.cleanup()
+        return results, server.stats
+
+    results, stats = asyncio.run(scenario())
+
+    assert results["assets"] == [(200, asset), (200, asset)]
+    assert results["asset_again"] == (200, asset)
+    assert upstream_hits.count(f"/assets/{asset_sha1[:2]}/{asset_sha1}") == 1
+    assert (tmp_path / "objects" / asset_sha1[:2] / asset_sha1).read_bytes() == asset
+    assert results["maven"] == (200, library)
+    assert (tmp_path / "mirror" / "maven" / "com" / "example" / "demo" / "1.0" / "demo-1.0.jar").exists()
+    assert results["maven_sha1"][1].decode().startswith(hashlib.sha1(library).hexdigest())
+    assert results["corrupt"][0] == 404
+    assert results["unsigned"][0] == 404
+    assert not (tmp_path / "mirror" / "maven" / "com" / "example" / "bad" / "1.0" / "bad-1.0.jar").exists()
+    assert results["local"] == (200, b"local")
+    assert results["missing"][0] == 404
+    assert results["traversal"][0] == 404
+    assert results["manifest"][0] == 200
+    assert results["offline_hit"] == (200, asset)
+    assert results["offline_miss"][0] == 404
+    assert stats["filled"] == 2
+
+
+def test_mirror_server_rejects_corrupt_local_assets_and_oversized_passthrough(tmp_path, monkeypatch):
+    import mirror_server
+
+    asset = b"sound data"
+    asset_sha1 = hashlib.sha1(asset).hexdigest()
+    corrupt = tmp_path / ".minecraft" / "assets" / "objects" / asset_sha1[:2] / asset_sha1
+    corrupt.parent.mkdir(parents=True)
+    corrupt.write_bytes(b"corrupt")
+    monkeypatch.setattr(mirror_server, "PASSTHROUGH_LIMIT", 16)
+
+    async def upstream_handler(request):
+        if request.path == f"/assets/{asset_sha1[:2]}/{asset_sha1}":
+            return web.Response(body=asset)
+        return web.Response(body=b"x" * 64)
+
+    async def scenario():
+        upstream = web.Application()
+        upstream.router.add_get("/{path:.*}", upstream_handler)
+        upstream_runner = web.AppRunner(upstream)
+        await upstream_runner.setup()
+        upstream_site = web.TCPSite(upstream_runner, "127.0.0.1", 0)
+        await upstream_site.start()
+        upstream_port = upstream_site._server.sockets[0].getsockname()[1]
+        server = MirrorServer(
+            upstream=f"http://127.0.0.1:{upstream_port}",
+            object_store_dir=str(tmp_path / "objects"),
+            game_directories=[str(tmp_path / ".minecraft")],
+            cache_dir=str(tmp_path / "mirror"),
+        )
+        port = await server.start("127.0.0.1", 0)
+        try:
+            async with aiohttp.ClientSession() as session:
+                async with session.get(f"http://127.0.0.1:{port}/assets/{asset_sha1[:2]}/{asset_sha1}") as response:
+                    asset_result = response.status, await response.read()
+                async with session.get(f"http://127.0.0.1:{port}/mc/game/version_manifest.json") as response:
+                    passthrough_status = response.status
+        finally:
+            await server.stop()
+            await upstream_runner.cleanup()
+        return asset_result, passthrough_status
+
+    asset_result, passthrough_status = asyncio.run(scenario())
+
+    assert asset_result == (200, asset)
+    assert (tmp_path / "objects" / asset_sha1[:2] / asset_sha1).read_bytes() == asset
+    assert passthrough_status == 502
@@ -0,0 +1,47 @@
+import json
+import os
+
+import launcher
+from launcher import get_version_inheritance_chain, get_version_json
+from version_cache import VersionMetadataCache
+from version_utils import detect_version_type
+
+
+def write_manifest(root, version_id, data):
+    version_dir = root / "versions" / version_id
+    version_dir.mkdir(parents=True, exist_ok=True)
+    path = version_dir / f"{version_id}.json"
+    path.write_text(json.dumps({"id": version_id, **data}), encoding="utf-8")
+    return path
+
+
+def test_version_json_is_parsed_once_until_the_manifest_changes(tmp_path, monkeypatch):
+    write_manifest(tmp_path, "1.20.1", {"mainClass": "Main"})
+    path = write_manifest(tmp_path, "fabric-loader-1", {"inheritsFrom": "1.20.1", "mainClass": "net.fabricmc.Main"})
+    loads = []
+    original_load = launcher._load_json_file
+    monkeypatch.setattr(launcher, "_load_json_file", lambda item: loads.append(item) or original_load(item))
+
+    assert [item["id"] for item in get_version_inheritance_chain(str(tmp_path), "fabric-loader-1")] == ["fabric-loader-1", "1.20.1"]
+    assert get_version_json(str(tmp_path), "fabric-loader-1")["mainClass"] == "net.fabricmc.Main"
+    assert detect_version_type(str(tmp_path), "fabric-loader-1") == detect_version_type(str(tmp_path), "fabric-loader-1") == "Fabric"
+    assert len(loads) == 2
+
+    path.write_text(json.dumps({"id": "fabric-loader-1", "mainClass": "Other"}), encoding="utf-8")
+    os.utime(path, ns=(1, 1))
+    assert [item["id"] for item in get_version_inheritance_chain(str(tmp_path), "fabric-loader-1")] == ["fabric-loader-1"]
+    assert len(loads) == 3
+
+
+def test_version_metadata_cache_evicts_least_recently_used(tmp_path):
+    cache = VersionMetadataCache(capacity=2)
+    calls = []
+
+    def compute(version_id):
+        return lambda: calls.append(version_id) or version_id
+
+    for version_id in ("a", "b", "a", "c", "b"):
+        cache.get("kind", str(tmp_path), version_id, compute(version_id))
+
+    assert calls == ["a", "b", "c", "b"]
+    assert cache.stats() == {"entries": 2, "hits": 1, "misses": 4}
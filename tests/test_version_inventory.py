@@ -0,0 +1,41 @@
+import json
+import shutil
+
+import version_inventory
+from version_inventory import scan_version_inventory
+
+
+def write_version(root, version_id, data):
+    version_dir = root / "versions" / version_id
+    version_dir.mkdir(parents=True, exist_ok=True)
+    (version_dir / f"{version_id}.json").write_text(json.dumps({"id": version_id, **data}), encoding="utf-8")
+    (version_dir / f"{version_id}.jar").write_bytes(b"jar")
+
+
+def test_inventory_only_describes_new_or_changed_versions(tmp_path, monkeypatch):
+    write_version(tmp_path, "1.20.1", {"mainClass": "Main", "assetIndex": {"id": "1.20"}})
+    write_version(tmp_path, "fabric-loader-0.15-1.20.1", {"inheritsFrom": "1.20.1", "mainClass": "net.fabricmc.Main"})
+    (tmp_path / "versions" / "broken").mkdir()
+    described = []
+    original_describe = version_inventory.VersionInventory._describe
+    monkeypatch.setattr(
+        version_inventory.VersionInventory,
+        "_describe",
+        lambda self, version_id, fingerprint: described.append(version_id) or original_describe(self, version_id, fingerprint),
+    )
+
+    inventory = scan_version_inventory(str(tmp_path))
+    assert list(inventory) == ["1.20.1", "fabric-loader-0.15-1.20.1"]
+    assert inventory["fabric-loader-0.15-1.20.1"]["type"] == "Fabric"
+    assert inventory["fabric-loader-0.15-1.20.1"]["base_version"] == "1.20.1"
+    assert inventory["1.20.1"]["jar_size"] == 3
+    assert sorted(described) == ["1.20.1", "broken", "fabric-loader-0.15-1.20.1"]
+
+    described.clear()
+    assert scan_version_inventory(str(tmp_path)) == inventory
+    assert described == []
+
+    (tmp_path / "versions" / "fabric-loader-0.15-1.20.1" / "mods").mkdir()
+    shutil.rmtree(tmp_path / "versions" / "1.20.1")
+    assert list(scan_version_inventory(str(tmp_path))) == ["fabric-loader-0.15-1.20.1"]
+    assert described == ["fabric-loader-0.15-1.20.1"]
@@ -63,6 +63,7 @@ from qfluentwidgets.components.navigation.navigation_panel import NavigationDisp
 from app_format import format_bytes, format_resource_hit_label
 from app_settings import (
     DOWNLOAD_PRESETS,
+    AUTO_GC_STRATEGY,
     GC_STRATEGIES,
     LOG_PATH,
     VERSION_ICON_LABELS,
@@ -83,13 +84,15 @@ from app_settings import (
     system_memory_mb,
 )
 from app_media import BackgroundMusicController
+from bandwidth import BANDWIDTH_LIMITER
 from external_auth import (
     authlib_injector_args,
     normalize_auth_server,
 )
 from file_utils import sanitize_filename
 from java_utils import get_java_version
-from launcher import build_launch_command, get_local_versions, get_version_inheritance_chain, infer_required_java_version, get_version_json
+from jvm_tuning import apply_auto_memory, auto_memory_options
+from launcher import build_launch_command, get_local_versions, infer_required_java_version, get_version_json
 from log_utils import get_logger, redact_mapping
 from install_services import (
     INSTALL_TYPE_LABELS,
@@ -119,6 +122,7 @@ from version_utils import (
     version_matches_category,
     version_settings_entry,
     version_type_label,
+    version_type_matches_category,
 )
 
 logger = get_logger(__name__)
@@ -157,6 +161,8 @@ class LauncherWindow(FluentWindow):
         self.external_auth_worker = None
         self.launch_thread = None
         self.launch_worker = None
+        self.deferred_asset_thread = None
+        self.deferred_asset_worker = None
         self.nat_thread = None
         self.nat_worker = None
         self.p2p_tunnel = None
@@ -181,6 +187,7 @@ class LauncherWindow(FluentWindow):
         self.delete_account_index_ids = []
         self.version_display_ids = []
         self.version_list_ids = []
+        self.version_inventory = {}
         self.resource_version_ids = []
         self.selected_account_id = config.get("ACCOUNTS", "selected_account_id", fallback="")
         self.setWindowTitle("McGo")
@@ -223,6 +230,10 @@ class LauncherWindow(FluentWindow):
         if self.nat_thread and self.nat_thread.isRunning():
             self.nat_thread.quit()
             self.nat_thread.wait(3500)
+        if self.deferred_asset_thread and self.deferred_asset_thread.isRunning():
+            self.deferred_asset_worker.request_stop()
+            self.deferred_asset_thread.quit()
+            self.deferred_asset_thread.wait(3500)
         super().closeEvent(event)
 
     def animate_card_group(self, widgets):
@@ -293,6 +304,8 @@ class LauncherWindow(FluentWindow):
         self.download_speed_limit_input.setSingleStep(256)
         self.download_speed_limit_input.setSuffix(" KB/s")
         self.download_speed_limit_input.setValue(config.getint("DOWNLOAD", "speed_limit_kbps", fallback=0))
+        self.download_speed_limit_input.valueChanged.connect(self.apply_live_speed_limit)
+        self.apply_live_speed_limit(self.download_speed_limit_input.value())
         self.download_cache_combo = NativeComboBox()
         self.download_cache_combo.addItems(["reuse", "network_only"])
         self.download_cache_combo.setCurrentText(config.get("DOWNLOAD", "cache_strategy", fallback="reuse"))
@@ -437,6 +450,8 @@ class LauncherWindow(FluentWindow):
         self.version_custom_dir_input = LineEdit()
         self.version_custom_dir_input.setPlaceholderText("留空则使用默认游戏目录或 versions/<版本名> 资源隔离目录")
         self.version_isolation_check = CheckBox("当前版本单独使用 versions/<版本名> 资源隔离目录")
+        self.version_argfile_check = CheckBox("通过参数文件传递 JVM 参数（@argfile，需要 Java 9+）")
+        self.version_cds_check = CheckBox("启用类数据共享缓存加速启动（AppCDS，需要 Java 13+）")
         self.version_favorite_check = CheckBox("收藏当前版本")
         self.version_hidden_check = CheckBox("隐藏当前版本")
         self.version_icon_combo = NativeComboBox()
@@ -475,6 +490,10 @@ class LauncherWindow(FluentWindow):
         self.version_type_combo.currentTextChanged.connect(lambda _: self.log("版本类型已更改，点击“刷新远程版本”重新加载列表。"))
         self.download_fabric_api_check = CheckBox("同时安装 Fabric API")
         self.download_fabric_api_check.stateChanged.connect(lambda _: self.update_download_addon_controls())
+        self.download_fast_launch_check = CheckBox("快速首次启动（声音和其他语言文件在游戏启动后后台下载）")
+        self.download_fast_launch_check.setChecked(config.getboolean("DOWNLOAD", "fast_first_launch", fallback=False))
+        self.download_auto_concurrency_check = CheckBox("自动调节线程数（线程设置作为上限）")
+        self.download_auto_concurrency_check.setChecked(config.getboolean("DOWNLOAD", "auto_concurrency", fallback=True))
         self.download_addon_hint_label = CaptionLabel("可在下载原版后自动继续安装；Fabric API 仅在 Fabric 一起安装时可用。")
         self.download_warning_label = CaptionLabel("")
         self.resource_query_input = LineEdit()
@@ -962,6 +981,8 @@ class LauncherWindow(FluentWindow):
         self.version_jvm_args_row = self.add_labeled_control(launch_settings_layout, "额外 JVM 参数", self.version_jvm_args_input)
         self.version_game_args_row = self.add_labeled_control(launch_settings_layout, "额外游戏参数", self.version_game_args_input)
         self.version_pre_launch_row = self.add_labeled_control(launch_settings_layout, "启动前命令", self.version_pre_launch_input)
+        launch_settings_layout.addWidget(self.version_argfile_check)
+        launch_settings_layout.addWidget(self.version_cds_check)
         launch_settings_layout.addWidget(self.version_isolation_check)
         self.version_custom_dir_row = self.add_labeled_control(launch_settings_layout, "自定义运行目录", self.version_custom_dir_input)
 
@@ -1160,6 +1181,8 @@ class LauncherWindow(FluentWindow):
             self.download_tuning_rows[key] = container
         download_layout.addLayout(download_tuning_row)
         self.download_cache_row = self.add_labeled_control(download_layout, "缓存策略", self.download_cache_combo)
+        download_layout.addWidget(self.download_auto_concurrency_check)
+        download_layout.addWidget(self.download_fast_launch_check)
         download_layout.addWidget(self.download_addon_hint_label)
         download_layout.addWidget(self.download_warning_label)
         row = QHBoxLayout()
@@ -1679,6 +1702,12 @@ class LauncherWindow(FluentWindow):
         self.install_log.append(message)
         self.motion.pulse_widget(self.install_log.viewport(), duration=220, start_opacity=0.66, throttle_key="install_log", min_interval=0.12)
 
+    def apply_live_speed_limit(self, value):
+        # Running transfers pick the new budget up on their next chunk; queued tasks read it from config.
+        config["DOWNLOAD"]["speed_limit_kbps"] = str(value)
+        options = read_download_options()
+        BANDWIDTH_LIMITER.configure(options["speed_limit_kbps"] * 1024, options["background_speed_limit_kbps"] * 1024)
+
     def apply_download_preset(self, preset_name):
         preset = DOWNLOAD_PRESETS.get(preset_name)
         if not preset:
@@ -2105,6 +2134,8 @@ class LauncherWindow(FluentWindow):
             "version_gc_row",
             "version_game_args_row",
             "version_pre_launch_row",
+            "version_argfile_check",
+            "version_cds_check",
             "version_custom_dir_row",
         ):
             if hasattr(self, name):
@@ -2132,7 +2163,25 @@ class LauncherWindow(FluentWindow):
         if manual:
             self.version_memory_label.setText(f"最大内存：{value} MB")
         else:
-            self.version_memory_label.setText(f"最大内存：自动（建议 {recommended_memory_mb()} MB）")
+            version_id = self.current_selected_version()
+            if version_id:
+                tuned = self.auto_memory_for_version(version_id, self.java_combo.currentText().strip())
+                self.version_memory_label.setText(f"最大内存：自动（建议 {tuned['max_memory_mb']} MB，{tuned['reason']}）")
+            else:
+                self.version_memory_label.setText(f"最大内存：自动（建议 {recommended_memory_mb()} MB）")
+
+    def auto_memory_for_version(self, version_id, java_path=""):
+        return auto_memory_options(
+            self.current_game_dir(),
+            version_id,
+            mods_directory_for_version(
+                self.current_game_dir(),
+                self.version_settings,
+                version_id,
+                global_isolation=self.resource_isolation_check.isChecked(),
+            ),
+            java_major=self.java_versions.get(java_path),
+        )
 
     def on_manual_memory_changed(self, *_):
         if self.version_manual_memory_check.isChecked() and self.version_memory_slider.value() < 1024:
@@ -2164,6 +2213,10 @@ class LauncherWindow(FluentWindow):
     def base_version_for(self, version_id):
         return normalize_minecraft_version_for_api(self.current_game_dir(), version_id)
 
+    def inventory_version_type(self, version_id):
+        entry = self.version_inventory.get(version_id, {})
+        return entry.get("type") or version_type_label(self.current_game_dir(), version_id)
+
     def version_matches_category(self, version_id, category):
         return version_matches_category(self.current_game_dir(), version_id, category)
 
@@ -2270,8 +2323,10 @@ class LauncherWindow(FluentWindow):
         self.version_memory_slider.setValue(max(1024, min(self.version_memory_slider.maximum(), max_memory or recommended_memory_mb())))
         self.version_window_width_input.setValue(max(0, int(entry.get("window_width", 0) or 0)))
         self.version_window_height_input.setValue(max(0, int(entry.get("window_height", 0) or 0)))
-        gc_strategy = entry.get("gc_strategy", "G1GC")
-        self.version_gc_combo.setCurrentText(gc_strategy if gc_strategy in GC_STRATEGIES else "G1GC")
+        gc_strategy = entry.get("gc_strategy", AUTO_GC_STRATEGY)
+        self.version_gc_combo.setCurrentText(gc_strategy if gc_strategy in GC_STRATEGIES else AUTO_GC_STRATEGY)
+        self.version_argfile_check.setChecked(bool(entry.get("use_argfile", False)))
+        self.version_cds_check.setChecked(bool(entry.get("class_data_sharing", False)))
         self.version_custom_dir_input.setText(entry.get("runtime_directory", ""))
         self.version_favorite_check.setChecked(bool(entry.get("favorite", False)))
         self.version_hidden_check.setChecked(bool(entry.get("hidden", False)))
@@ -2356,6 +2411,8 @@ class LauncherWindow(FluentWindow):
         entry["window_width"] = self.version_window_width_input.value()
         entry["window_height"] = self.version_window_height_input.value()
         entry["gc_strategy"] = self.version_gc_combo.currentText().strip()
+        entry["use_argfile"] = self.version_argfile_check.isChecked()
+        entry["class_data_sharing"] = self.version_cds_check.isChecked()
         entry["runtime_directory"] = self.version_custom_dir_input.text().strip()
         entry["use_isolated_directory"] = self.version_isolation_check.isChecked()
         entry["favorite"] = self.version_favorite_check.isChecked()
@@ -2541,8 +2598,7 @@ class LauncherWindow(FluentWindow):
             global_isolation=self.resource_isolation_check.isChecked(),
         )
         if not launch_options.get("manual_memory"):
-            launch_options["max_memory_mb"] = recommended_memory_mb()
-            launch_options["min_memory_mb"] = 0
+            apply_auto_memory(launch_options, self.auto_memory_for_version(version_id, java_path))
         try:
             extra_jvm_args = list(launch_options["extra_jvm_args"])
             if account.get("type") == "external":
@@ -2562,6 +2618,9 @@ class LauncherWindow(FluentWindow):
                 window_width=launch_options.get("window_width", 0),
                 window_height=launch_options.get("window_height", 0),
                 gc_strategy=launch_options.get("gc_strategy", "G1GC"),
+                gc_region_mb=launch_options.get("gc_region_mb", 0),
+                use_argfile=launch_options.get("use_argfile", False),
+                class_data_sharing=launch_options.get("class_data_sharing", False),
             )
         except Exception as exc:
             self.show_warning("导出失败", str(exc))
@@ -2892,7 +2951,14 @@ class LauncherWindow(FluentWindow):
             self.update_download_queue_label()
             return
         logger.info("Dispatching next queued download task: queue_size=%d", len(self.download_task_queue))
-        self.start_download_task(self.download_task_queue.popleft())
+        task = self.download_task_queue.popleft()
+        if task.batch_key:
+            batch = [task, *(item for item in self.download_task_queue if item.batch_key == task.batch_key)]
+            if len(batch) > 1:
+                for item in batch[1:]:
+                    self.download_task_queue.remove(item)
+                task = self._batch_download_task(batch)
+        self.start_download_task(task)
 
     def update_download_queue_label(self):
         if not hasattr(self, "download_queue_label"):
@@ -2996,8 +3062,9 @@ class LauncherWindow(FluentWindow):
             "download_preset_combo",
             "download_core_threads_input",
             "download_asset_threads_input",
-            "download_speed_limit_input",
             "download_cache_combo",
+            "download_auto_concurrency_check",
+            "download_fast_launch_check",
         ):
             if hasattr(self, name):
                 getattr(self, name).setEnabled(not running)
@@ -3615,6 +3682,7 @@ class LauncherWindow(FluentWindow):
 
         if task == "local_versions":
             versions = payload.get("versions", [])
+            self.version_inventory = payload.get("inventory", {})
             show_feedback = self.should_show_scan_feedback(task)
             previous_version = self.current_selected_version()
             pending_version = self.pending_local_version_selection
@@ -3629,7 +3697,7 @@ class LauncherWindow(FluentWindow):
                 elif current_category == "收藏":
                     include = favorite and not hidden
                 else:
-                    include = not hidden and self.version_matches_category(version, current_category)
+                    include = not hidden and version_type_matches_category(self.inventory_version_type(version), current_category)
                 if include:
                     filtered.append(version)
             filtered.sort(key=lambda item: (not self.version_settings_entry(item).get("favorite", False), item.lower()))
@@ -3652,8 +3720,9 @@ class LauncherWindow(FluentWindow):
                     badges.append("收藏")
                 if entry.get("hidden"):
                     badges.append("隐藏")
-                version_type = version_type_label(self.current_game_dir(), version)
-                base_version = self.base_version_for(version)
+                inventory_entry = self.version_inventory.get(version, {})
+                version_type = inventory_entry.get("type") or version_type_label(self.current_game_dir(), version)
+                base_version = inventory_entry.get("base_version") or self.base_version_for(version)
                 badge_text = f" [{' / '.join(badges)}]" if badges else ""
                 item = QListWidgetItem(
                     f"{self.version_display_name(version)}{badge_text}\n"
@@ -4000,6 +4069,8 @@ class LauncherWindow(FluentWindow):
         config["DOWNLOAD"]["max_asset_threads"] = str(self.download_asset_threads_input.value())
         config["DOWNLOAD"]["speed_limit_kbps"] = str(self.download_speed_limit_input.value())
         config["DOWNLOAD"]["cache_strategy"] = self.download_cache_combo.currentText()
+        config["DOWNLOAD"]["auto_concurrency"] = str(self.download_auto_concurrency_check.isChecked())
+        config["DOWNLOAD"]["fast_first_launch"] = str(self.download_fast_launch_check.isChecked())
         config["AUTH"]["auto_open_browser"] = str(self.auto_open_browser_check.isChecked())
         config["GAME"]["directory"] = self.current_game_dir()
         config["GAME"]["enable_resource_isolation"] = str(self.resource_isolation_check.isChecked())
@@ -4087,41 +4158,6 @@ class LauncherWindow(FluentWindow):
         self.log(f"Microsoft 登录失败：{message}")
         self.show_warning("登录失败", message)
 
-    def validate_launch_files(self, version):
-        from downloader import collect_missing_game_files
-
-        game_dir = self.current_game_dir()
-        chain = get_version_inheritance_chain(game_dir, version)
-        if not chain:
-            return [f"未找到版本清单：{version}"]
-
-        issues = []
-        for version_json in reversed(chain):
-            version_id = version_json.get("id", version)
-            try:
-                missing = collect_missing_game_files(version_json, game_dir, version_id, include_assets=True)
-            except Exception as exc:
-                issues.append(f"{version_id}: 完整性检查失败：{exc}")
-                continue
-            for item in missing[:20]:
-                issues.append(f"{version_id}: {item.get('reason', '缺失')} {item.get('path') or item.get('label')}")
-            if len(missing) > 20:
-                issues.append(f"{version_id}: 还有 {len(missing) - 20} 个文件未列出")
-
-            has_native_library = any(
-                any(str(key).startswith("natives-") for key in library.get("downloads", {}).get("classifiers", {}).keys())
-                for library in version_json.get("libraries", [])
-                if isinstance(library, dict)
-            )
-            natives_dir = os.path.join(game_dir, "versions", version_id, f"{version_id}-natives")
-            has_extracted_native = False
-            if os.path.isdir(natives_dir):
-                with os.scandir(natives_dir) as entries:
-                    has_extracted_native = any(entries)
-            if has_native_library and not has_extracted_native:
-                issues.append(f"{version_id}: natives 未解压，请先使用版本补全/修复")
-        return issues
-
     def launch_game(self):
         java_path = self.java_combo.currentText().strip()
         version = self.current_selected_version()
@@ -4147,25 +4183,6 @@ class LauncherWindow(FluentWindow):
             self.show_warning("缺少版本", "请先选择本地游戏版本。")
             return
 
-        required_java = self.get_required_java_version(version)
-        selected_java_major = self.java_versions.get(java_path)
-        if required_java and selected_java_major and selected_java_major < required_java:
-            self.show_warning(
-                "Java 版本不兼容",
-                f"Minecraft {version} 至少需要 Java {required_java}，当前选择的是 Java {selected_java_major}。",
-            )
-            return
-
-        integrity_issues = self.validate_launch_files(version)
-        if integrity_issues:
-            preview = "\n".join(integrity_issues[:8])
-            if len(integrity_issues) > 8:
-                preview += f"\n还有 {len(integrity_issues) - 8} 项未列出。"
-            self.show_warning("启动前检查未通过", f"{preview}\n\n请先在版本维护中执行补全/修复。")
-            self.launch_status_label.setText("启动前检查未通过，请先修复版本文件")
-            self.log(f"启动前检查未通过：{preview}")
-            return
-
         launch_options = launch_options_for_version(
             self.current_game_dir(),
             self.version_settings,
@@ -4173,8 +4190,9 @@ class LauncherWindow(FluentWindow):
             global_isolation=self.resource_isolation_check.isChecked(),
         )
         if not launch_options.get("manual_memory"):
-            launch_options["max_memory_mb"] = recommended_memory_mb()
-            launch_options["min_memory_mb"] = 0
+            tuned = self.auto_memory_for_version(version, java_path)
+            apply_auto_memory(launch_options, tuned)
+            self.log(f"自动内存：-Xmx{tuned['max_memory_mb']}M，{launch_options['gc_strategy']}（{tuned['reason']}）")
         if self.launch_thread and self.launch_thread.isRunning():
             self.show_warning("启动进行中", "当前已有启动任务在运行。")
             return
@@ -4197,12 +4215,15 @@ class LauncherWindow(FluentWindow):
             launch_options,
             client_id,
             redirect_uri,
+            java_major=self.java_versions.get(java_path),
+            hash_workers=read_download_options()["hash_workers"],
         )
         self.launch_worker.moveToThread(self.launch_thread)
         self.launch_thread.started.connect(self.launch_worker.run)
         self.launch_worker.status.connect(self.on_launch_status)
         self.launch_worker.stage.connect(self.on_launch_stage)
         self.launch_worker.progress.connect(self.on_launch_progress)
+        self.launch_worker.account_refreshed.connect(self.on_launch_account_refreshed)
         self.launch_worker.finished.connect(self.on_launch_finished)
         self.launch_worker.failed.connect(self.on_launch_failed)
         self.launch_worker.finished.connect(self.launch_thread.quit)
@@ -4232,6 +4253,11 @@ class LauncherWindow(FluentWindow):
         self.motion.pulse_widget(self.install_status_label, duration=210, start_opacity=0.5, throttle_key="install_status_from_download", min_interval=0.12)
         self.log_install(message)
 
+    def on_launch_account_refreshed(self, account):
+        # Refreshed tokens replace the stored ones right away; a failing launch must not lose them.
+        if account.get("id"):
+            self.upsert_account(account)
+
     def on_launch_finished(self, payload):
         logger.info("Launch finished in UI: payload=%s", redact_mapping(payload))
         self.set_launch_running(False)
@@ -4245,7 +4271,38 @@ class LauncherWindow(FluentWindow):
         save_version_settings(self.version_settings)
         self.on_java_selected(self.java_combo.currentText())
         self.log(f"正在使用 {account_label(account)} 启动 Minecraft {version}...")
+        if payload.get("pid"):
+            self.log(f"游戏进程 PID：{payload['pid']}，退出后运行记录保存在 .mcgo/game-sessions.json")
         self.show_success("正在启动", f"Minecraft {version} 已开始启动。")
+        self.start_deferred_asset_download(version)
+
+    def start_deferred_asset_download(self, version):
+        from downloader import pending_deferred_assets
+
+        game_dir = self.current_game_dir()
+        if not pending_deferred_assets(game_dir):
+            return
+        if self.deferred_asset_thread and self.deferred_asset_thread.isRunning():
+            return
+        from install_workers import DeferredAssetWorker
+
+        self.deferred_asset_thread = QThread()
+        self.deferred_asset_worker = DeferredAssetWorker(
+            version,
+            self.mirror_combo.currentText(),
+            game_dir,
+            download_options=read_download_options(),
+        )
+        self.deferred_asset_worker.moveToThread(self.deferred_asset_thread)
+        self.deferred_asset_thread.started.connect(self.deferred_asset_worker.run)
+        self.deferred_asset_worker.status.connect(self.log)
+        self.deferred_asset_worker.finished.connect(
+            lambda payload: payload.get("objects") and self.log(f"后台资源文件下载完成：{payload['objects']} 个")
+        )
+        self.deferred_asset_worker.failed.connect(lambda message: self.log(f"后台资源文件下载失败：{message}"))
+        self.deferred_asset_worker.finished.connect(self.deferred_asset_thread.quit)
+        self.deferred_asset_worker.failed.connect(self.deferred_asset_thread.quit)
+        self.deferred_asset_thread.start()
 
     def on_launch_failed(self, message):
         logger.warning("Launch failed in UI: %s", message)
@@ -4299,6 +4356,10 @@ class LauncherWindow(FluentWindow):
                 java_path,
             ),
         )
+        if not auto_install_types:
+            # Plain downloads waiting in the queue for the same directory run as one batch.
+            task.batch_key = ("download", mirror_key, os.path.normcase(os.path.abspath(game_dir)))
+            task.batch_item = version
         self.queue_download_task(task)
 
     def _start_download_task(self, version, mirror_key, game_dir, auto_install_types, java_path):
@@ -4345,6 +4406,49 @@ class LauncherWindow(FluentWindow):
         self.download_worker.failed.connect(self.download_thread.quit)
         self.download_thread.start()
 
+    def _batch_download_task(self, tasks):
+        _, mirror_key, game_dir = tasks[0].batch_key
+        versions = list(dict.fromkeys(task.batch_item for task in tasks))
+        logger.info("Merging queued downloads into one batch: versions=%s game_dir=%s", versions, game_dir)
+        return DownloadTask(
+            "download",
+            f"批量下载 {len(versions)} 个版本：{'、'.join(versions)}",
+            lambda: self._start_batch_download_task(versions, mirror_key, game_dir),
+        )
+
+    def _start_batch_download_task(self, versions, mirror_key, game_dir):
+        logger.info(
+            "Batch download task starting from UI queue: versions=%s mirror=%s game_dir=%s",
+            versions,
+            mirror_key,
+            game_dir,
+        )
+        self.progress_bar.setValue(0)
+        self.install_log.clear()
+        self.install_status_label.setText("当前任务为批量下载原版")
+        self.install_metrics_label.setText("共用的依赖库和资源文件只会下载一次")
+        self.download_metrics_label.setText(f"准备批量下载 {len(versions)} 个版本...")
+        self.set_download_running(True)
+        from install_workers import BatchDownloadWorker
+
+        self.download_thread = QThread()
+        self.download_worker = BatchDownloadWorker(
+            versions,
+            mirror_key,
+            game_dir,
+            download_options=read_download_options(),
+        )
+        self.download_worker.moveToThread(self.download_thread)
+        self.download_thread.started.connect(self.download_worker.run)
+        self.download_worker.progress.connect(self.progress_bar.setValue)
+        self.download_worker.metrics.connect(self.update_download_metrics)
+        self.download_worker.status.connect(self.log)
+        self.download_worker.finished.connect(self.on_download_finished)
+        self.download_worker.failed.connect(self.on_download_failed)
+        self.download_worker.finished.connect(self.download_thread.quit)
+        self.download_worker.failed.connect(self.download_thread.quit)
+        self.download_thread.start()
+
     def start_install(self):
         minecraft_version = self.install_version_combo.currentText().strip()
         install_type = self.install_type_combo.currentText().strip()
@@ -4741,7 +4845,7 @@ class LauncherWindow(FluentWindow):
             else:
                 self.show_success("下载和安装完成", f"Minecraft {version} 已下载，并完成附加安装。")
         else:
-            self.refresh_local_versions(show_feedback=False, select_version=version)
+            self.refresh_local_versions(show_feedback=False, select_version=payload.get("versions", [version])[-1])
             self.download_metrics_label.setText("下载完成")
             self.install_status_label.setText("本次未执行附加安装")
             self.install_metrics_label.setText("如需 Fabric / Forge / NeoForge / OptiFine，可切到“安装扩展”")
@@ -0,0 +1,86 @@
+import os
+import threading
+
+from log_utils import get_logger
+from storage_utils import load_json_file, save_json_atomic
+
+
+INDEX_FILE = os.path.join(".mcgo", "verify-index.json")
+INDEX_VERSION = 1
+logger = get_logger(__name__)
+
+
+def _stat_signature(stat):
+    return [int(stat.st_size), int(stat.st_mtime_ns), int(stat.st_ino)]
+
+
+class VerifyIndex:
+    """Per game directory record of files whose SHA1 was verified, keyed by relative path.
+
+    A file whose size, mtime_ns and inode still match the recorded signature is trusted
+    without being read again. With deep=True every lookup misses so files are re-hashed,
+    while successful hashes still refresh the index.
+    """
+
+    def __init__(self, game_directory, deep=False):
+        self.root = os.path.abspath(game_directory)
+        self.path = os.path.join(self.root, INDEX_FILE)
+        self.deep = deep
+        self._entries = {}
+        self._dirty = False
+        self._lock = threading.Lock()
+        self._load()
+
+    def _load(self):
+        try:
+            data = load_json_file(self.path, {})
+        except Exception as exc:
+            logger.warning("Ignoring unreadable verify index: path=%s error=%s", self.path, exc)
+            return
+        if isinstance(data, dict) and data.get("version") == INDEX_VERSION and isinstance(data.get("files"), dict):
+            self._entries = data["files"]
+
+    def _key(self, path):
+        relative = os.path.relpath(os.path.abspath(path), self.root)
+        if relative.startswith(os.pardir):
+            return None
+        return relative.replace(os.sep, "/")
+
+    def is_verified(self, path, stat, sha1):
+        if self.deep or not sha1:
+            return False
+        key = self._key(path)
+        entry = self._entries.get(key) if key else None
+        if not entry or len(entry) != 4:
+            return False
+        return entry[:3] == _stat_signature(stat) and entry[3] == sha1.lower()
+
+    def record(self, path, sha1, stat=None):
+        key = self._key(path)
+        if not key or not sha1:
+            return
+        if stat is None:
+            try:
+                stat = os.stat(path)
+            except OSError:
+                return
+        with self._lock:
+            self._entries[key] = [*_stat_signature(stat), sha1.lower()]
+            self._dirty = True
+
+    def discard(self, path):
+        key = self._key(path)
+        with self._lock:
+            if key and self._entries.pop(key, None) is not None:
+                self._dirty = True
+
+    def save(self):
+        with self._lock:
+            if not self._dirty:
+                return
+            snapshot = {"version": INDEX_VERSION, "files": dict(self._entries)}
+            self._dirty = False
+        try:
+            save_json_atomic(self.path, snapshot, indent=None)
+        except OSError as exc:
+            logger.warning("Failed to save verify index: path=%s error=%s", self.path, exc)
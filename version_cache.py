@@ -0,0 +1,111 @@
+import os
+import threading
+from collections import OrderedDict
+
+from log_utils import get_logger
+
+
+VERSION_CACHE_CAPACITY = 512
+logger = get_logger(__name__)
+
+
+def _mtime_ns(path):
+    try:
+        return int(os.stat(path).st_mtime_ns)
+    except OSError:
+        return None
+
+
+def version_signature(game_directory, version_id):
+    """Cheap fingerprint of versions/<id>/ that changes whenever its manifest may have changed."""
+    version_directory = os.path.join(game_directory, "versions", version_id)
+    directory_mtime = _mtime_ns(version_directory)
+    if directory_mtime is None:
+        return None
+    preferred_path = os.path.join(version_directory, f"{version_id}.json")
+    try:
+        stat = os.stat(preferred_path)
+        return (directory_mtime, int(stat.st_size), int(stat.st_mtime_ns))
+    except OSError:
+        pass
+    # Without <id>.json the manifest is picked among all top-level JSON files, so watch them all.
+    manifests = []
+    try:
+        with os.scandir(version_directory) as entries:
+            for entry in entries:
+                if entry.name.lower().endswith(".json") and entry.is_file():
+                    stat = entry.stat()
+                    manifests.append((entry.name, int(stat.st_size), int(stat.st_mtime_ns)))
+    except OSError:
+        return (directory_mtime,)
+    return (directory_mtime, *sorted(manifests))
+
+
+class VersionMetadataCache:
+    """LRU of values derived from version manifests, keyed by kind, game directory and version.
+
+    Each entry remembers the version_signature of every version it was derived from (and
+    the mtime of any extra watched paths) and is recomputed as soon as one of them
+    changes, so edits on disk are picked up without explicit invalidation. Cached values
+    are shared between callers and must be treated as read-only.
+    """
+
+    def __init__(self, capacity=VERSION_CACHE_CAPACITY):
+        self.capacity = max(1, int(capacity))
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, kind, game_directory, version_id, compute, dependencies=None, watch_paths=()):
+        """Return compute() for version_id, reusing the cached value while its sources are unchanged.
+
+        dependencies(value) may name further version ids the value was derived from, such as
+        the parents of an inheritance chain; watch_paths are extra files or directories whose
+        mtime also invalidates the entry.
+        """
+        root = os.path.abspath(game_directory)
+        key = (kind, root, version_id)
+        with self._lock:
+            entry = self._entries.get(key)
+        if entry is not None and self._current(root, entry):
+            with self._lock:
+                if key in self._entries:
+                    self._entries.move_to_end(key)
+                self.hits += 1
+            return entry[0]
+
+        # Fingerprint before computing so an edit made meanwhile leaves a stale signature behind.
+        own_signature = version_signature(root, version_id)
+        watched = tuple((path, _mtime_ns(path)) for path in watch_paths)
+        value = compute()
+        signatures = {version_id: own_signature}
+        for dependency in (dependencies(value) if dependencies else ()):
+            if dependency and dependency not in signatures:
+                signatures[dependency] = version_signature(root, dependency)
+        with self._lock:
+            self.misses += 1
+            self._entries[key] = (value, signatures, watched)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.capacity:
+                self._entries.popitem(last=False)
+        return value
+
+    def _current(self, root, entry):
+        _value, signatures, watched = entry
+        for path, mtime in watched:
+            if _mtime_ns(path) != mtime:
+                return False
+        return all(version_signature(root, version_id) == signature for version_id, signature in signatures.items())
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+        logger.debug("Version metadata cache cleared")
+
+    def stats(self):
+        with self._lock:
+            return {"entries": len(self._entries), "hits": self.hits, "misses": self.misses}
+
+
+VERSION_CACHE = VersionMetadataCache()
@@ -0,0 +1,140 @@
+import os
+import threading
+
+from launcher import find_version_jar_path, find_version_json_path
+from log_utils import get_logger
+from resource_market import normalize_minecraft_version_for_api
+from storage_utils import load_json_file, save_json_atomic
+from version_cache import version_signature
+from version_utils import detect_version_type
+
+
+INVENTORY_FILE = os.path.join(".mcgo", "version-inventory.json")
+INVENTORY_VERSION = 1
+_inventory_lock = threading.Lock()
+logger = get_logger(__name__)
+
+
+def _mtime_ns(path):
+    try:
+        return int(os.stat(path).st_mtime_ns)
+    except OSError:
+        return None
+
+
+def _file_size(path):
+    try:
+        return int(os.path.getsize(path)) if path else 0
+    except OSError:
+        return 0
+
+
+class VersionInventory:
+    """Persistent per game directory listing of installed versions and their derived metadata.
+
+    Each versions/<id>/ entry stores a fingerprint made of the directory mtime, the stat of
+    its manifest and the mtime of its mods folder. refresh() only stats directories: the
+    manifest is parsed and the type / base version detected again just for entries whose
+    fingerprint changed, and versions/ itself is only listed when its own mtime changed.
+    """
+
+    def __init__(self, game_directory):
+        self.root = os.path.abspath(game_directory)
+        self.path = os.path.join(self.root, INVENTORY_FILE)
+        self.versions_mtime = None
+        self.entries = {}
+        self._load()
+
+    def _load(self):
+        try:
+            data = load_json_file(self.path, {})
+        except (OSError, ValueError) as exc:
+            logger.warning("Ignoring unreadable version inventory: path=%s error=%s", self.path, exc)
+            return
+        if isinstance(data, dict) and data.get("version") == INVENTORY_VERSION and isinstance(data.get("entries"), dict):
+            self.versions_mtime = data.get("versions_mtime")
+            self.entries = data["entries"]
+
+    def save(self):
+        save_json_atomic(self.path, {
+            "version": INVENTORY_VERSION,
+            "versions_mtime": self.versions_mtime,
+            "entries": self.entries,
+        }, indent=None)
+
+    def _fingerprint(self, version_id):
+        signature = version_signature(self.root, version_id)
+        if signature is None:
+            return None
+        return [*signature, _mtime_ns(os.path.join(self.root, "versions", version_id, "mods"))]
+
+    def _describe(self, version_id, fingerprint):
+        manifest_path = find_version_json_path(self.root, version_id)
+        entry = {"id": version_id, "fingerprint": fingerprint, "manifest": ""}
+        if not manifest_path:
+            return entry
+        jar_path = find_version_jar_path(self.root, version_id)
+        entry.update({
+            "manifest": os.path.relpath(manifest_path, self.root).replace(os.sep, "/"),
+            "type": detect_version_type(self.root, version_id),
+            "base_version": normalize_minecraft_version_for_api(self.root, version_id),
+            "manifest_size": _file_size(manifest_path),
+            "jar_size": _file_size(jar_path),
+        })
+        return entry
+
+    def _version_ids(self):
+        versions_directory = os.path.join(self.root, "versions")
+        versions_mtime = _mtime_ns(versions_directory)
+        if versions_mtime is not None and versions_mtime == self.versions_mtime:
+            return list(self.entries), False
+        version_ids = []
+        try:
+            with os.scandir(versions_directory) as entries:
+                version_ids = [entry.name for entry in entries if entry.is_dir()]
+        except OSError:
+            pass
+        self.versions_mtime = versions_mtime
+        return version_ids, True
+
+    def refresh(self):
+        """Bring the inventory up to date with versions/ and return the installed entries by id."""
+        version_ids, listed = self._version_ids()
+        changed = listed
+        refreshed = 0
+        entries = {}
+        for version_id in version_ids:
+            fingerprint = self._fingerprint(version_id)
+            if fingerprint is None:
+                changed = True
+                continue
+            entry = self.entries.get(version_id)
+            if not entry or entry.get("fingerprint") != fingerprint:
+                entry = self._describe(version_id, fingerprint)
+                refreshed += 1
+                changed = True
+            entries[version_id] = entry
+        changed = changed or set(entries) != set(self.entries)
+        self.entries = entries
+        if changed:
+            try:
+                self.save()
+            except OSError as exc:
+                logger.warning("Failed to save version inventory: path=%s error=%s", self.path, exc)
+        logger.debug(
+            "Version inventory refreshed: game_directory=%s versions=%d refreshed=%d listed=%s",
+            self.root,
+            len(entries),
+            refreshed,
+            listed,
+        )
+        return self.installed()
+
+    def installed(self):
+        return {version_id: entry for version_id, entry in sorted(self.entries.items()) if entry.get("manifest")}
+
+
+def scan_version_inventory(game_directory):
+    """Refresh and return {version_id: entry} for every installed version of game_directory."""
+    with _inventory_lock:
+        return VersionInventory(game_directory).refresh()
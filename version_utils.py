@@ -3,8 +3,10 @@ import os
 import re
 import shlex
 
+from app_settings import AUTO_GC_STRATEGY
 from launcher import find_version_json_path, get_local_versions, get_version_json
 from storage_utils import save_json_atomic
+from version_cache import VERSION_CACHE
 
 
 VERSION_SETTINGS_FILE = "version_settings.json"
@@ -90,7 +92,10 @@ def launch_options_for_version(game_dir, settings, version_id, global_isolation=
         "window_width": _positive_int(entry.get("window_width"), 0),
         "window_height": _positive_int(entry.get("window_height"), 0),
         "pre_launch_command": (entry.get("pre_launch_command") or "").strip(),
-        "gc_strategy": (entry.get("gc_strategy") or "G1GC").strip() or "G1GC",
+        "gc_strategy": (entry.get("gc_strategy") or AUTO_GC_STRATEGY).strip() or AUTO_GC_STRATEGY,
+        "gc_region_mb": 0,
+        "use_argfile": bool(entry.get("use_argfile", False)),
+        "class_data_sharing": bool(entry.get("class_data_sharing", False)),
     }
 
 
@@ -103,6 +108,10 @@ def _positive_int(value, fallback=0):
 
 
 def resolve_base_minecraft_version(game_dir, version_id):
+    return VERSION_CACHE.get("base_version", game_dir, version_id, lambda: _resolve_base_minecraft_version(game_dir, version_id))
+
+
+def _resolve_base_minecraft_version(game_dir, version_id):
     version_json = get_version_json(game_dir, version_id)
     if version_json:
         inherited = version_json.get("inheritsFrom")
@@ -213,6 +222,16 @@ def find_matching_fabric_versions(game_dir, base_minecraft_version):
 
 
 def detect_version_type(game_dir, version_id):
+    return VERSION_CACHE.get(
+        "version_type",
+        game_dir,
+        version_id,
+        lambda: _detect_version_type(game_dir, version_id),
+        watch_paths=(os.path.join(game_dir, "versions", version_id, "mods"),),
+    )
+
+
+def _detect_version_type(game_dir, version_id):
     version_json = get_version_json(game_dir, version_id) or {}
     version_dir = os.path.join(game_dir, "versions", version_id)
 
@@ -269,7 +288,10 @@ def detect_version_type(game_dir, version_id):
 
 
 def version_matches_category(game_dir, version_id, category):
-    version_type = detect_version_type(game_dir, version_id)
+    return version_type_matches_category(detect_version_type(game_dir, version_id), category)
+
+
+def version_type_matches_category(version_type, category):
     if category == "全部版本":
         return True
     if category == "收藏":